@@ -11,13 +11,27 @@ BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 TEST_DATA_DIR = os.path.join(BASE_DIR, 'test_data')
 TEST_DATA_FILE = os.path.join(TEST_DATA_DIR, 'login_test_cases.xlsx')
 
+# 缓存目录（测试数据快照等）
+CACHE_DIR = os.path.join(BASE_DIR, '.cache')
+DURATION_HISTORY_DB = os.path.join(CACHE_DIR, 'durations.sqlite3')  # 用例耗时历史，用于xdist的LPT调度
+CASE_STORE_DB = os.path.join(CACHE_DIR, 'cases.sqlite3')  # SQLite用例库，用于--case-query按条件选择用例
+
 # 测试报告配置
 REPORT_DIR = os.path.join(BASE_DIR, 'reports')
 ALLURE_REPORT_DIR = os.path.join(REPORT_DIR, 'allure')
 HTML_REPORT_DIR = os.path.join(REPORT_DIR, 'html')
+BENCHMARK_REPORT_DIR = os.path.join(REPORT_DIR, 'benchmark')
+SUMMARY_REPORT_DIR = os.path.join(REPORT_DIR, 'summary')  # 不依赖allure命令行的轻量结果摘要
 
 # 截图配置
 SCREENSHOT_DIR = os.path.join(REPORT_DIR, 'screenshots')
+SCREENSHOT_POLICY = 'on-failure'  # 截图策略: always(每步都附加到报告), on-failure(仅失败时输出), off(不截图)
+SCREENSHOT_BUFFER_SIZE = 5  # on-failure模式下内存中保留的最近截图数量
+ARTIFACT_WRITER_WORKERS = 2  # 失败截图/页面源码后台写盘线程数
+ARTIFACT_WRITER_MAX_PENDING = 32  # 后台写盘最大排队任务数，超出时测试线程等待
+ALLURE_COMPACT = True  # 生成报告前压缩allure结果：内容相同的附件只保留一份
+SCREENSHOT_MAX_WIDTH = None  # 压缩时把截图缩小到该宽度(像素)并重新编码为JPEG，None表示不缩小（需要Pillow）
+SCREENSHOT_QUALITY = 80  # 截图重新编码的JPEG质量(1-95)
 
 # 浏览器配置
 BROWSER = 'chrome'  # 支持: chrome, firefox, edge
@@ -25,8 +39,21 @@ HEADLESS = False  # 是否无头模式
 IMPLICIT_WAIT = 10  # 隐式等待时间(秒)
 PAGE_LOAD_TIMEOUT = 30  # 页面加载超时时间(秒)
 
+# 浏览器驱动配置：优先使用指定路径（可通过环境变量覆盖），不存在时使用本地缓存，缓存缺失才联网下载
+DRIVER_PATHS = {
+    'chrome': os.environ.get('CHROMEDRIVER_PATH', ''),
+    'firefox': os.environ.get('GECKODRIVER_PATH', ''),
+    'edge': os.environ.get('EDGEDRIVER_PATH', ''),
+}
+DRIVER_CACHE_DIR = os.environ.get('DRIVER_CACHE_DIR', os.path.join(CACHE_DIR, 'drivers'))
+DRIVER_POOL_ENABLED = True  # 是否在会话内复用浏览器(用例之间只重置cookie/storage/窗口)
+BROWSER_MEMORY_MB = 600  # 每个浏览器(含driver)预估占用内存，run_tests.py据此和CPU核数确定并行worker数
+
 # 登录页面URL
 LOGIN_URL = 'https://demo.com/login'
+LOGIN_FORM_FIELDS = {'username': 'identifier', 'password': 'password'}  # 接口引擎提交登录表单时使用的字段名
+LOCAL_SERVER_LATENCY = 0.0  # 本地登录替身服务每个响应的模拟延迟(秒)
+TEST_ENGINE = 'ui'  # 执行引擎: ui(浏览器), api(直接提交登录表单，不启动浏览器)
 
 # 超级管理员账号信息（用于验证）
 SUPER_ADMIN = {
@@ -34,6 +61,25 @@ SUPER_ADMIN = {
     'password': 'test@user.c'
 }
 
+# 登录状态缓存：登录成功后保存cookie和storage，之后的用例直接注入，跳过界面登录
+AUTH_STATE_DIR = os.path.join(CACHE_DIR, 'auth_state')
+AUTH_STATE_TTL = 1800  # 登录状态有效期(秒)，cookie更早过期时以cookie为准
+AUTH_PROBE_PATH = '/'  # 注入后用于确认登录状态有效的页面路径，未登录时应跳转到登录页
+
 # 错误提示信息
 ERROR_MESSAGE = '请检查输入的账号或密码是否正确'
 ERROR_MESSAGE_DISPLAY_TIME = 1  # 错误提示展示时间(秒)
+LOGIN_RESPONSE_TIMEOUT = 5  # 等待登录响应(页面跳转或错误提示出现)的超时时间(秒)
+FAST_INPUT_MODE = False  # True时登录表单通过一次脚本调用填充并提交，不模拟真实键盘输入
+
+# 资源拦截（pytest --block-resources，仅chrome）：打开页面时通过CDP拦截与登录校验无关的资源
+BLOCKED_RESOURCE_TYPES = ('Image', 'Font', 'Media')  # 拦截的资源类型(CDP Network.ResourceType)，只对页面基准中记录过的URL生效
+BLOCKED_URL_PATTERNS = [  # 拦截的URL通配符（统计、广告等第三方脚本）
+    '*google-analytics.com*',
+    '*googletagmanager.com*',
+    '*doubleclick.net*',
+    '*hm.baidu.com*',
+]
+ALLOWED_URL_PATTERNS = []  # 放行的URL通配符，优先于上面的拦截规则
+RESOURCE_PROFILE_FILE = os.path.join(CACHE_DIR, 'resource_profile.json')  # 各页面未拦截时的资源清单和加载耗时
+RESOURCE_BASELINE_TTL = 24 * 3600  # 基准加载耗时的有效期(秒)，过期后重新测量
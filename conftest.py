@@ -6,84 +6,258 @@ pytest配置文件
 import pytest
 import allure
 import os
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service as ChromeService
-from selenium.webdriver.firefox.service import Service as FirefoxService
-from selenium.webdriver.edge.service import Service as EdgeService
-from webdriver_manager.chrome import ChromeDriverManager
-from webdriver_manager.firefox import GeckoDriverManager
-from webdriver_manager.microsoft import EdgeChromiumDriverManager
+import time
 from datetime import datetime
 
 from config.config import (
-    BROWSER, HEADLESS, IMPLICIT_WAIT, PAGE_LOAD_TIMEOUT,
-    SCREENSHOT_DIR, REPORT_DIR, ALLURE_REPORT_DIR
+    BROWSER, HEADLESS, SCREENSHOT_DIR, REPORT_DIR, ALLURE_REPORT_DIR, DRIVER_POOL_ENABLED, TEST_ENGINE,
+    LOCAL_SERVER_LATENCY, BENCHMARK_REPORT_DIR, SUPER_ADMIN
 )
+from pages.login_page import LoginPage
+from pages.login_api import LoginApi
+from utils import browser_factory
+from utils.browser_factory import create_driver
+from utils.driver_pool import DriverPool, driver_pool_stats_key, merge_stats, warm_pool_key
+from utils.resource_blocker import PERFORMANCE_LOG_CAPABILITIES
+from utils.screenshot_recorder import recorder_for
+from utils.artifact_writer import get_artifact_writer, shutdown_artifact_writer
+from utils import test_data_cache
+from utils.startup_profiler import timeline as startup_timeline
+from utils.duration_history import DurationHistoryPlugin
+from utils.incremental import IncrementalPlugin
+from utils.auth_state import AuthStateCache
+
+
+# 用例收集耗时，xdist下每个worker的收集耗时汇总到主进程
+collection_stats_key = pytest.StashKey[dict]()
+worker_collection_stats_key = pytest.StashKey[dict]()
+auth_state_stats_key = pytest.StashKey[dict]()
+
+startup_timeline.mark("conftest导入完成")
+
+
+def _browser_settings(config):
+    """
+    获取浏览器配置，命令行参数优先于config.py
+    :return: (浏览器类型, 是否无头模式)
+    """
+    browser = (config.getoption('--browser') or BROWSER).lower()
+    headless = config.getoption('--headless') or HEADLESS
+    return browser, headless
+
+
+@pytest.fixture(scope="session")
+def driver_pool(request):
+    """
+    WebDriver池fixture
+    整个会话（xdist下为每个worker）只启动一次浏览器，会话结束时关闭；
+    由run_tests.py在进程内循环执行时使用跨会话保留的池，浏览器不随会话关闭；
+    --browser-contexts时所有进程共享一个Chrome，每个用例一个独立的浏览器上下文
+    """
+    browser, headless = _browser_settings(request.config)
+    warm_pool = request.config.stash.get(warm_pool_key, None)
+    contexts = request.config.pluginmanager.get_plugin('browser_contexts')
+    # 资源拦截统计依赖performance日志
+    blocking = request.config.pluginmanager.get_plugin('resource_blocking')
+    capabilities = PERFORMANCE_LOG_CAPABILITIES if blocking is not None else None
+    
+    def factory():
+        return create_driver(browser, headless, capabilities=capabilities)
+    
+    if contexts is not None:
+        pool, warm_pool = contexts.create_pool(), None
+    elif warm_pool is not None:
+        pool = warm_pool.pool_for(browser, headless, factory, enabled=DRIVER_POOL_ENABLED)
+    else:
+        pool = DriverPool(factory, enabled=DRIVER_POOL_ENABLED)
+    
+    yield pool
+    
+    if warm_pool is None:
+        pool.shutdown()
+    request.config.stash[driver_pool_stats_key] = pool.stats()
+    if hasattr(request.config, 'workeroutput'):
+        request.config.workeroutput['driver_pool_stats'] = pool.stats()
 
 
 @pytest.fixture(scope="function")
-def driver(request):
+def driver(request, driver_pool):
     """
     WebDriver fixture
-    每个测试函数执行前创建driver，执行后关闭
+    从driver池获取浏览器，测试结束后重置状态归还到池中
     """
     # 创建目录
     os.makedirs(SCREENSHOT_DIR, exist_ok=True)
     os.makedirs(ALLURE_REPORT_DIR, exist_ok=True)
     
-    # 根据配置创建driver
-    browser = BROWSER.lower()
-    
-    if browser == 'chrome':
-        options = webdriver.ChromeOptions()
-        if HEADLESS:
-            options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        options.add_argument('--disable-gpu')
-        options.add_argument('--window-size=1920,1080')
-        
-        driver_path = r"D:\WebDriver\chrome\chromedriver.exe"
-        service = ChromeService(driver_path)
-        driver = webdriver.Chrome(service=service, options=options)
-        
-    elif browser == 'firefox':
-        options = webdriver.FirefoxOptions()
-        if HEADLESS:
-            options.add_argument('--headless')
-        
-        service = FirefoxService(GeckoDriverManager().install())
-        driver = webdriver.Firefox(service=service, options=options)
-        
-    elif browser == 'edge':
-        options = webdriver.EdgeOptions()
-        if HEADLESS:
-            options.add_argument('--headless')
-        
-        service = EdgeService(EdgeChromiumDriverManager().install())
-        driver = webdriver.Edge(service=service, options=options)
-        
-    else:
-        raise ValueError(f"不支持的浏览器类型: {browser}")
-    
-    # 设置隐式等待和页面加载超时
-    driver.implicitly_wait(IMPLICIT_WAIT)
-    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
-    
-    # 最大化窗口
-    driver.maximize_window()
+    browser, headless = _browser_settings(request.config)
+    driver = driver_pool.acquire()
+    profiler = request.config.pluginmanager.get_plugin('command_profiler')
+    if profiler is not None:
+        profiler.attach(driver)
+    blocking = request.config.pluginmanager.get_plugin('resource_blocking')
+    if blocking is not None:
+        blocking.attach(driver)
+    recorder = recorder_for(driver)
+    recorder.clear()
     
     # 将driver附加到allure报告
     allure.attach(
-        f"浏览器: {browser}\n无头模式: {HEADLESS}",
+        f"浏览器: {browser}\n无头模式: {headless}",
         name="测试环境信息",
         attachment_type=allure.attachment_type.TEXT
     )
     
     yield driver
     
-    # 测试结束后的清理工作
-    driver.quit()
+    # 通过的测试不需要保留步骤截图
+    recorder.clear()
+    
+    # 测试结束后重置浏览器状态，供下一个用例复用
+    driver_pool.release(driver)
+
+
+@pytest.fixture(scope="session")
+def auth_state_cache(request):
+    """登录状态缓存fixture（文件存储，xdist各worker共享），会话结束时记录命中统计"""
+    cache = AuthStateCache()
+    
+    yield cache
+    
+    stats = cache.stats()
+    request.config.stash[auth_state_stats_key] = stats
+    if hasattr(request.config, 'workeroutput'):
+        request.config.workeroutput['auth_state_stats'] = stats
+
+
+def _ui_login(driver, username: str, password: str):
+    """通过登录页面完成界面登录，失败时抛出异常"""
+    login_page = LoginPage(driver)
+    login_page.open_login_page()
+    login_page.wait_for_page_ready()
+    login_page.login(username, password)
+    if not login_page.is_login_successful():
+        raise RuntimeError(f"界面登录失败，无法保存登录状态: {username}")
+
+
+@pytest.fixture(scope="function")
+def logged_in_driver(driver, auth_state_cache):
+    """
+    已登录（SUPER_ADMIN）的WebDriver fixture
+    优先注入缓存的cookie和storage，跳过界面登录；缓存缺失、过期或失效时才完整登录一次
+    """
+    with allure.step("恢复登录状态"):
+        from_cache = auth_state_cache.ensure_logged_in(
+            driver, SUPER_ADMIN['username'], SUPER_ADMIN['password'], LoginPage.login_url, _ui_login
+        )
+        allure.attach(
+            f"账号: {SUPER_ADMIN['username']}\n来源: {'缓存' if from_cache else '界面登录'}",
+            name="登录状态",
+            attachment_type=allure.attachment_type.TEXT
+        )
+    return driver
+
+
+@pytest.fixture(scope="session", autouse=True)
+def local_login_server(request):
+    """
+    本地登录替身服务fixture
+    指定--local-server时启动替身服务，并把登录页面地址指向该服务
+    """
+    if not request.config.getoption('--local-server'):
+        yield None
+        return
+    
+    from utils.login_server import LoginServer
+    latency = request.config.getoption('--server-latency')
+    server = LoginServer(latency=LOCAL_SERVER_LATENCY if latency is None else latency).start()
+    original_urls = LoginPage.login_url, LoginApi.login_url
+    LoginPage.login_url = LoginApi.login_url = server.login_url
+    
+    yield server
+    
+    LoginPage.login_url, LoginApi.login_url = original_urls
+    server.stop()
+
+
+@pytest.fixture(scope="function")
+def login_page(request):
+    """
+    登录页面fixture
+    根据--engine返回浏览器页面对象(ui)或接口对象(api)，两者方法一致；api引擎不启动浏览器
+    """
+    engine = request.config.getoption('--engine') or TEST_ENGINE
+    if engine == 'api':
+        return LoginApi()
+    return LoginPage(request.getfixturevalue('driver'))
+
+
+def pytest_configure(config):
+    """注册用例耗时历史、增量执行以及按需启用的统计插件，校验选项组合和--case-query，记录启动阶段时间点"""
+    config.pluginmanager.register(
+        DurationHistoryPlugin(config, lpt=config.getoption('--lpt')),
+        'duration_history'
+    )
+    config.pluginmanager.register(
+        IncrementalPlugin(
+            config,
+            enabled=config.getoption('--incremental'),
+            build_id=config.getoption('--build-id'),
+            engine=config.getoption('--engine') or TEST_ENGINE,
+            local_server=config.getoption('--local-server'),
+            server_latency=config.getoption('--server-latency')
+        ),
+        'incremental'
+    )
+    if config.getoption('--step-timings'):
+        from utils.step_timing import StepTimingPlugin
+        config.pluginmanager.register(StepTimingPlugin(config, config.getoption('--step-timings')), 'step_timing')
+    if config.getoption('--profile-commands'):
+        from utils.command_profiler import CommandProfiler
+        config.pluginmanager.register(
+            CommandProfiler(config, top=config.getoption('--profile-commands')), 'command_profiler'
+        )
+    if config.getoption('--case-query'):
+        from utils.case_store import build_where
+        try:
+            build_where(config.getoption('--case-query'))
+        except ValueError as e:
+            raise pytest.UsageError(f"--case-query 无效: {e}")
+    if config.getoption('--browser-contexts') and config.getoption('--block-resources'):
+        # 共享浏览器由attach_chrome接管，无法启用performance日志，拦截统计和基准都无法记录
+        raise pytest.UsageError("--block-resources 不能与 --browser-contexts 同时使用")
+    if config.getoption('--browser-contexts') and (config.getoption('--engine') or TEST_ENGINE) == 'ui':
+        browser, headless = _browser_settings(config)
+        if browser != 'chrome':
+            raise pytest.UsageError("--browser-contexts 只支持chrome")
+        from utils.browser_contexts import BrowserContextPlugin
+        config.pluginmanager.register(BrowserContextPlugin(config, headless), 'browser_contexts')
+    if config.getoption('--block-resources') and (config.getoption('--engine') or TEST_ENGINE) == 'ui':
+        if _browser_settings(config)[0] != 'chrome':
+            raise pytest.UsageError("--block-resources 只支持chrome")
+        from utils.resource_blocker import ResourceBlockingPlugin
+        config.pluginmanager.register(ResourceBlockingPlugin(config), 'resource_blocking')
+    if config.getoption('--benchmark'):
+        from utils.benchmark import BenchmarkPlugin
+        config.pluginmanager.register(BenchmarkPlugin(config, BENCHMARK_REPORT_DIR), 'benchmark')
+    startup_timeline.mark("pytest_configure")
+
+
+def pytest_collection_finish(session):
+    """记录启动阶段时间点"""
+    startup_timeline.mark("用例收集完成")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_setup(item):
+    """记录首个用例开始setup（含fixture、浏览器启动）的时间点"""
+    startup_timeline.mark("首个用例setup开始")
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_runtest_call(item):
+    """记录首个用例开始执行的时间点"""
+    startup_timeline.mark("首个用例执行开始")
 
 
 @pytest.hookimpl(tryfirst=True, hookwrapper=True)
@@ -96,35 +270,75 @@ def pytest_runtest_makereport(item, call):
     report = outcome.get_result()
     
     if report.when == 'call':
-        # 获取测试用例的fixture
-        if 'driver' in item.fixturenames:
-            driver = item.funcargs['driver']
-            
+        # 获取测试用例的driver（直接使用driver fixture，或通过ui引擎的login_page fixture间接使用）
+        driver = item.funcargs.get('driver') or getattr(item.funcargs.get('login_page'), 'driver', None)
+        if driver is not None:
             # 如果测试失败，截图
             if report.failed:
+                writer = get_artifact_writer()
+                
                 # 生成截图文件名
                 timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
                 screenshot_name = f"{item.name}_{timestamp}_failed.png"
                 screenshot_path = os.path.join(SCREENSHOT_DIR, screenshot_name)
                 
-                # 保存截图
-                driver.save_screenshot(screenshot_path)
+                # 只截图一次，同一份数据既保存文件又添加到Allure报告，写盘在后台完成
+                png = driver.get_screenshot_as_png()
+                writer.write_file(screenshot_path, png)
+                writer.attach(png, name="失败截图", attachment_type=allure.attachment_type.PNG)
                 
-                # 添加截图到Allure报告
-                allure.attach(
-                    driver.get_screenshot_as_png(),
-                    name="失败截图",
-                    attachment_type=allure.attachment_type.PNG
-                )
+                # 输出失败前缓冲的步骤截图
+                recorder_for(driver).flush(item.name)
                 
                 # 添加页面源码到报告
-                allure.attach(
+                writer.attach(
                     driver.page_source,
                     name="页面HTML源码",
                     attachment_type=allure.attachment_type.HTML
                 )
 
 
+def pytest_sessionfinish(session, exitstatus):
+    """会话结束时等待后台产物写入全部完成，按需保存启动耗时"""
+    shutdown_artifact_writer()
+    if session.config.getoption('--startup-report') and not hasattr(session.config, 'workerinput'):
+        startup_timeline.save(backend_import_times=browser_factory.backend_import_times)
+
+
+@pytest.hookimpl(hookwrapper=True)
+def pytest_collection(session):
+    """记录用例收集耗时以及测试数据的加载来源"""
+    # 进程内多次执行pytest.main时，不沿用上一轮的加载统计
+    test_data_cache.last_load_stats.clear()
+    start = time.perf_counter()
+    yield
+    stats = {
+        'seconds': round(time.perf_counter() - start, 3),
+        'data': dict(test_data_cache.last_load_stats),
+    }
+    session.config.stash[collection_stats_key] = stats
+    if hasattr(session.config, 'workeroutput'):
+        # xdist worker: 通过workeroutput把统计信息带回主进程
+        session.config.workeroutput['collection_stats'] = stats
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """xdist主进程: 收集各worker回传的收集耗时，汇总driver池和登录状态缓存统计"""
+    workeroutput = getattr(node, 'workeroutput', {})
+    stats = workeroutput.get('collection_stats')
+    if stats:
+        node.config.stash.setdefault(worker_collection_stats_key, {})[node.gateway.id] = stats
+    pool_stats = workeroutput.get('driver_pool_stats')
+    if pool_stats:
+        stash = node.config.stash
+        stash[driver_pool_stats_key] = merge_stats(stash.get(driver_pool_stats_key, None), pool_stats)
+    auth_stats = workeroutput.get('auth_state_stats')
+    if auth_stats:
+        stash = node.config.stash
+        stash[auth_state_stats_key] = merge_stats(stash.get(auth_state_stats_key, None), auth_stats)
+
+
 def pytest_collection_modifyitems(config, items):
     """
     修改测试用例的收集
@@ -142,8 +356,8 @@ def pytest_addoption(parser):
     parser.addoption(
         "--browser",
         action="store",
-        default="chrome",
-        help="指定浏览器: chrome, firefox, edge"
+        default=None,
+        help="指定浏览器: chrome, firefox, edge（默认使用config.py中的BROWSER）"
     )
     parser.addoption(
         "--headless",
@@ -151,6 +365,152 @@ def pytest_addoption(parser):
         default=False,
         help="是否使用无头模式"
     )
+    parser.addoption(
+        "--engine",
+        action="store",
+        choices=("ui", "api"),
+        default=None,
+        help="执行引擎: ui(浏览器), api(直接提交登录表单，不启动浏览器)（默认使用config.py中的TEST_ENGINE）"
+    )
+    parser.addoption(
+        "--local-server",
+        action="store_true",
+        default=False,
+        help="启动本地登录替身服务，并将登录页面地址指向该服务"
+    )
+    parser.addoption(
+        "--server-latency",
+        action="store",
+        type=float,
+        default=None,
+        help="本地登录替身服务每个响应的模拟延迟(秒)（默认使用config.py中的LOCAL_SERVER_LATENCY）"
+    )
+    parser.addoption(
+        "--benchmark",
+        action="store_true",
+        default=False,
+        help="统计单用例耗时、浏览器启动耗时、步骤耗时和每分钟执行用例数（通常配合--local-server，见run_benchmark.py）"
+    )
+    parser.addoption(
+        "--step-timings",
+        action="store",
+        nargs="?",
+        const=os.path.join(REPORT_DIR, 'step_timings.json'),
+        default=None,
+        metavar="PATH",
+        help="会话结束时导出页面操作耗时的p50/p95/p99（.json或.csv，默认reports/step_timings.json）"
+    )
+    parser.addoption(
+        "--profile-commands",
+        action="store",
+        nargs="?",
+        type=int,
+        const=10,
+        default=None,
+        metavar="N",
+        help="统计每个用例的WebDriver协议命令次数和耗时，标记冗余命令，并输出会话内前N项（默认10）"
+    )
+    parser.addoption(
+        "--case-query",
+        action="store",
+        default=None,
+        metavar="QUERY",
+        help="从SQLite用例库中只加载匹配的Excel用例，如 \"tag:smoke and expected=fail and priority<=P1\"（语法见utils/case_store.py）"
+    )
+    parser.addoption(
+        "--browser-contexts",
+        action="store_true",
+        default=False,
+        help="只启动一个Chrome，每个用例使用独立的浏览器上下文（CDP），并输出每GB内存可并发的用例数"
+    )
+    parser.addoption(
+        "--block-resources",
+        action="store_true",
+        default=False,
+        help="打开页面时通过CDP拦截图片、字体、统计脚本等无关资源（规则见config.py），输出每个用例的拦截数量和节省的加载耗时"
+    )
+    parser.addoption(
+        "--lpt",
+        action="store_true",
+        default=False,
+        help="配合 -n 使用：按历史耗时最长优先分配用例到各worker"
+    )
+    parser.addoption(
+        "--incremental",
+        action="store_true",
+        default=False,
+        help="增量模式：只执行Excel数据、页面对象、配置或构建号有变化以及上次未通过的用例"
+    )
+    parser.addoption(
+        "--build-id",
+        action="store",
+        default=os.environ.get('BUILD_ID', ''),
+        help="被测目标的构建号，参与增量模式的用例指纹计算（默认读取环境变量BUILD_ID）"
+    )
+    parser.addoption(
+        "--startup-report",
+        action="store_true",
+        default=False,
+        help="输出启动各阶段耗时（配合 python -m utils.startup_profiler 可得到按插件/模块的导入耗时）"
+    )
+
+
+def _format_collection_stats(stats: dict) -> str:
+    """格式化收集耗时"""
+    text = f"收集耗时: {stats['seconds']}s"
+    data = stats.get('data')
+    if data:
+        source = {'snapshot': '快照', 'case_store': 'SQLite用例库'}.get(data['source'], 'Excel解析')
+        text += f", 测试数据: {data['cases']} 条, 来源: {source}, 加载耗时: {data['seconds']:.3f}s"
+    return text
+
+
+def _format_auth_state_stats(stats: dict) -> str:
+    """格式化登录状态缓存统计，按平均耗时估算注入代替界面登录节省的时间"""
+    text = f"命中: {stats['hits']} 次, 界面登录: {stats['misses']} 次, 失效淘汰: {stats['evictions']} 次"
+    if stats['hits'] and stats['misses']:
+        restore = stats['restore_time'] / stats['hits']
+        login = stats['login_time'] / stats['misses']
+        text += (f"; 平均注入恢复 {restore:.3f}s, 平均界面登录 {login:.3f}s, "
+                 f"估计节省 {(login - restore) * stats['hits']:.2f}s")
+    return text
+
+
+def pytest_terminal_summary(terminalreporter, exitstatus, config):
+    """在终端摘要中输出用例收集耗时、登录状态缓存命中情况和driver池的复用情况"""
+    worker_stats = config.stash.get(worker_collection_stats_key, None)
+    local_stats = config.stash.get(collection_stats_key, None)
+    if worker_stats or local_stats:
+        terminalreporter.section("用例收集统计")
+        if worker_stats:
+            for worker_id, stats in sorted(worker_stats.items()):
+                terminalreporter.write_line(f"{worker_id}: {_format_collection_stats(stats)}")
+        else:
+            terminalreporter.write_line(_format_collection_stats(local_stats))
+    
+    if config.getoption('--startup-report'):
+        terminalreporter.section("启动耗时")
+        for line in startup_timeline.format_lines():
+            terminalreporter.write_line(line)
+        for backend, seconds in browser_factory.backend_import_times.items():
+            terminalreporter.write_line(f"浏览器后端 {backend} 延迟导入耗时: {seconds * 1000:.1f} ms")
+    
+    auth_stats = config.stash.get(auth_state_stats_key, None)
+    if auth_stats and (auth_stats['hits'] or auth_stats['misses']):
+        terminalreporter.section("登录状态缓存")
+        terminalreporter.write_line(_format_auth_state_stats(auth_stats))
+    
+    stats = config.stash.get(driver_pool_stats_key, None)
+    if not stats:
+        return
+    terminalreporter.section("WebDriver池统计")
+    terminalreporter.write_line(
+        f"启动浏览器: {stats['launches']} 次, 复用: {stats['reuses']} 次, "
+        f"节省启动: {stats['launches_avoided']} 次, 健康检查失败重启: {stats['relaunches']} 次"
+    )
+    terminalreporter.write_line(
+        f"启动累计耗时: {stats['launch_time']}s, 状态重置累计耗时: {stats['reset_time']}s"
+    )
 # # --- 文件顶部的导入语句，这是必须的！ ---
 # import pytest
 # import os
@@ -1,12 +1,47 @@
 # -*- coding: utf-8 -*-
 """
 生成Excel测试数据文件
-运行此脚本将创建包含测试用例的Excel文件
+运行此脚本将创建包含测试用例的Excel文件；
+--bulk 模式按声明式生成规则批量生成大量登录组合（边界长度、Unicode、空白字符、大小写变体），
+流式写入write-only工作簿（不设置单元格样式），并可同时输出CSV和JSONL
+
+用法:
+    python generate_test_data.py                                   # 生成默认的10条用例
+    python generate_test_data.py --bulk 50000 --formats xlsx,csv,jsonl
+    python generate_test_data.py --bulk 20000 --verify             # 生成后读回xlsx做往返校验
 """
+import argparse
+import csv
+import json
 import os
+import random
+import string
+import sys
+import time
+import tracemalloc
+from itertools import islice
 from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
 from openpyxl.styles import Font, Alignment, PatternFill
-from config.config import TEST_DATA_DIR, TEST_DATA_FILE
+from config.config import TEST_DATA_DIR, TEST_DATA_FILE, SUPER_ADMIN
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 表头，与ExcelReader读取的列一致
+HEADERS = ['case_id', 'case_name', 'username', 'password', 'expected', 'description', 'run', 'priority', 'tags']
+SHEET_NAME = "登录测试用例"
+
+# 边界长度
+BOUNDARY_LENGTHS = [0, 1, 2, 7, 8, 15, 16, 31, 32, 63, 64, 65, 127, 128, 255, 256]
+
+# Unicode样本：中日韩、西里尔、阿拉伯（从右到左）、组合字符、emoji（代理对）、全角字符
+UNICODE_SAMPLES = ['用户', 'ユーザー', '사용자', 'пользователь', 'مستخدم', 'e\u0301', '👤', 'ｔｅｓｔ', 'Ω≈ç√']
+
+# 空白字符：空格、制表符、换行、全角空格、不换行空格、零宽空格
+WHITESPACE_SAMPLES = [' ', '\t', '\n', '\u3000', '\u00a0', '\u200b']
 
 def create_test_data_excel():
     """创建测试数据Excel文件"""
@@ -27,7 +62,9 @@ def create_test_data_excel():
         'password',     # 密码
         'expected',     # 预期结果 (success/fail)
         'description',  # 用例描述
-        'run'          # 是否执行 (yes/no)
+        'run',          # 是否执行 (yes/no)
+        'priority',     # 优先级 (P0最高)
+        'tags'          # 标签，逗号分隔
     ]
     
     # 写入表头并设置样式
@@ -43,17 +80,17 @@ def create_test_data_excel():
     
     # 测试数据
     test_cases = [
-        # case_id, case_name, username, password, expected, description, run
-        ['TC001', '正确的账号和密码', 'test1', 'test@user.c', 'success', '使用正确的超级管理员账号和密码登录', 'yes'],
-        ['TC002', '错误的账号', 'wronguser', 'Ld@513.c', 'fail', '使用错误的账号，正确的密码', 'yes'],
-        ['TC003', '错误的密码', 'test1', 'wrongpassword', 'fail', '使用正确的账号，错误的密码', 'yes'],
-        ['TC004', '账号和密码都错误', 'wronguser', 'wrongpassword', 'fail', '使用错误的账号和错误的密码', 'yes'],
-        ['TC005', '空账号', '', 'user123456', 'fail', '账号为空，密码正确', 'yes'],
-        ['TC006', '空密码', 'admin', '', 'fail', '账号正确，密码为空', 'yes'],
-        ['TC007', '账号和密码都为空', '', '', 'fail', '账号和密码都为空', 'yes'],
-        ['TC008', '账号包含特殊字符', 'admin@123', 'Ld@513.c', 'fail', '账号包含特殊字符', 'yes'],
-        ['TC009', '密码包含空格', 'admin', 'user 123456', 'fail', '密码包含空格', 'yes'],
-        ['TC010', '账号大小写错误', 'ADMIN', 'user123456', 'fail', '账号大小写错误', 'yes'],
+        # case_id, case_name, username, password, expected, description, run, priority, tags
+        ['TC001', '正确的账号和密码', 'test1', 'test@user.c', 'success', '使用正确的超级管理员账号和密码登录', 'yes', 'P0', 'smoke,positive'],
+        ['TC002', '错误的账号', 'wronguser', 'Ld@513.c', 'fail', '使用错误的账号，正确的密码', 'yes', 'P0', 'smoke,negative'],
+        ['TC003', '错误的密码', 'test1', 'wrongpassword', 'fail', '使用正确的账号，错误的密码', 'yes', 'P0', 'smoke,negative'],
+        ['TC004', '账号和密码都错误', 'wronguser', 'wrongpassword', 'fail', '使用错误的账号和错误的密码', 'yes', 'P1', 'negative'],
+        ['TC005', '空账号', '', 'user123456', 'fail', '账号为空，密码正确', 'yes', 'P1', 'negative,empty'],
+        ['TC006', '空密码', 'admin', '', 'fail', '账号正确，密码为空', 'yes', 'P1', 'negative,empty'],
+        ['TC007', '账号和密码都为空', '', '', 'fail', '账号和密码都为空', 'yes', 'P1', 'negative,empty'],
+        ['TC008', '账号包含特殊字符', 'admin@123', 'Ld@513.c', 'fail', '账号包含特殊字符', 'yes', 'P2', 'negative,boundary'],
+        ['TC009', '密码包含空格', 'admin', 'user 123456', 'fail', '密码包含空格', 'yes', 'P2', 'negative,boundary'],
+        ['TC010', '账号大小写错误', 'ADMIN', 'user123456', 'fail', '账号大小写错误', 'yes', 'P2', 'negative,boundary'],
     ]
     
     # 写入测试数据
@@ -64,7 +101,7 @@ def create_test_data_excel():
             cell.alignment = Alignment(horizontal='left', vertical='center')
     
     # 调整列宽
-    column_widths = [12, 25, 15, 15, 12, 35, 10]
+    column_widths = [12, 25, 15, 15, 12, 35, 10, 10, 20]
     for col_num, width in enumerate(column_widths, 1):
         ws.column_dimensions[chr(64 + col_num)].width = width
     
@@ -82,7 +119,254 @@ def create_test_data_excel():
     print(f"{'expected':<15} 预期结果: 'success'表示登录成功, 'fail'表示登录失败")
     print(f"{'description':<15} 用例的详细描述")
     print(f"{'run':<15} 是否执行该用例: 'yes'执行, 'no'跳过")
+    print(f"{'priority':<15} 优先级: P0最高，可用 --case-query \"priority<=P1\" 选择")
+    print(f"{'tags':<15} 标签，逗号分隔，可用 --case-query \"tag:smoke\" 选择")
     print("=" * 80)
 
+# ---------------- 批量生成 ----------------
+
+def _lengths(base: str, rng: random.Random):
+    """边界长度：由可打印ASCII字符随机组成的各边界长度字符串"""
+    alphabet = string.ascii_letters + string.digits + string.punctuation
+    for length in BOUNDARY_LENGTHS:
+        yield f"长度{length}", ''.join(rng.choice(alphabet) for _ in range(length))
+
+
+def _unicode(base: str, rng: random.Random):
+    """Unicode：在原值前后或中间插入，或整体替换为Unicode字符串"""
+    for sample in UNICODE_SAMPLES:
+        position = rng.randint(0, len(base))
+        yield f"插入{sample!r}", base[:position] + sample + base[position:]
+        yield f"整体{sample!r}", sample * rng.randint(1, 4)
+
+
+def _whitespace(base: str, rng: random.Random):
+    """空白字符：前导、尾随、中间、仅空白"""
+    for sample in WHITESPACE_SAMPLES:
+        position = rng.randint(1, max(1, len(base) - 1))
+        yield f"前导{sample!r}", sample + base
+        yield f"尾随{sample!r}", base + sample
+        yield f"中间{sample!r}", base[:position] + sample + base[position:]
+        yield f"仅{sample!r}", sample * rng.randint(1, 3)
+
+
+def _case(base: str, rng: random.Random):
+    """大小写变体，包括随机大小写"""
+    yield "全大写", base.upper()
+    yield "全小写", base.lower()
+    yield "大小写互换", base.swapcase()
+    yield "首字母大写", base.capitalize()
+    yield "随机大小写", ''.join(c.upper() if rng.random() < 0.5 else c.lower() for c in base)
+
+
+def _valid(base: str, rng: random.Random):
+    """原值"""
+    yield "正确值", base
+
+
+VARIANTS = {
+    'valid': _valid,
+    'lengths': _lengths,
+    'unicode': _unicode,
+    'whitespace': _whitespace,
+    'case': _case,
+}
+
+# 声明式生成规则：账号、密码各自使用的变体，组合后逐行输出；
+# 预期结果由数据本身决定：只有账号和密码都与SUPER_ADMIN完全一致时才为success
+GENERATION_RULES = [
+    {'name': '账号长度边界', 'username': 'lengths', 'password': 'valid'},
+    {'name': '密码长度边界', 'username': 'valid', 'password': 'lengths'},
+    {'name': '账号Unicode', 'username': 'unicode', 'password': 'valid'},
+    {'name': '密码Unicode', 'username': 'valid', 'password': 'unicode'},
+    {'name': '账号空白字符', 'username': 'whitespace', 'password': 'valid'},
+    {'name': '密码空白字符', 'username': 'valid', 'password': 'whitespace'},
+    {'name': '账号大小写', 'username': 'case', 'password': 'valid'},
+    {'name': '密码大小写', 'username': 'valid', 'password': 'case'},
+    {'name': '账号空白+密码大小写', 'username': 'whitespace', 'password': 'case'},
+    {'name': '账号大小写+密码Unicode', 'username': 'case', 'password': 'unicode'},
+]
+
+
+def generate_cases(rules=None, seed: int = 0):
+    """
+    按生成规则无限产生用例行（每一轮随机值不同），由调用方截取需要的行数
+    :param rules: 生成规则，默认GENERATION_RULES
+    :param seed: 随机种子，相同种子生成相同的数据
+    :return: 行生成器，每行与HEADERS对应
+    """
+    rules = rules or GENERATION_RULES
+    rng = random.Random(seed)
+    username, password = SUPER_ADMIN['username'], SUPER_ADMIN['password']
+    number = 0
+    while True:
+        for rule in rules:
+            for user_desc, user_value in VARIANTS[rule['username']](username, rng):
+                for pass_desc, pass_value in VARIANTS[rule['password']](password, rng):
+                    number += 1
+                    expected = 'success' if (user_value, pass_value) == (username, password) else 'fail'
+                    yield [f"BULK{number:06d}", rule['name'], user_value, pass_value, expected,
+                           f"账号{user_desc}，密码{pass_desc}", 'yes', 'P3',
+                           f"bulk,{rule['username']},{rule['password']}"]
+
+
+class _XlsxWriter:
+    """write-only工作簿：逐行追加，不保留单元格对象；字符串一律写成文本单元格"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.workbook = Workbook(write_only=True)
+        self.sheet = self.workbook.create_sheet(SHEET_NAME)
+        self.sheet.append(HEADERS)
+
+    def write(self, row):
+        # 普通的append会把以"="开头的字符串当作公式写入，读取时得到None
+        self.sheet.append([self._text(value) if isinstance(value, str) else value for value in row])
+
+    def _text(self, value: str) -> WriteOnlyCell:
+        cell = WriteOnlyCell(self.sheet, value)
+        cell.data_type = 's'
+        return cell
+
+    def close(self):
+        self.workbook.save(self.path)
+
+
+class _CsvWriter:
+    """CSV（带BOM，Excel可直接打开）"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf-8-sig', newline='')
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(HEADERS)
+
+    def write(self, row):
+        self.writer.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+class _JsonlWriter:
+    """JSONL，每行一个用例对象"""
+
+    def __init__(self, path: str):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, row):
+        self.file.write(json.dumps(dict(zip(HEADERS, row)), ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+BULK_WRITERS = {'xlsx': _XlsxWriter, 'csv': _CsvWriter, 'jsonl': _JsonlWriter}
+
+
+def _peak_rss_mb() -> float:
+    """进程峰值常驻内存(MB)，Linux下ru_maxrss单位为KB，macOS为字节"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / 1024 / 1024 if sys.platform == 'darwin' else peak / 1024, 1)
+
+
+def create_bulk_test_data(rows: int, formats=('xlsx',), output_dir: str = TEST_DATA_DIR,
+                          name: str = 'login_test_cases_bulk', seed: int = 0) -> dict:
+    """
+    批量生成测试数据，一次遍历同时写入所有格式
+    :param rows: 行数
+    :param formats: 输出格式 xlsx/csv/jsonl
+    :param output_dir: 输出目录
+    :param name: 文件名（不含扩展名）
+    :param seed: 随机种子
+    :return: {'rows', 'seconds', 'rows_per_second', 'peak_memory_mb', 'memory_source', 'formats', 'files'}
+    """
+    unknown = set(formats) - set(BULK_WRITERS)
+    if unknown:
+        raise ValueError(f"不支持的输出格式: {', '.join(sorted(unknown))}")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # 有resource模块时取进程峰值内存；Windows下退回tracemalloc（只统计Python分配，且会明显拖慢写入速度）
+    if resource is None:
+        tracemalloc.start()
+    start = time.perf_counter()
+    writers = [BULK_WRITERS[fmt](os.path.join(output_dir, f"{name}.{fmt}")) for fmt in formats]
+    try:
+        count = 0
+        for row in islice(generate_cases(seed=seed), rows):
+            for writer in writers:
+                writer.write(row)
+            count += 1
+    finally:
+        for writer in writers:
+            writer.close()
+    seconds = time.perf_counter() - start
+    if resource is None:
+        peak_memory_mb = round(tracemalloc.get_traced_memory()[1] / 1024 / 1024, 1)
+        tracemalloc.stop()
+    else:
+        peak_memory_mb = _peak_rss_mb()
+
+    return {
+        'rows': count,
+        'seconds': round(seconds, 2),
+        'rows_per_second': round(count / seconds) if seconds > 0 else count,
+        'peak_memory_mb': peak_memory_mb,
+        'memory_source': 'Python分配' if resource is None else '进程峰值RSS',
+        'formats': list(formats),
+        'files': [os.path.join(output_dir, f"{name}.{fmt}") for fmt in formats],
+    }
+
+
+def verify_bulk_xlsx(path: str, rows: int, seed: int = 0) -> list:
+    """
+    往返校验：用ExcelReader读回批量生成的xlsx，与相同种子重新生成的数据逐行比较
+    （空字符串在Excel中就是空单元格，读回为None，视为一致）
+    :param path: xlsx文件路径
+    :param rows: 生成的行数
+    :param seed: 生成时使用的随机种子
+    :return: 不一致的单元格 [(case_id, 列名, 生成值, 读回值)]
+    """
+    from utils.excel_reader import ExcelReader
+
+    reader = ExcelReader(path, SHEET_NAME)
+    mismatches = []
+    try:
+        cases = reader.iter_cases(only_enabled=False)
+        for expected, case in zip(islice(generate_cases(seed=seed), rows), cases):
+            for header, value in zip(HEADERS, expected):
+                actual = case.get(header)
+                if actual != value and not (value == '' and actual is None):
+                    mismatches.append((expected[0], header, value, actual))
+        if sum(1 for _ in cases):
+            mismatches.append((None, 'rows', rows, '多于生成的行数'))
+    finally:
+        reader.close()
+    return mismatches
+
+
 if __name__ == '__main__':
-    create_test_data_excel()
+    parser = argparse.ArgumentParser(description="生成登录测试数据")
+    parser.add_argument('--bulk', type=int, metavar='ROWS', help="批量生成指定行数的登录组合")
+    parser.add_argument('--formats', default='xlsx', help="批量模式的输出格式，逗号分隔: xlsx,csv,jsonl")
+    parser.add_argument('--output-dir', default=TEST_DATA_DIR, help="批量模式的输出目录")
+    parser.add_argument('--seed', type=int, default=0, help="批量模式的随机种子")
+    parser.add_argument('--verify', action='store_true', help="批量模式生成后读回xlsx，校验与生成的数据完全一致")
+    args = parser.parse_args()
+
+    if args.bulk:
+        result = create_bulk_test_data(
+            args.bulk, formats=[fmt.strip() for fmt in args.formats.split(',') if fmt.strip()],
+            output_dir=args.output_dir, seed=args.seed
+        )
+        print(f"已生成 {result['rows']} 行, 耗时 {result['seconds']}s, "
+              f"{result['rows_per_second']} 行/秒, 峰值内存({result['memory_source']}) {result['peak_memory_mb']} MB")
+        for path in result['files']:
+            print(f"  {path}")
+        if args.verify and 'xlsx' in result['formats']:
+            mismatches = verify_bulk_xlsx(result['files'][result['formats'].index('xlsx')], result['rows'], args.seed)
+            for case_id, header, expected, actual in mismatches[:20]:
+                print(f"  不一致: {case_id} {header}: 生成 {expected!r}, 读回 {actual!r}")
+            print(f"往返校验: {'通过' if not mismatches else f'{len(mismatches)} 处不一致'}")
+            sys.exit(1 if mismatches else 0)
+    else:
+        create_test_data_excel()
@@ -3,11 +3,80 @@
 页面基类
 """
 import allure
+import json
+import logging
 import time
+from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.common.exceptions import TimeoutException, NoSuchElementException
-from typing import Tuple
+from selenium.common.exceptions import (
+    TimeoutException, NoSuchElementException, StaleElementReferenceException,
+    ElementNotInteractableException, ElementClickInterceptedException, WebDriverException
+)
+from typing import Callable, Dict, Tuple
+from utils.resource_blocker import blocker_for
+from utils.screenshot_recorder import recorder_for
+from utils.step_timing import timed_step
+
+
+logger = logging.getLogger(__name__)
+
+# 条件等待的轮询间隔(秒)，WebDriverWait默认0.5秒，条件满足后最多浪费一个间隔
+WAIT_POLL_INTERVAL = 0.1
+
+# 安装网络活动记录器的脚本：统计未完成的fetch/XHR，open()打开页面后立即注入，
+# 使页面加载后发出的请求都能被记录（页面内跳转后由NETWORK_ACTIVITY_SCRIPT重新注入）
+NETWORK_TRACKER_SCRIPT = """
+var w = window;
+if (!w.__netTracker) {
+    var t = w.__netTracker = {pending: 0, last: Date.now(), resources: 0};
+    var done = function () { t.pending = Math.max(0, t.pending - 1); t.last = Date.now(); };
+    if (w.fetch) {
+        var origFetch = w.fetch;
+        w.fetch = function () {
+            t.pending++; t.last = Date.now();
+            return origFetch.apply(this, arguments).then(
+                function (r) { done(); return r; },
+                function (e) { done(); throw e; });
+        };
+    }
+    var origSend = XMLHttpRequest.prototype.send;
+    XMLHttpRequest.prototype.send = function () {
+        t.pending++; t.last = Date.now();
+        this.addEventListener('loadend', done);
+        return origSend.apply(this, arguments);
+    };
+}
+"""
+
+# 读取页面网络活动的脚本（记录器不存在时先安装），并用资源条目数检测新请求
+NETWORK_ACTIVITY_SCRIPT = NETWORK_TRACKER_SCRIPT + """
+var t = w.__netTracker;
+var count = performance.getEntriesByType('resource').length;
+if (count !== t.resources) { t.resources = count; t.last = Date.now(); }
+return [t.pending, Date.now() - t.last, document.readyState];
+"""
+
+# 快速填充表单的脚本：通过原生value setter赋值（兼容React/Vue等框架的受控组件），
+# 触发框架监听的input/change事件后点击提交按钮
+FILL_AND_SUBMIT_SCRIPT = """
+var fields = arguments[0], values = arguments[1], submit = arguments[2];
+for (var i = 0; i < fields.length; i++) {
+    if (!fields[i]) { return 'field:' + i; }
+}
+if (!submit) { return 'submit'; }
+for (var i = 0; i < fields.length; i++) {
+    var el = fields[i];
+    var proto = el instanceof HTMLTextAreaElement ? HTMLTextAreaElement.prototype : HTMLInputElement.prototype;
+    el.focus();
+    Object.getOwnPropertyDescriptor(proto, 'value').set.call(el, values[i]);
+    el.dispatchEvent(new Event('input', {bubbles: true}));
+    el.dispatchEvent(new Event('change', {bubbles: true}));
+    el.dispatchEvent(new FocusEvent('blur'));
+}
+submit.click();
+return null;
+"""
 
 
 class BasePage:
@@ -20,19 +89,39 @@ class BasePage:
         """
         self.driver = driver
         self.wait = WebDriverWait(driver, 10)
+        # 每次条件等待的实际耗时记录: {'name', 'seconds', 'satisfied'}
+        self.wait_timings = []
+        # 元素缓存: {定位器: WebElement}，页面跳转或元素过期时失效
+        self._element_cache = {}
+        self._cache_url = None
+        self.cache_hits = 0
+        self.cache_misses = 0
         try:
             self.driver.maximize_window()
         except Exception:
             pass
     
+    @timed_step()
     @allure.step("打开页面: {url}")
     def open(self, url: str):
         """
         打开指定URL
         :param url: 页面URL
         """
-        self.driver.get(url)
+        self.invalidate_cache()
+        blocker = blocker_for(self.driver)
+        if blocker is not None:
+            # --block-resources: 按规则拦截无关资源后打开
+            blocker.get(url)
+        else:
+            self.driver.get(url)
+        self._cache_url = url
+        try:
+            self.driver.execute_script(NETWORK_TRACKER_SCRIPT)
+        except WebDriverException as e:
+            logger.debug("注入网络活动记录器失败: %s", e)
     
+    @timed_step()
     @allure.step("查找元素: {locator}")
     def find_element(self, locator: Tuple[str, str], timeout: int = 10):
         """
@@ -41,10 +130,17 @@ class BasePage:
         :param timeout: 超时时间
         :return: WebElement
         """
+        element = self._element_cache.get(locator)
+        if element is not None:
+            self.cache_hits += 1
+            return element
+        
+        self.cache_misses += 1
         try:
             element = WebDriverWait(self.driver, timeout).until(
                 EC.presence_of_element_located(locator)
             )
+            self._element_cache[locator] = element
             return element
         except TimeoutException:
             allure.attach(
@@ -54,6 +150,7 @@ class BasePage:
             )
             raise TimeoutException(f"超时: 无法找到元素 {locator}")
     
+    @timed_step()
     @allure.step("查找多个元素: {locator}")
     def find_elements(self, locator: Tuple[str, str], timeout: int = 10):
         """
@@ -75,6 +172,7 @@ class BasePage:
             )
             raise TimeoutException(f"超时: 无法找到元素 {locator}")
     
+    @timed_step()
     @allure.step("输入文本: {text}")
     def input_text(self, locator: Tuple[str, str], text: str):
         """
@@ -82,21 +180,61 @@ class BasePage:
         :param locator: 定位器
         :param text: 输入的文本
         """
-        element = self.find_element(locator)
-        element.clear()
-        element.send_keys(text)
+        def clear_and_type(element):
+            element.clear()
+            element.send_keys(text)
+        
+        self._with_element(locator, clear_and_type)
     
+    @timed_step()
     @allure.step("点击元素")
     def click(self, locator: Tuple[str, str]):
         """
         点击元素
         :param locator: 定位器
         """
+        element = self._element_cache.get(locator)
+        if element is not None:
+            self.cache_hits += 1
+            try:
+                element.click()
+                return
+            except (StaleElementReferenceException, ElementNotInteractableException,
+                    ElementClickInterceptedException):
+                # 缓存的元素已过期或暂不可点击，回退到等待可点击
+                self.invalidate_cache(locator)
+        
+        self.cache_misses += 1
         element = WebDriverWait(self.driver, 10).until(
             EC.element_to_be_clickable(locator)
         )
+        self._element_cache[locator] = element
         element.click()
     
+    @timed_step()
+    @allure.step("快速填充并提交表单")
+    def fill_and_submit(self, fields: Dict[Tuple[str, str], str], submit_locator: Tuple[str, str]):
+        """
+        在一次execute_script调用中填充多个输入框并点击提交按钮
+        不模拟真实键盘输入，只触发框架关心的input/change事件
+        :param fields: {定位器: 输入文本}
+        :param submit_locator: 提交按钮定位器
+        """
+        locators = list(fields)
+        elements = ", ".join(self._js_query(locator) for locator in locators)
+        script = (
+            f"return (function () {{ {FILL_AND_SUBMIT_SCRIPT} }})"
+            f".call(null, [{elements}], arguments[0], {self._js_query(submit_locator)});"
+        )
+        missing = self.driver.execute_script(script, [fields[locator] for locator in locators])
+        if missing:
+            if missing == 'submit':
+                locator = submit_locator
+            else:
+                locator = locators[int(missing.split(':')[1])]
+            raise NoSuchElementException(f"快速填充失败: 无法找到元素 {locator}")
+    
+    @timed_step()
     @allure.step("获取元素文本")
     def get_text(self, locator: Tuple[str, str]) -> str:
         """
@@ -104,9 +242,9 @@ class BasePage:
         :param locator: 定位器
         :return: 元素文本
         """
-        element = self.find_element(locator)
-        return element.text
+        return self._with_element(locator, lambda element: element.text)
     
+    @timed_step()
     @allure.step("检查元素是否存在")
     def is_element_present(self, locator: Tuple[str, str], timeout: int = 3) -> bool:
         """
@@ -115,14 +253,26 @@ class BasePage:
         :param timeout: 超时时间
         :return: True/False
         """
+        element = self._element_cache.get(locator)
+        if element is not None:
+            try:
+                # 一次轻量调用确认缓存的元素仍在DOM中
+                element.is_enabled()
+                self.cache_hits += 1
+                return True
+            except StaleElementReferenceException:
+                self.invalidate_cache(locator)
+        
+        self.cache_misses += 1
         try:
-            WebDriverWait(self.driver, timeout).until(
+            self._element_cache[locator] = WebDriverWait(self.driver, timeout).until(
                 EC.presence_of_element_located(locator)
             )
             return True
         except TimeoutException:
             return False
     
+    @timed_step()
     @allure.step("等待元素消失")
     def wait_element_disappear(self, locator: Tuple[str, str], timeout: int = 10) -> bool:
         """
@@ -139,14 +289,21 @@ class BasePage:
         except TimeoutException:
             return False
     
+    @timed_step()
     @allure.step("获取当前URL")
     def get_current_url(self) -> str:
         """
         获取当前页面URL
         :return: 当前URL
         """
-        return self.driver.current_url
+        current_url = self.driver.current_url
+        if current_url != self._cache_url:
+            # 页面已跳转，之前缓存的元素都不再有效
+            self.invalidate_cache()
+            self._cache_url = current_url
+        return current_url
     
+    @timed_step()
     @allure.step("获取页面标题")
     def get_title(self) -> str:
         """
@@ -155,18 +312,165 @@ class BasePage:
         """
         return self.driver.title
     
+    @timed_step()
     @allure.step("截图")
     def take_screenshot(self, name: str = "screenshot"):
         """
-        截取当前页面截图并添加到Allure报告
+        截取当前页面截图，按SCREENSHOT_POLICY立即添加到Allure报告或暂存到失败截图缓冲区
         :param name: 截图名称
         """
-        allure.attach(
-            self.driver.get_screenshot_as_png(),
-            name=name,
-            attachment_type=allure.attachment_type.PNG
+        recorder_for(self.driver).capture(self.driver, name)
+    
+    def wait_until(self, condition: Callable, timeout: float = 10, name: str = "条件等待") -> bool:
+        """
+        等待条件成立，条件一旦满足立即返回，并记录实际等待耗时
+        :param condition: 接收driver参数的条件函数（可使用expected_conditions）
+        :param timeout: 超时时间
+        :param name: 等待名称，用于耗时记录
+        :return: True表示条件在超时前成立
+        """
+        start = time.perf_counter()
+        try:
+            WebDriverWait(self.driver, timeout, poll_frequency=WAIT_POLL_INTERVAL).until(condition)
+            satisfied = True
+        except TimeoutException:
+            satisfied = False
+        elapsed = time.perf_counter() - start
+        self.wait_timings.append({'name': name, 'seconds': round(elapsed, 3), 'satisfied': satisfied})
+        logger.debug("%s: %.3fs (%s)", name, elapsed, "满足" if satisfied else "超时")
+        return satisfied
+    
+    @timed_step()
+    @allure.step("等待URL变化")
+    def wait_for_url_change(self, url: str, timeout: float = 10) -> bool:
+        """
+        等待当前URL不再是指定URL
+        :param url: 原URL
+        :param timeout: 超时时间
+        :return: True表示URL已变化
+        """
+        changed = self.wait_until(EC.url_changes(url), timeout, name="等待URL变化")
+        if changed:
+            self.invalidate_cache()
+        return changed
+    
+    @timed_step()
+    @allure.step("等待元素可见")
+    def wait_for_element_visible(self, locator: Tuple[str, str], timeout: float = 10) -> bool:
+        """
+        等待元素出现并可见
+        :param locator: 定位器
+        :param timeout: 超时时间
+        :return: True表示元素已可见
+        """
+        return self.wait_until(
+            EC.visibility_of_element_located(locator), timeout, name=f"等待元素可见{locator}"
         )
     
+    @timed_step()
+    @allure.step("等待页面加载完成")
+    def wait_for_document_ready(self, timeout: float = 10) -> bool:
+        """
+        等待document.readyState为complete
+        :param timeout: 超时时间
+        :return: True表示页面已加载完成
+        """
+        return self.wait_until(
+            lambda driver: driver.execute_script("return document.readyState") == 'complete',
+            timeout, name="等待页面加载完成"
+        )
+    
+    @timed_step()
+    @allure.step("等待网络空闲")
+    def wait_for_network_idle(self, idle_time: float = 0.5, timeout: float = 10) -> bool:
+        """
+        等待页面没有未完成的fetch/XHR请求，且持续idle_time秒没有新的网络活动
+        :param idle_time: 空闲持续时间(秒)
+        :param timeout: 超时时间
+        :return: True表示网络已空闲
+        """
+        def network_idle(driver):
+            pending, quiet_ms, ready_state = driver.execute_script(NETWORK_ACTIVITY_SCRIPT)
+            return ready_state == 'complete' and pending == 0 and quiet_ms >= idle_time * 1000
+        
+        return self.wait_until(network_idle, timeout, name="等待网络空闲")
+    
+    @timed_step()
+    @allure.step("等待URL变化或元素可见")
+    def wait_for_url_change_or_element(self, url: str, locator: Tuple[str, str],
+                                       timeout: float = 10) -> bool:
+        """
+        等待URL离开指定页面，或者指定元素可见（与visibility_of_element_located一致，
+        预先渲染但隐藏的提示元素不算），二者任一满足即返回
+        通过一次脚本调用同时检查两个条件，不受隐式等待影响
+        :param url: 原URL
+        :param locator: 定位器
+        :param timeout: 超时时间
+        :return: True表示任一条件已满足
+        """
+        script = (
+            f"if (window.location.href !== arguments[0]) {{ return true; }}"
+            f"var el = {self._js_query(locator)};"
+            f"return !!(el && el.getClientRects().length && getComputedStyle(el).visibility !== 'hidden');"
+        )
+        return self.wait_until(
+            lambda driver: driver.execute_script(script, url),
+            timeout, name=f"等待URL变化或元素可见{locator}"
+        )
+    
+    def invalidate_cache(self, locator: Tuple[str, str] = None):
+        """
+        使元素缓存失效
+        :param locator: 定位器，为None时清空全部缓存
+        """
+        if locator is None:
+            self._element_cache.clear()
+        else:
+            self._element_cache.pop(locator, None)
+    
+    def cache_stats(self) -> dict:
+        """
+        获取元素缓存统计
+        :return: {'hits', 'misses', 'size'}
+        """
+        return {'hits': self.cache_hits, 'misses': self.cache_misses, 'size': len(self._element_cache)}
+    
+    def _with_element(self, locator: Tuple[str, str], action: Callable):
+        """
+        对（可能来自缓存的）元素执行操作，元素过期时重新定位并重试一次
+        :param locator: 定位器
+        :param action: 接收WebElement的操作函数
+        :return: 操作函数的返回值
+        """
+        element = self.find_element(locator)
+        try:
+            return action(element)
+        except StaleElementReferenceException:
+            self.invalidate_cache(locator)
+            return action(self.find_element(locator))
+    
+    @staticmethod
+    def _js_query(locator: Tuple[str, str]) -> str:
+        """
+        将定位器转换为在页面中查找元素的JS表达式（找不到时为null）
+        :param locator: 定位器
+        :return: JS表达式
+        """
+        by, value = locator
+        literal = json.dumps(value)
+        if by == By.CSS_SELECTOR:
+            return f"document.querySelector({literal})"
+        if by == By.XPATH:
+            return (f"document.evaluate({literal}, document, null, "
+                    f"XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue")
+        if by == By.ID:
+            return f"document.getElementById({literal})"
+        if by == By.NAME:
+            return f"document.getElementsByName({literal})[0] || null"
+        if by == By.CLASS_NAME:
+            return f"document.getElementsByClassName({literal})[0] || null"
+        raise ValueError(f"不支持转换为JS的定位方式: {by}")
+    
     def sleep(self, seconds: int):
         """
         等待指定秒数
@@ -0,0 +1,192 @@
+# -*- coding: utf-8 -*-
+"""
+登录接口对象
+与LoginPage提供相同的方法，但不启动浏览器，直接通过HTTP提交登录表单，
+根据重定向和响应内容判断登录结果；连接由进程内共享的keep-alive连接池复用
+"""
+import html
+import re
+from typing import Dict, Optional
+from urllib.parse import urlencode, urljoin
+
+import allure
+import urllib3
+
+from config.config import LOGIN_URL, LOGIN_FORM_FIELDS, ERROR_MESSAGE, LOGIN_RESPONSE_TIMEOUT
+from utils.step_timing import timed_step
+
+
+# 错误提示元素，与LoginPage.error_message定位器的class保持一致
+ERROR_ELEMENT_PATTERN = re.compile(
+    r'<(\w+)[^>]*class="[^"]*\b(?:error-message|alert-danger|message-error)\b[^"]*"[^>]*>(.*?)</\1>',
+    re.S
+)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+_http_pool = None
+
+
+def get_http_pool() -> urllib3.PoolManager:
+    """
+    获取进程内共享的HTTP连接池（keep-alive，复用TCP/TLS连接）
+    :return: urllib3.PoolManager
+    """
+    global _http_pool
+    if _http_pool is None:
+        _http_pool = urllib3.PoolManager(
+            num_pools=4,
+            maxsize=32,
+            timeout=urllib3.Timeout(total=LOGIN_RESPONSE_TIMEOUT),
+            retries=False,
+        )
+    return _http_pool
+
+
+def classify_login_response(status: int, location: Optional[str], body: str, login_url: str) -> str:
+    """
+    根据登录请求的响应判断登录结果
+    :param status: HTTP状态码
+    :param location: 重定向地址（Location响应头）
+    :param body: 响应内容
+    :param login_url: 登录页面地址
+    :return: 'success' / 'fail' / 'error'(服务异常等无法判断的情况)
+    """
+    if 300 <= status < 400 and location:
+        # 重定向离开登录页视为登录成功，重定向回登录页视为失败
+        target = urljoin(login_url, location).split('?')[0].rstrip('/')
+        return 'fail' if target == login_url.split('?')[0].rstrip('/') else 'success'
+    if status >= 500:
+        return 'error'
+    if ERROR_MESSAGE in body or ERROR_ELEMENT_PATTERN.search(body):
+        return 'fail'
+    if status in (401, 403, 422):
+        return 'fail'
+    return 'error'
+
+
+class LoginApi:
+    """登录接口类，可替代LoginPage执行同一批Excel用例"""
+
+    login_url = LOGIN_URL
+
+    def __init__(self, http: urllib3.PoolManager = None):
+        """
+        初始化登录接口对象
+        :param http: HTTP连接池，默认使用进程内共享的连接池
+        """
+        self.http = http or get_http_pool()
+        self.cookies: Dict[str, str] = {}
+        self.status = None
+        self.location = None
+        self.body = ''
+
+    @timed_step()
+    @allure.step("请求登录页面")
+    def open_login_page(self):
+        """请求登录页面，保存服务端下发的Cookie（会话、CSRF等）"""
+        response = self._request('GET', self.login_url)
+        allure.attach(self.login_url, name="登录页面URL", attachment_type=allure.attachment_type.TEXT)
+        return response.status
+
+    def wait_for_page_ready(self) -> bool:
+        """接口模式下页面请求返回即就绪"""
+        return self.status is not None and self.status < 400
+
+    @timed_step()
+    @allure.step("提交登录表单")
+    def login(self, username: str, password: str, fast_input: bool = None):
+        """
+        提交登录表单
+        :param username: 用户名
+        :param password: 密码
+        :param fast_input: 仅为与LoginPage.login保持相同签名，接口模式下无意义
+        """
+        form = {
+            LOGIN_FORM_FIELDS['username']: username or '',
+            LOGIN_FORM_FIELDS['password']: password or '',
+        }
+        self._request('POST', self.login_url, body=urlencode(form),
+                      headers={'Content-Type': 'application/x-www-form-urlencoded'})
+
+    @property
+    def result(self) -> str:
+        """登录结果: success / fail / error"""
+        return classify_login_response(self.status, self.location, self.body, self.login_url)
+
+    @timed_step()
+    @allure.step("检查是否登录成功")
+    def is_login_successful(self) -> bool:
+        """
+        检查是否登录成功
+        :return: True表示登录成功
+        """
+        is_success = self.result == 'success'
+        allure.attach(
+            f"状态码: {self.status}\n重定向: {self.location}\n登录成功: {is_success}",
+            name="登录结果检查",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        return is_success
+
+    @timed_step()
+    @allure.step("检查错误提示是否显示")
+    def is_error_message_displayed(self) -> bool:
+        """
+        检查响应中是否带有错误提示
+        :return: True表示有错误提示
+        """
+        return self.result == 'fail' and bool(self.get_error_message_text() or ERROR_MESSAGE in self.body)
+
+    @timed_step()
+    @allure.step("获取错误提示信息")
+    def get_error_message_text(self) -> str:
+        """
+        获取错误提示文本
+        :return: 错误提示文本
+        """
+        match = ERROR_ELEMENT_PATTERN.search(self.body)
+        if not match:
+            return ''
+        text = html.unescape(TAG_PATTERN.sub('', match.group(2))).strip()
+        allure.attach(text, name="错误提示信息", attachment_type=allure.attachment_type.TEXT)
+        return text
+
+    def wait_error_message_disappear(self) -> bool:
+        """接口模式下没有提示展示时间的概念"""
+        return True
+
+    @timed_step()
+    @allure.step("验证错误提示内容是否正确")
+    def verify_error_message(self, expected_message: str) -> bool:
+        """
+        验证错误提示内容
+        :param expected_message: 期望的错误提示信息
+        :return: True表示匹配
+        """
+        actual_message = self.get_error_message_text()
+        is_match = expected_message in actual_message
+        allure.attach(
+            f"期望提示: {expected_message}\n实际提示: {actual_message}\n是否匹配: {is_match}",
+            name="错误提示验证",
+            attachment_type=allure.attachment_type.TEXT
+        )
+        return is_match
+
+    def take_screenshot(self, name: str = "screenshot"):
+        """接口模式下没有页面截图，保留方法以便与LoginPage互换"""
+
+    def _request(self, method: str, url: str, body: str = None, headers: Dict[str, str] = None):
+        """
+        发送请求（不自动跟随重定向），记录状态码、重定向地址和响应内容，并保存Cookie
+        """
+        headers = dict(headers or {})
+        if self.cookies:
+            headers['Cookie'] = '; '.join(f"{name}={value}" for name, value in self.cookies.items())
+        response = self.http.request(method, url, body=body, headers=headers, redirect=False)
+        for cookie in response.headers.getlist('Set-Cookie'):
+            name, _, value = cookie.split(';', 1)[0].partition('=')
+            self.cookies[name.strip()] = value.strip()
+        self.status = response.status
+        self.location = response.headers.get('Location')
+        self.body = response.data.decode('utf-8', errors='replace')
+        return response
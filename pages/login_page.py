@@ -5,12 +5,18 @@
 import allure
 from selenium.webdriver.common.by import By
 from pages.base_page import BasePage
-from config.config import LOGIN_URL, ERROR_MESSAGE_DISPLAY_TIME
+from utils.step_timing import timed_step
+from config.config import (
+    LOGIN_URL, ERROR_MESSAGE_DISPLAY_TIME, LOGIN_RESPONSE_TIMEOUT, FAST_INPUT_MODE
+)
 
 
 class LoginPage(BasePage):
     """登录页面类"""
     
+    # 登录页面地址，使用本地替身服务时由conftest替换
+    login_url = LOGIN_URL
+    
     # 页面元素定位器
     # 注意：以下定位器是示例，需要根据实际页面调整
     # 这里提供了多种常见的定位方式供选择
@@ -19,7 +25,7 @@ class LoginPage(BasePage):
     username_input = (By.CSS_SELECTOR, '#identifier')
     #password_input = (By.CSS_SELECTOR, "input[name='password']")
     login_button = (By.CSS_SELECTOR, "button[type='submit'].bg-gradient-to-r.text-white")
-    #error_message = (By.CSS_SELECTOR, ".error-message, .alert-danger, .message-error")
+    error_message = (By.CSS_SELECTOR, ".error-message, .alert-danger, .message-error")
     
     # 方式2: 使用XPath（备选方案）
     # username_input = (By.XPATH, "/html/body/div/div[1]/div[2]/div/div/form/div[2]/input")
@@ -39,12 +45,23 @@ class LoginPage(BasePage):
         """
         super().__init__(driver)
     
+    @timed_step()
     @allure.step("打开登录页面")
     def open_login_page(self):
         """打开登录页面"""
-        self.open(LOGIN_URL)
-        allure.attach(LOGIN_URL, name="登录页面URL", attachment_type=allure.attachment_type.TEXT)
+        self.open(self.login_url)
+        allure.attach(self.login_url, name="登录页面URL", attachment_type=allure.attachment_type.TEXT)
     
+    @timed_step()
+    @allure.step("等待登录页面就绪")
+    def wait_for_page_ready(self) -> bool:
+        """
+        等待登录页面加载完成且用户名输入框可见
+        :return: True表示页面已就绪
+        """
+        return self.wait_for_document_ready() and self.wait_for_element_visible(self.username_input)
+    
+    @timed_step()
     @allure.step("输入用户名: {username}")
     def input_username(self, username: str):
         """
@@ -53,6 +70,7 @@ class LoginPage(BasePage):
         """
         self.input_text(self.username_input, username)
     
+    @timed_step()
     @allure.step("输入密码: {password}")
     def input_password(self, password: str):
         """
@@ -62,25 +80,50 @@ class LoginPage(BasePage):
         # 注意：实际生产环境建议对密码进行脱敏处理
         self.input_text(self.password_input, password)
     
+    @timed_step()
     @allure.step("点击登录按钮")
     def click_login_button(self):
         """点击登录按钮"""
         self.click(self.login_button)
     
+    @timed_step()
     @allure.step("执行登录操作")
-    def login(self, username: str, password: str):
+    def login(self, username: str, password: str, fast_input: bool = None):
         """
         执行完整的登录操作
         :param username: 用户名
         :param password: 密码
+        :param fast_input: True时通过一次脚本调用填充并提交表单，False时模拟真实键盘输入；
+                           默认使用config.py中的FAST_INPUT_MODE
         """
-        self.input_username(username)
-        self.input_password(password)
-        self.take_screenshot("登录前截图")
-        self.click_login_button()
-        # 等待页面响应
-        self.sleep(0.5)
+        if fast_input is None:
+            fast_input = FAST_INPUT_MODE
+        
+        if fast_input:
+            self.fill_and_submit(
+                {self.username_input: username, self.password_input: password},
+                self.login_button
+            )
+        else:
+            self.input_username(username)
+            self.input_password(password)
+            self.take_screenshot("登录前截图")
+            self.click_login_button()
+        # 等待页面响应：跳转离开登录页或出现错误提示
+        self.wait_for_login_response()
+    
+    @timed_step()
+    @allure.step("等待登录响应")
+    def wait_for_login_response(self) -> bool:
+        """
+        等待登录请求有结果：URL离开登录页面或错误提示可见
+        :return: True表示已有响应，False表示超时
+        """
+        return self.wait_for_url_change_or_element(
+            self.login_url, self.error_message, timeout=LOGIN_RESPONSE_TIMEOUT
+        )
     
+    @timed_step()
     @allure.step("检查错误提示是否显示")
     def is_error_message_displayed(self) -> bool:
         """
@@ -89,6 +132,7 @@ class LoginPage(BasePage):
         """
         return self.is_element_present(self.error_message, timeout=2)
     
+    @timed_step()
     @allure.step("获取错误提示信息")
     def get_error_message_text(self) -> str:
         """
@@ -101,6 +145,7 @@ class LoginPage(BasePage):
             return text
         return ""
     
+    @timed_step()
     @allure.step("等待错误提示消失")
     def wait_error_message_disappear(self) -> bool:
         """
@@ -111,6 +156,7 @@ class LoginPage(BasePage):
         timeout = ERROR_MESSAGE_DISPLAY_TIME + 2
         return self.wait_element_disappear(self.error_message, timeout=timeout)
     
+    @timed_step()
     @allure.step("检查是否登录成功")
     def is_login_successful(self) -> bool:
         """
@@ -118,12 +164,12 @@ class LoginPage(BasePage):
         通过URL变化或页面元素判断
         :return: True表示登录成功
         """
-        self.sleep(1)  # 等待页面跳转
+        self.wait_for_url_change(self.login_url, timeout=LOGIN_RESPONSE_TIMEOUT)  # 等待页面跳转
         current_url = self.get_current_url()
         
         # 登录成功后URL应该不再是登录页面
         # 这里假设登录成功后会跳转到其他页面
-        is_success = LOGIN_URL not in current_url or current_url != LOGIN_URL
+        is_success = self.login_url not in current_url or current_url != self.login_url
         
         # 或者也可以检查是否还在登录页面且没有错误提示
         # is_success = not self.is_error_message_displayed()
@@ -136,6 +182,7 @@ class LoginPage(BasePage):
         
         return is_success
     
+    @timed_step()
     @allure.step("验证错误提示内容是否正确")
     def verify_error_message(self, expected_message: str) -> bool:
         """
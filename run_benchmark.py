@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试脚本
+在无头浏览器中对本地登录替身服务执行数据驱动用例，输出单用例耗时、浏览器启动耗时、
+步骤耗时和每分钟执行用例数，结果保存在reports/benchmark目录
+
+用法:
+    python run_benchmark.py                       # ui引擎，Chrome无头模式
+    python run_benchmark.py --engine api          # 接口引擎，不启动浏览器
+    python run_benchmark.py --latency 0.2 -- -n 4 # 模拟200ms服务端延迟，其余参数传给pytest
+"""
+import argparse
+import sys
+
+import pytest
+
+
+DEFAULT_TARGET = 'tests/test_login.py::TestLogin'
+
+
+def build_pytest_args(options, extra_args) -> list:
+    """
+    组装pytest参数
+    :param options: 命令行参数
+    :param extra_args: 透传给pytest的其他参数
+    :return: pytest参数列表
+    """
+    args = [
+        options.target,
+        '--benchmark',
+        '--local-server',
+        '--server-latency', str(options.latency),
+        '--engine', options.engine,
+        '--browser', options.browser,
+        '--headless',
+        '-q',
+    ]
+    return args + list(extra_args)
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="对本地登录替身服务执行基准测试")
+    parser.add_argument('--engine', choices=('ui', 'api'), default='ui', help="执行引擎")
+    parser.add_argument('--browser', default='chrome', help="浏览器: chrome, firefox, edge")
+    parser.add_argument('--latency', type=float, default=0.0, help="替身服务每个响应的模拟延迟(秒)")
+    parser.add_argument('--target', default=DEFAULT_TARGET, help="要执行的用例")
+    options, extra_args = parser.parse_known_args(argv)
+    if extra_args[:1] == ['--']:
+        extra_args = extra_args[1:]
+    return pytest.main(build_pytest_args(options, extra_args))
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+"""
+登录接口压测脚本
+以Excel中的登录用例作为请求数据，N个并发虚拟用户回放，输出按时间窗口的吞吐、延迟百分位和错误率
+
+用法:
+    python run_load.py --local-server --users 20 --duration 30                 # 闭环，本地替身服务
+    python run_load.py --profile ramp --users 50 --ramp-up 20 --duration 60    # 爬坡
+    python run_load.py --profile fixed --rate 200 --users 50 --duration 30     # 固定速率
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+from config.config import LOGIN_URL, TEST_DATA_FILE
+from utils.load_generator import LoadGenerator, PROFILES
+from utils.test_data_cache import load_test_cases
+
+
+def print_report(stats, duration: float):
+    """输出按时间窗口的统计和整体统计"""
+    print(f"{'时间(s)':>8}{'请求数':>8}{'吞吐(/s)':>10}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}"
+          f"{'不符预期':>10}{'错误率':>8}")
+    for row in stats.timeline():
+        print(f"{row['t']:>8}{row['requests']:>8}{row['throughput']:>10}{row['p50_ms']:>10}{row['p95_ms']:>10}"
+              f"{row['p99_ms']:>10}{row['mismatch_rate']:>10.2%}{row['error_rate']:>8.2%}")
+    summary = stats.summary(duration)
+    print("=" * 80)
+    print(f"总请求: {summary['requests']}, 耗时: {summary['duration']}s, 吞吐: {summary['throughput']}/s")
+    print(f"延迟: p50 {summary['p50_ms']}ms, p95 {summary['p95_ms']}ms, p99 {summary['p99_ms']}ms, "
+          f"最大 {summary['max_ms']}ms")
+    print(f"符合预期: {summary['ok']}, 不符预期: {summary['mismatch']}, 错误(5xx/超时/连接失败): {summary['error']}")
+    return summary
+
+
+def main(argv=None) -> int:
+    """主函数"""
+    parser = argparse.ArgumentParser(description="以Excel登录用例对登录接口施加并发负载")
+    parser.add_argument('--profile', choices=PROFILES, default='closed',
+                        help="负载模型: closed(闭环), ramp(爬坡), fixed(固定速率)")
+    parser.add_argument('--users', type=int, default=10, help="虚拟用户数（fixed模型下为最大并发连接数）")
+    parser.add_argument('--duration', type=float, default=30, help="持续时间(秒)")
+    parser.add_argument('--rate', type=float, default=10, help="fixed模型的请求速率(个/秒)")
+    parser.add_argument('--ramp-up', type=float, default=10, help="ramp模型的爬坡时间(秒)")
+    parser.add_argument('--think-time', type=float, default=0, help="闭环模型的思考时间(秒)")
+    parser.add_argument('--interval', type=float, default=1.0, help="统计窗口长度(秒)")
+    parser.add_argument('--url', default=LOGIN_URL, help="登录地址")
+    parser.add_argument('--sheet', default='登录测试用例', help="Excel工作表名称")
+    parser.add_argument('--local-server', action='store_true', help="启动本地登录替身服务并对其压测")
+    parser.add_argument('--server-latency', type=float, default=0.0, help="本地替身服务的模拟延迟(秒)")
+    parser.add_argument('--output', help="结果JSON文件路径（默认不保存）")
+    options = parser.parse_args(argv)
+
+    cases = load_test_cases(TEST_DATA_FILE, sheet_name=options.sheet)
+    server = None
+    url = options.url
+    if options.local_server:
+        from utils.login_server import LoginServer
+        server = LoginServer(latency=options.server_latency).start()
+        url = server.login_url
+
+    print(f"压测目标: {url}, 模型: {options.profile}, 虚拟用户: {options.users}, "
+          f"持续: {options.duration}s, 用例: {len(cases)} 条")
+    generator = LoadGenerator(
+        url, cases, users=options.users, profile=options.profile, duration=options.duration,
+        rate=options.rate, ramp_up=options.ramp_up, think_time=options.think_time, interval=options.interval
+    )
+    start = time.perf_counter()
+    try:
+        stats = asyncio.run(generator.run())
+    finally:
+        if server is not None:
+            server.stop()
+    summary = print_report(stats, time.perf_counter() - start)
+
+    if options.output:
+        os.makedirs(os.path.dirname(os.path.abspath(options.output)), exist_ok=True)
+        with open(options.output, 'w', encoding='utf-8') as f:
+            json.dump({'options': vars(options), 'summary': summary, 'timeline': stats.timeline()},
+                      f, ensure_ascii=False, indent=2)
+        print(f"结果已保存: {options.output}")
+    return 0 if summary['error'] == 0 else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,11 +2,25 @@
 """
 测试执行脚本
 提供便捷的测试执行方式
+
+命令行（不带参数时进入交互菜单）:
+    python run_tests.py --parallel                        # 进程内执行，按CPU和内存自动确定xdist worker数
+    python run_tests.py --parallel --loop                 # 执行后循环重跑上次失败的用例（浏览器跨轮次保留）
+    python run_tests.py --parallel --workers 4 -- -k TC00  # -- 之后的参数原样传给pytest
+    python run_tests.py --parallel --report summary       # 生成轻量摘要代替Allure报告（不启动JVM）
 """
+import argparse
 import os
 import sys
 import subprocess
-from config.config import ALLURE_REPORT_DIR, REPORT_DIR
+import threading
+from typing import List, Optional
+
+import pytest
+
+from config.config import (
+    ALLURE_COMPACT, BASE_DIR, BROWSER_MEMORY_MB, REPORT_DIR, TEST_ENGINE
+)
 
 
 def run_tests(args=''):
@@ -27,8 +41,11 @@ def run_tests(args=''):
     return result.returncode
 
 
-def generate_allure_report():
-    """生成并打开Allure报告"""
+def generate_allure_report(open_report: bool = True):
+    """
+    生成Allure报告
+    :param open_report: 生成后是否打开报告
+    """
     print("\n" + "=" * 80)
     print("生成Allure报告...")
     print("=" * 80)
@@ -36,15 +53,167 @@ def generate_allure_report():
     allure_results = os.path.join(REPORT_DIR, 'allure')
     allure_report = os.path.join(REPORT_DIR, 'allure-report')
     
+    # 压缩结果：相同内容的附件只保留一份，按配置缩小截图
+    if ALLURE_COMPACT and os.path.isdir(allure_results):
+        from utils.allure_compactor import compact_results, format_summary
+        print(format_summary(compact_results(allure_results)))
+    
     # 生成报告
     cmd = f'allure generate {allure_results} -o {allure_report} --clean'
     subprocess.run(cmd, shell=True)
     
+    if not open_report:
+        print(f"Allure报告已生成: {allure_report}")
+        return
+    
     print("\n正在打开Allure报告...")
     # 打开报告
     cmd = f'allure open {allure_report}'
     subprocess.run(cmd, shell=True)
 
+
+def generate_summary_report():
+    """不启动allure命令行，生成轻量摘要（reports/summary）"""
+    from utils.report_summary import ReportSummarizer, format_totals
+    summarizer = ReportSummarizer(os.path.join(REPORT_DIR, 'allure'))
+    summarizer.update()
+    print(f"{format_totals(summarizer.totals())}\n测试结果摘要已生成: {summarizer.html_path}")
+
+
+def generate_report_background(report: str = 'allure') -> threading.Thread:
+    """
+    在后台线程生成报告（不打开），测试结果不必等待报告生成
+    :param report: allure(Allure报告) 或 summary(轻量摘要)
+    :return: 生成报告的线程，下一次执行测试前需要join（--clean-alluredir会清空结果目录）
+    """
+    if report == 'summary':
+        thread = threading.Thread(target=generate_summary_report, name='summary-report')
+    else:
+        thread = threading.Thread(target=generate_allure_report, kwargs={'open_report': False},
+                                  name='allure-report')
+    thread.start()
+    return thread
+
+
+def available_memory_mb() -> Optional[int]:
+    """
+    获取可用物理内存(MB)：Linux读取/proc/meminfo，Windows调用GlobalMemoryStatusEx，其他系统使用psutil（如已安装）
+    :return: 可用内存，无法获取时为None
+    """
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) // 1024
+    except OSError:
+        pass
+    if sys.platform == 'win32':
+        import ctypes
+
+        class MemoryStatusEx(ctypes.Structure):
+            _fields_ = [
+                ('dwLength', ctypes.c_ulong), ('dwMemoryLoad', ctypes.c_ulong),
+                ('ullTotalPhys', ctypes.c_ulonglong), ('ullAvailPhys', ctypes.c_ulonglong),
+                ('ullTotalPageFile', ctypes.c_ulonglong), ('ullAvailPageFile', ctypes.c_ulonglong),
+                ('ullTotalVirtual', ctypes.c_ulonglong), ('ullAvailVirtual', ctypes.c_ulonglong),
+                ('ullAvailExtendedVirtual', ctypes.c_ulonglong),
+            ]
+
+        status = MemoryStatusEx()
+        status.dwLength = ctypes.sizeof(MemoryStatusEx)
+        if ctypes.windll.kernel32.GlobalMemoryStatusEx(ctypes.byref(status)):
+            return status.ullAvailPhys // (1024 * 1024)
+    try:
+        import psutil
+    except ImportError:
+        return None
+    return psutil.virtual_memory().available // (1024 * 1024)
+
+
+def auto_workers(engine: str = TEST_ENGINE) -> int:
+    """
+    根据CPU核数和可用内存确定xdist worker数：ui引擎每个worker持有一个浏览器，受内存限制
+    :param engine: 执行引擎 ui/api
+    :return: worker数
+    """
+    workers = os.cpu_count() or 1
+    if engine == 'ui':
+        memory = available_memory_mb()
+        if memory is None:
+            print(f"无法获取可用内存，worker数只按CPU核数确定: {workers}")
+        else:
+            workers = min(workers, memory // BROWSER_MEMORY_MB)
+    return max(1, workers)
+
+
+def _engine_of(pytest_args: List[str]) -> str:
+    """从pytest参数中获取执行引擎"""
+    for index, arg in enumerate(pytest_args):
+        if arg == '--engine' and index + 1 < len(pytest_args):
+            return pytest_args[index + 1]
+        if arg.startswith('--engine='):
+            return arg.split('=', 1)[1]
+    return TEST_ENGINE
+
+
+def _forget_test_modules():
+    """
+    移除已导入的用例、页面对象和conftest模块，进程内再次执行pytest时重新导入，
+    循环之间对这些文件的修改可以生效（config和utils的代码修改需要重新启动脚本；
+    utils中的会话状态如文件哈希、步骤耗时、数据加载统计由各插件在每次会话开始时重置）
+    """
+    for name, module in list(sys.modules.items()):
+        path = os.path.abspath(getattr(module, '__file__', None) or '')
+        if name == 'conftest' or any(path.startswith(os.path.join(BASE_DIR, package) + os.sep)
+                                     for package in ('tests', 'pages')):
+            del sys.modules[name]
+
+
+def run_parallel(pytest_args: List[str] = None, workers: int = None, loop: bool = False,
+                 report: str = 'allure') -> int:
+    """
+    进程内执行测试（pytest.main），并按需循环重跑失败的用例
+    第一轮使用xdist并行执行全部用例；之后每轮只以 --lf 重跑上次失败的用例，
+    失败用例通常很少，在当前进程中串行执行并复用跨轮次保留的浏览器，省去启动worker和浏览器的时间
+    :param pytest_args: 额外的pytest参数
+    :param workers: xdist worker数，None表示自动确定
+    :param loop: 是否循环重跑失败的用例
+    :param report: 后台生成的报告: allure(Allure报告), summary(轻量摘要), none(不生成)
+    :return: 最后一轮的退出码
+    """
+    from utils.driver_pool import WarmPoolPlugin
+    
+    pytest_args = list(pytest_args or [])
+    workers = workers or auto_workers(_engine_of(pytest_args))
+    args = pytest_args + (['-n', str(workers)] if workers > 1 else [])
+    print("=" * 80)
+    print(f"开始执行测试（进程内，worker数: {workers}）...")
+    print("=" * 80)
+    exit_code = int(pytest.main(args))
+    
+    warm_pool = WarmPoolPlugin()
+    report_thread = None
+    try:
+        while True:
+            print(f"\n测试结果: {'通过' if exit_code == 0 else '未通过'} (退出码 {exit_code})")
+            if report != 'none':
+                report_thread = generate_report_background(report)
+            if not loop or exit_code != pytest.ExitCode.TESTS_FAILED:
+                break
+            answer = input("按回车重跑失败的用例，输入q退出: ").strip().lower()
+            if report_thread is not None:
+                report_thread.join()
+            if answer == 'q':
+                break
+            _forget_test_modules()
+            exit_code = int(pytest.main(pytest_args + ['--lf'], plugins=[warm_pool]))
+    finally:
+        warm_pool.shutdown()
+        if report_thread is not None:
+            report_thread.join()
+    return exit_code
+
+
 def main():
     """主函数"""
     print("""
@@ -59,10 +228,11 @@ def main():
     4. 运行异常测试
     5. 运行指定用例（输入用例ID）
     6. 仅生成Allure报告
+    7. 并行运行所有测试（自动worker数），失败后快速重跑
     0. 退出
     """)
     
-    choice = input("请输入选项 (0-6): ").strip()
+    choice = input("请输入选项 (0-7): ").strip()
     
     if choice == '1':
         run_tests()
@@ -88,6 +258,9 @@ def main():
     elif choice == '6':
         generate_allure_report()
         
+    elif choice == '7':
+        run_parallel(loop=True)
+        
     elif choice == '0':
         print("退出程序")
         sys.exit(0)
@@ -97,5 +270,26 @@ def main():
         sys.exit(1)
 
 
+def parse_args(argv: List[str]):
+    """解析命令行参数，-- 之后的参数原样传给pytest"""
+    if '--' in argv:
+        index = argv.index('--')
+        argv, pytest_args = argv[:index], argv[index + 1:]
+    else:
+        pytest_args = []
+    parser = argparse.ArgumentParser(description="登录功能自动化测试执行脚本")
+    parser.add_argument('--parallel', action='store_true', help="进程内执行，使用xdist并行")
+    parser.add_argument('--workers', type=int, default=None, help="xdist worker数（默认按CPU核数和可用内存确定）")
+    parser.add_argument('--loop', action='store_true', help="执行后循环重跑上次失败的用例")
+    parser.add_argument('--report', choices=('allure', 'summary', 'none'), default='allure',
+                        help="测试结束后在后台生成的报告: allure, summary(不启动JVM的轻量摘要), none")
+    options = parser.parse_args(argv)
+    return options, pytest_args
+
+
 if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        options, pytest_args = parse_args(sys.argv[1:])
+        workers = options.workers or (None if options.parallel else 1)
+        sys.exit(run_parallel(pytest_args, workers, options.loop, options.report))
     main()
@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""
+Allure结果压缩测试
+验证相同内容的附件只保留一份、引用改写正确，以及重复压缩不再产生变化，不需要浏览器
+"""
+import json
+import os
+
+import pytest
+
+from utils.allure_compactor import compact_results, iter_attachments
+
+
+def _write(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+
+
+def _read(path):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+@pytest.fixture
+def results_dir(tmp_path):
+    """两个用例结果和一个容器，引用的环境信息附件内容相同，截图各不相同"""
+    files = {
+        'env1-attachment.txt': b'chrome headless',
+        'env2-attachment.txt': b'chrome headless',
+        'env3-attachment.txt': b'chrome headless',
+        'shot1-attachment.png': b'png-1',
+        'shot2-attachment.png': b'png-2',
+    }
+    for name, content in files.items():
+        (tmp_path / name).write_bytes(content)
+    _write(tmp_path / 'a-result.json', {
+        'name': 'TC001',
+        'attachments': [{'name': '环境', 'source': 'env1-attachment.txt', 'type': 'text/plain'}],
+        'steps': [{'name': '截图', 'attachments': [
+            {'name': '登录前截图', 'source': 'shot1-attachment.png', 'type': 'image/png'}
+        ]}],
+    })
+    _write(tmp_path / 'b-result.json', {
+        'name': 'TC002',
+        'attachments': [
+            {'name': '环境', 'source': 'env2-attachment.txt', 'type': 'text/plain'},
+            {'name': '登录前截图', 'source': 'shot2-attachment.png', 'type': 'image/png'},
+        ],
+    })
+    _write(tmp_path / 'c-container.json', {
+        'befores': [{'name': 'driver', 'attachments': [
+            {'name': '环境', 'source': 'env3-attachment.txt', 'type': 'text/plain'}
+        ]}],
+    })
+    return tmp_path
+
+
+def _sources(results_dir) -> list:
+    return sorted(attachment['source']
+                  for name in os.listdir(results_dir) if name.endswith(('-result.json', '-container.json'))
+                  for attachment in iter_attachments(_read(results_dir / name)))
+
+
+class TestCompactResults:
+    """compact_results测试类"""
+
+    def test_deduplicates_identical_attachments(self, results_dir):
+        """内容相同的附件合并为一个文件，所有引用（包括步骤和fixture中的）指向它"""
+        stats = compact_results(str(results_dir), max_width=0)
+        assert stats['attachments'] == 5
+        assert (stats['files_before'], stats['files_after']) == (5, 3)
+        assert stats['bytes_saved'] == 2 * len(b'chrome headless')
+
+        sources = _sources(results_dir)
+        assert len(set(sources)) == 3
+        env = [source for source in sources if source.endswith('.txt')]
+        assert len(env) == 3 and len(set(env)) == 1
+        for source in sources:
+            assert (results_dir / source).is_file()
+        assert not (results_dir / 'env2-attachment.txt').exists()
+
+    def test_idempotent(self, results_dir):
+        """再次压缩不改写结果，也不增删文件"""
+        compact_results(str(results_dir), max_width=0)
+        files = sorted(os.listdir(results_dir))
+        results = {name: _read(results_dir / name) for name in files if name.endswith('.json')}
+
+        stats = compact_results(str(results_dir), max_width=0)
+        assert stats['results_rewritten'] == 0
+        assert stats['bytes_saved'] == 0
+        assert stats['files_before'] == stats['files_after'] == 3
+        assert sorted(os.listdir(results_dir)) == files
+        assert {name: _read(results_dir / name) for name in results} == results
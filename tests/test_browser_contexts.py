@@ -0,0 +1,217 @@
+# -*- coding: utf-8 -*-
+"""
+共享浏览器上下文测试
+用模拟CDP的假WebDriver验证ContextPool的创建/销毁上下文、重新连接和内存采样，不需要真实浏览器
+"""
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from utils import browser_contexts
+from utils.browser_contexts import BrowserContextPlugin, ContextPool
+
+
+class FakeBrowser:
+    """模拟共享浏览器: targetId -> browserContextId，默认上下文为'default'"""
+
+    def __init__(self):
+        self.targets = {'initial': 'default'}
+        self.contexts = set()
+        self._ids = itertools.count(1)
+
+    def page_targets(self) -> list:
+        return list(self.targets)
+
+
+class FakeDriver:
+    """模拟连接到共享浏览器的WebDriver，CDP命令经由当前标签页发送，标签页已被销毁时失败"""
+
+    def __init__(self, browser: FakeBrowser, start_handle: str = 'initial'):
+        self.browser = browser
+        self.current_window_handle = start_handle
+        self.switch_to = SimpleNamespace(window=self._switch)
+        self.service = SimpleNamespace(stop=self._stop, process=SimpleNamespace(pid=4321))
+        self.healthy = True
+        self.stopped = False
+
+    @property
+    def window_handles(self) -> list:
+        return self.browser.page_targets()
+
+    def _switch(self, handle: str):
+        if handle not in self.browser.targets:
+            raise RuntimeError(f"no such window: {handle}")
+        self.current_window_handle = handle
+
+    def _stop(self):
+        self.stopped = True
+
+    def execute_script(self, script: str):
+        if not self.healthy:
+            raise RuntimeError("chromedriver连接已断开")
+        return 1
+
+    def execute_cdp_cmd(self, cmd: str, params: dict) -> dict:
+        browser = self.browser
+        if self.current_window_handle not in browser.targets:
+            raise RuntimeError("target closed")
+        if cmd == 'Target.createBrowserContext':
+            context_id = f'context-{next(browser._ids)}'
+            browser.contexts.add(context_id)
+            return {'browserContextId': context_id}
+        if cmd == 'Target.createTarget':
+            target_id = f'target-{next(browser._ids)}'
+            browser.targets[target_id] = params.get('browserContextId', 'default')
+            return {'targetId': target_id}
+        if cmd == 'Target.disposeBrowserContext':
+            browser.contexts.remove(params['browserContextId'])
+            for target_id, context_id in list(browser.targets.items()):
+                if context_id == params['browserContextId']:
+                    del browser.targets[target_id]
+            return {}
+        if cmd == 'Target.closeTarget':
+            browser.targets.pop(params['targetId'], None)
+            return {}
+        if cmd == 'Target.getBrowserContexts':
+            return {'browserContextIds': sorted(browser.contexts)}
+        if cmd == 'Target.getTargets':
+            return {'targetInfos': [{'targetId': target_id, 'type': 'page', 'browserContextId': context_id}
+                                    for target_id, context_id in browser.targets.items()]}
+        raise AssertionError(f"未模拟的CDP命令: {cmd}")
+
+
+@pytest.fixture
+def fake_browser(monkeypatch):
+    """替换attach_chrome，返回连接到假共享浏览器的WebDriver"""
+    browser = FakeBrowser()
+    drivers = []
+
+    def attach(address):
+        # 模拟chromedriver连接后停留在最后打开的标签页（可能属于其他进程的上下文）
+        drivers.append(FakeDriver(browser, start_handle=browser.page_targets()[-1]))
+        return drivers[-1]
+
+    monkeypatch.setattr(browser_contexts, 'attach_chrome', attach)
+    browser.drivers = drivers
+    return browser
+
+
+class TestContextPool:
+    """ContextPool测试类"""
+
+    def test_acquire_switches_to_new_context(self, fake_browser):
+        """acquire创建上下文和标签页并切换过去，主标签页在默认上下文中"""
+        pool = ContextPool('127.0.0.1:9222')
+        driver = pool.acquire()
+        assert fake_browser.targets[driver.current_window_handle] == pool._context_id
+        assert fake_browser.targets[pool._home] == 'default'
+        assert pool._home != 'initial'
+
+    def test_release_disposes_context(self, fake_browser):
+        """release销毁上下文并回到主标签页，连接复用给下一个用例"""
+        pool = ContextPool('127.0.0.1:9222')
+        driver = pool.acquire()
+        pool.release(driver)
+        assert fake_browser.contexts == set()
+        assert driver.current_window_handle == pool._home
+        pool.release(pool.acquire())
+        assert pool.stats()['launches'] == 1
+        assert pool.stats()['reuses'] == 1
+
+    def test_home_not_in_other_process_context(self, fake_browser):
+        """连接时停留在其他进程的上下文标签页上，该上下文被销毁后本进程仍能正常销毁自己的上下文"""
+        other = ContextPool('127.0.0.1:9222')
+        other.acquire()
+        pool = ContextPool('127.0.0.1:9222')
+        driver = pool.acquire()
+        other.release(other.driver)
+        pool.release(driver)
+        assert fake_browser.contexts == set()
+        assert pool.driver is not None
+        assert pool.reattaches == 0
+
+    def test_create_home_skips_closed_tab(self, fake_browser):
+        """连接时所在的标签页已被销毁，换一个标签页发送createTarget"""
+        other = ContextPool('127.0.0.1:9222')
+        other.acquire()
+        pool = ContextPool('127.0.0.1:9222')
+        pool.driver = FakeDriver(fake_browser, start_handle=other.driver.current_window_handle)
+        other.release(other.driver)
+        home = pool._create_home()
+        assert fake_browser.targets[home] == 'default'
+
+    def test_reattach_when_unhealthy(self, fake_browser):
+        """连接失效时断开并重新连接，旧连接的主标签页被关闭"""
+        pool = ContextPool('127.0.0.1:9222')
+        driver = pool.acquire()
+        pool.release(driver)
+        old_home = pool._home
+        driver.healthy = False
+        pool.release(pool.acquire())
+        assert driver.stopped
+        assert old_home not in fake_browser.targets
+        assert pool.reattaches == 1
+        assert pool.stats()['relaunches'] == 1
+        assert len(fake_browser.drivers) == 2
+
+    def test_release_failure_detaches(self, fake_browser):
+        """销毁上下文失败时断开连接，下次acquire重新连接"""
+        pool = ContextPool('127.0.0.1:9222')
+        driver = pool.acquire()
+        del fake_browser.targets[pool._home]
+        pool.release(driver)
+        assert pool.driver is None
+        assert driver.stopped
+        pool.acquire()
+        assert pool.attaches == 2
+
+    def test_shutdown_closes_home(self, fake_browser):
+        """shutdown销毁当前上下文并关闭主标签页"""
+        pool = ContextPool('127.0.0.1:9222')
+        pool.acquire()
+        pool.shutdown()
+        assert fake_browser.page_targets() == ['initial']
+        assert fake_browser.contexts == set()
+
+
+class TestMemorySampler:
+    """BrowserContextPlugin内存采样测试类"""
+
+    def test_context_count_excludes_home_tabs(self, fake_browser):
+        """并发上下文数只统计用例上下文中的标签页，不含各进程的主标签页"""
+        shared = browser_contexts.SharedBrowser(headless=True)
+        shared.driver = FakeDriver(fake_browser)
+        pools = [ContextPool('127.0.0.1:9222') for _ in range(3)]
+        for pool in pools:
+            pool.acquire()
+        assert shared.context_count() == 3
+        pools[0].release(pools[0].driver)
+        assert shared.context_count() == 2
+
+    def test_sampler_keeps_peak(self, monkeypatch):
+        """保留并发最多的采样，内存包含各进程chromedriver"""
+        counts = iter([1, 3, 3, 2, 0])
+        plugin = BrowserContextPlugin(SimpleNamespace(workerinput={'browser_context_address': '127.0.0.1:9222'}),
+                                      headless=True)
+        memory = iter([100.0, 300.0, 320.0, 400.0, 50.0])
+        plugin.browser = SimpleNamespace(context_count=lambda: next(counts), memory_mb=lambda: next(memory))
+        plugin.driver_pids = {1, 2}
+        monkeypatch.setattr(browser_contexts, 'process_tree_memory_mb', lambda pid: 10.0)
+        rounds = iter([False] * 5 + [True])
+        monkeypatch.setattr(plugin, '_stop', SimpleNamespace(wait=lambda interval: next(rounds)))
+        plugin._sample(0)
+        assert plugin.peak == (3, 340.0)
+
+    def test_sampler_skips_failed_samples(self, monkeypatch):
+        """采样失败或浏览器内存不可用时跳过"""
+        def context_count():
+            raise OSError("DevTools不可用")
+
+        plugin = BrowserContextPlugin(SimpleNamespace(workerinput={'browser_context_address': '127.0.0.1:9222'}),
+                                      headless=True)
+        plugin.browser = SimpleNamespace(context_count=context_count, memory_mb=lambda: None)
+        rounds = iter([False, True])
+        monkeypatch.setattr(plugin, '_stop', SimpleNamespace(wait=lambda interval: next(rounds)))
+        plugin._sample(0)
+        assert plugin.peak is None
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite用例库测试
+验证查询语句的解析以及按查询取出的用例与ExcelReader读出的格式一致，不需要浏览器
+"""
+import openpyxl
+import pytest
+
+from utils.case_store import CaseStore, build_where, split_terms
+
+
+HEADERS = ['case_id', 'case_name', 'username', 'password', 'expected', 'description', 'run', 'priority', 'tags']
+ROWS = [
+    ['TC001', '正确账号登录', 'admin', 'secret', 'success', '', 'yes', 'P0', 'smoke'],
+    ['TC002', '登录 and 注销', 'admin', 'wrong', 'fail', '', 'yes', 'P1', 'smoke, regression'],
+    ['TC003', '空密码', 'admin', '', 'fail', '', 'no', 'P1', 'regression'],
+    ['TC004', '空账号', '', 'secret', 'fail', '', 'yes', 'P2', ''],
+]
+
+
+@pytest.fixture
+def store(tmp_path):
+    """导入了ROWS的用例库"""
+    excel_file = tmp_path / 'cases.xlsx'
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = '登录测试用例'
+    sheet.append(HEADERS)
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(excel_file)
+
+    case_store = CaseStore(str(tmp_path / 'cases.sqlite3'))
+    case_store.sync(str(excel_file), '登录测试用例')
+    yield case_store
+    case_store.close()
+
+
+class TestQueryParsing:
+    """查询语句解析测试类"""
+
+    def test_split_on_and(self):
+        """按 and 拆分条件，不区分大小写"""
+        assert split_terms('tag:smoke AND not expected=success and priority<=1') == [
+            'tag:smoke', 'not expected=success', 'priority<=1'
+        ]
+
+    def test_quoted_value_not_split(self):
+        """引号中的空格和 and 属于值的一部分"""
+        where, params = build_where('case_name="登录 and 注销" and tag:\'smoke\'')
+        assert where.startswith('case_name = ? AND EXISTS')
+        assert params == ['登录 and 注销', 'smoke']
+
+    def test_negation_and_operators(self):
+        """not 前缀、比较运算符和通配符"""
+        where, params = build_where('not expected=success and case_id~TC00* and priority<=P1')
+        assert where == 'NOT (expected = ?) AND case_id GLOB ? AND priority <= ?'
+        assert params == ['success', 'TC00*', 1]
+
+    def test_empty_query(self):
+        """空查询匹配全部用例"""
+        assert build_where('') == ('1', [])
+
+    @pytest.mark.parametrize('query', ['case_name="abc', 'unknown=1', 'priority<=high', 'expected'])
+    def test_invalid_query(self, query):
+        """引号未闭合、未知列、无法识别的优先级和无法解析的条件"""
+        with pytest.raises(ValueError):
+            build_where(query)
+
+
+class TestCaseStoreQuery:
+    """用例库查询测试类"""
+
+    def test_query_matches_excel_format(self, store):
+        """run列为yes/no，优先级为Excel中的写法"""
+        cases = store.query('登录测试用例', 'case_id=TC002')
+        assert len(cases) == 1
+        assert cases[0]['run'] == 'yes'
+        assert cases[0]['priority'] == 'P1'
+        assert cases[0]['case_name'] == '登录 and 注销'
+
+    def test_query_only_enabled(self, store):
+        """默认只返回启用的用例，按Excel行顺序"""
+        assert [case['case_id'] for case in store.query('登录测试用例', 'tag:regression')] == ['TC002']
+        cases = store.query('登录测试用例', 'tag:regression', only_enabled=False)
+        assert [case['case_id'] for case in cases] == ['TC002', 'TC003']
+
+    def test_query_quoted_value(self, store):
+        """引号中含 and 的值按整体匹配"""
+        cases = store.query('登录测试用例', 'case_name="登录 and 注销" and expected=fail')
+        assert [case['case_id'] for case in cases] == ['TC002']
+
+    def test_query_priority(self, store):
+        """优先级按数字比较"""
+        assert [case['case_id'] for case in store.query('登录测试用例', 'priority<=P1')] == ['TC001', 'TC002']
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+"""
+Excel读取器测试
+验证流式过滤和case_id索引，不需要浏览器
+"""
+import openpyxl
+import pytest
+
+from utils.excel_reader import ExcelReader
+
+
+HEADERS = ['case_id', 'case_name', 'expected', 'run', 'priority']
+ROWS = [
+    ['TC001', '正确账号登录', 'success', 'yes', 'P0'],
+    ['TC002', '错误密码', 'fail', 'yes', 'P1'],
+    ['TC003', '已停用', 'fail', 'no', 'P1'],
+    ['TC004', '重复ID（第一行未启用）', 'fail', 'no', 'P2'],
+    ['TC004', '重复ID', 'fail', 'yes', 'P2'],
+    ['TC002', '重复ID（以第一行为准）', 'success', 'yes', 'P2'],
+    ['TC005', '公式', '=A2', 'yes', 'P2'],
+]
+
+
+@pytest.fixture
+def excel_file(tmp_path):
+    """带有启用、未启用和重复ID的工作表"""
+    path = tmp_path / 'cases.xlsx'
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = '登录测试用例'
+    sheet.append(HEADERS)
+    for row in ROWS:
+        sheet.append(row)
+    workbook.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def reader(excel_file):
+    reader = ExcelReader(excel_file, sheet_name='登录测试用例')
+    yield reader
+    reader.close()
+
+
+class TestExcelReader:
+    """ExcelReader测试类"""
+
+    def test_iter_cases_filters(self, reader):
+        """只返回启用的用例，按列条件过滤"""
+        assert [case['case_id'] for case in reader.iter_cases(expected='fail')] == ['TC002', 'TC004']
+        cases = reader.read_data(case_id=lambda value: value.startswith('TC00'), priority='P0')
+        assert [case['case_name'] for case in cases] == ['正确账号登录']
+
+    def test_unknown_column(self, reader):
+        """过滤不存在的列时报错"""
+        with pytest.raises(KeyError):
+            reader.read_data(owner='x')
+
+    def test_index_only_enabled_rows(self, reader):
+        """索引只保存启用用例的行"""
+        assert reader.get_case_by_id('TC001')['case_name'] == '正确账号登录'
+        assert reader.get_case_by_id('TC003') is None
+        assert reader.get_case_by_id('TC999') is None
+        assert set(reader._index) == {'TC001', 'TC002', 'TC005'}
+
+    def test_index_first_row_wins(self, reader):
+        """同一ID出现多次时以第一行为准，第一行未启用时该ID不可查"""
+        assert reader.get_case_by_id('TC002')['case_name'] == '错误密码'
+        assert reader.get_case_by_id('TC004') is None
+
+    def test_formula_by_default(self, excel_file):
+        """默认返回公式本身，data_only=True时返回上次保存的计算结果（openpyxl写入的文件没有缓存结果）"""
+        reader = ExcelReader(excel_file, sheet_name='登录测试用例')
+        assert reader.get_case_by_id('TC005')['expected'] == '=A2'
+        reader.close()
+        reader = ExcelReader(excel_file, sheet_name='登录测试用例', data_only=True)
+        assert reader.get_case_by_id('TC005')['expected'] is None
+        reader.close()
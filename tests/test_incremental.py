@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""
+增量执行测试
+验证用例指纹随用例数据、依赖源文件、执行引擎、被测服务和构建号变化，不需要浏览器
+"""
+import os
+from types import ModuleType, SimpleNamespace
+
+import pytest
+
+from pages.login_page import LoginPage
+from utils import incremental
+from utils.incremental import dependency_files, fingerprint, page_object_files, server_target
+
+
+@pytest.fixture
+def item():
+    """模拟参数化的pytest用例：测试模块引用LoginPage"""
+    module = ModuleType('test_fake')
+    module.LoginPage = LoginPage
+    return SimpleNamespace(
+        nodeid='tests/test_login.py::TestLogin::test_login_with_excel_data[TC001]',
+        callspec=SimpleNamespace(params={'test_case': {'case_id': 'TC001', 'password': 'a'}}),
+        path=os.path.join(incremental.BASE_DIR, 'tests', 'test_login.py'),
+        module=module,
+    )
+
+
+@pytest.fixture(autouse=True)
+def clear_digests():
+    incremental._file_digests.clear()
+    yield
+    incremental._file_digests.clear()
+
+
+class TestFingerprint:
+    """用例指纹测试类"""
+
+    def test_stable(self, item):
+        """输入相同时指纹相同"""
+        assert fingerprint(item, 'build-1') == fingerprint(item, 'build-1')
+
+    @pytest.mark.parametrize('kwargs', [
+        {'build_id': 'build-2'},
+        {'engine': 'api'},
+        {'target': server_target(local_server=True)},
+    ])
+    def test_changes_with_run_settings(self, item, kwargs):
+        """构建号、执行引擎和被测服务变化时指纹变化"""
+        base = {'build_id': 'build-1', 'engine': 'ui', 'target': server_target()}
+        assert fingerprint(item, **base) != fingerprint(item, **dict(base, **kwargs))
+
+    def test_changes_with_case_data(self, item):
+        """Excel行内容变化时指纹变化"""
+        before = fingerprint(item, 'build-1')
+        item.callspec.params['test_case']['password'] = 'b'
+        assert fingerprint(item, 'build-1') != before
+
+    def test_changes_with_dependency_source(self, item, tmp_path):
+        """依赖的源文件变化时指纹变化（新会话重新计算哈希）"""
+        source = tmp_path / 'login_api.py'
+        source.write_text('A = 1\n', encoding='utf-8')
+        before = fingerprint(item, 'build-1', dependencies=[str(source)])
+        source.write_text('A = 2\n', encoding='utf-8')
+        assert fingerprint(item, 'build-1', dependencies=[str(source)]) == before
+        incremental._file_digests.clear()
+        assert fingerprint(item, 'build-1', dependencies=[str(source)]) != before
+
+
+class TestDependencies:
+    """指纹依赖测试类"""
+
+    def test_page_object_files_include_bases(self, item):
+        """测试模块引用的页面对象及其基类所在的文件"""
+        names = [os.path.basename(path) for path in page_object_files(item.module)]
+        assert names == ['base_page.py', 'login_page.py']
+
+    def test_engine_and_server_files(self):
+        """api引擎加入login_api.py，本地替身服务加入login_server.py"""
+        assert dependency_files('ui', False) == []
+        names = [os.path.basename(path) for path in dependency_files('api', True)]
+        assert names == ['login_api.py', 'login_server.py']
+
+    def test_local_server_target_ignores_port(self):
+        """本地替身服务只记录是否使用及其模拟延迟"""
+        assert server_target(True) == server_target(True, None)
+        assert server_target(True, 0.2) != server_target(True)
+        assert server_target(False) == incremental.LOGIN_URL
@@ -5,15 +5,26 @@
 """
 import pytest
 import allure
+from urllib.parse import urljoin
 from pages.login_page import LoginPage
-from utils.excel_reader import ExcelReader
-from config.config import TEST_DATA_FILE, ERROR_MESSAGE
+from utils.case_store import query_test_cases
+from utils.test_data_cache import load_test_cases
+from config.config import TEST_DATA_FILE, ERROR_MESSAGE, AUTH_PROBE_PATH
 
 
-# 读取Excel测试数据
-excel_reader = ExcelReader(TEST_DATA_FILE, sheet_name='登录测试用例')
-test_data = excel_reader.read_data()
-excel_reader.close()
+def pytest_generate_tests(metafunc):
+    """
+    参数化Excel测试数据：
+    指定--case-query时从SQLite用例库中只加载匹配的用例，否则读取全部启用的用例（优先使用编译后的快照）
+    """
+    if 'test_case' not in metafunc.fixturenames:
+        return
+    query = metafunc.config.getoption('--case-query')
+    if query:
+        test_data = query_test_cases(TEST_DATA_FILE, '登录测试用例', query)
+    else:
+        test_data = load_test_cases(TEST_DATA_FILE, sheet_name='登录测试用例')
+    metafunc.parametrize('test_case', test_data, ids=[case['case_id'] for case in test_data])
 
 
 @allure.feature('登录功能')
@@ -21,11 +32,10 @@ excel_reader.close()
 class TestLogin:
     """登录功能测试类"""
     
-    @pytest.mark.parametrize('test_case', test_data, ids=[case['case_id'] for case in test_data])
-    def test_login_with_excel_data(self, driver, test_case):
+    def test_login_with_excel_data(self, login_page, test_case):
         """
         使用Excel数据驱动的登录测试
-        :param driver: WebDriver fixture
+        :param login_page: 登录页面fixture（--engine ui/api）
         :param test_case: 测试用例数据
         """
         # 从测试用例中提取数据
@@ -53,18 +63,14 @@ class TestLogin:
                 attachment_type=allure.attachment_type.TEXT
             )
         
-        # 创建登录页面对象
-        login_page = LoginPage(driver)
-        
         # 步骤1: 打开登录页面
         with allure.step("步骤1: 打开登录页面"):
             login_page.open_login_page()
-            login_page.sleep(1)  # 等待页面加载
+            login_page.wait_for_page_ready()  # 等待页面加载
         
         # 步骤2: 执行登录操作
         with allure.step(f"步骤2: 输入账号 '{username}' 和密码进行登录"):
-            login_page.login(username, password)
-            login_page.sleep(1)  # 等待响应
+            login_page.login(username, password)  # 内部等待跳转或错误提示出现
         
         # 步骤3: 验证结果
         with allure.step("步骤3: 验证登录结果"):
@@ -117,7 +123,6 @@ class TestLogin:
         
         # 验证错误提示会消失
         with allure.step("验证错误提示会在1秒后消失"):
-            login_page.sleep(1)  # 等待1秒
             is_disappeared = login_page.wait_error_message_disappear()
             # 注意：根据实际需求，这个断言可能需要调整
             # 如果提示应该消失但没消失，取消下面的注释
@@ -144,16 +149,32 @@ class TestLoginPositive:
         
         with allure.step("打开登录页面"):
             login_page.open_login_page()
-            login_page.sleep(1)
+            login_page.wait_for_page_ready()
         
         with allure.step("输入正确的账号和密码"):
             login_page.login('513admin', 'Ld@513.c')
-            login_page.sleep(2)
         
         with allure.step("验证登录成功"):
             is_success = login_page.is_login_successful()
             login_page.take_screenshot("登录成功")
             assert is_success, "登录失败: 使用正确的账号密码应该登录成功"
+    
+    @allure.title("登录后访问首页")
+    @allure.description("以超级管理员登录后访问站点首页，应进入登录后的页面而不是被重定向回登录页"
+                        "（登录状态优先从缓存注入，只有缓存缺失或失效时才通过界面登录）")
+    @allure.severity(allure.severity_level.CRITICAL)
+    def test_home_page_after_login(self, logged_in_driver):
+        """测试登录后访问首页"""
+        login_page = LoginPage(logged_in_driver)
+        
+        with allure.step("访问站点首页"):
+            login_page.open(urljoin(login_page.login_url, AUTH_PROBE_PATH))
+        
+        with allure.step("验证未被重定向到登录页"):
+            current_url = login_page.get_current_url()
+            login_page.take_screenshot("登录后首页")
+            assert current_url.split('?')[0].rstrip('/') != login_page.login_url.split('?')[0].rstrip('/'), \
+                f"登录后访问首页被重定向回登录页: {current_url}"
 
 
 @allure.feature('登录功能')
@@ -170,11 +191,10 @@ class TestLoginNegative:
         
         with allure.step("打开登录页面"):
             login_page.open_login_page()
-            login_page.sleep(1)
+            login_page.wait_for_page_ready()
         
         with allure.step("输入错误的账号和正确的密码"):
             login_page.login('wronguser', 'Ld@513.c')
-            login_page.sleep(1)
         
         with allure.step("验证显示错误提示"):
             assert login_page.is_error_message_displayed(), "未显示错误提示"
@@ -190,11 +210,10 @@ class TestLoginNegative:
         
         with allure.step("打开登录页面"):
             login_page.open_login_page()
-            login_page.sleep(1)
+            login_page.wait_for_page_ready()
         
         with allure.step("输入正确的账号和错误的密码"):
             login_page.login('513admin', 'wrongpassword')
-            login_page.sleep(1)
         
         with allure.step("验证显示错误提示"):
             assert login_page.is_error_message_displayed(), "未显示错误提示"
@@ -210,11 +229,10 @@ class TestLoginNegative:
         
         with allure.step("打开登录页面"):
             login_page.open_login_page()
-            login_page.sleep(1)
+            login_page.wait_for_page_ready()
         
         with allure.step("输入空账号和正确的密码"):
             login_page.login('', 'Ld@513.c')
-            login_page.sleep(1)
         
         with allure.step("验证登录失败"):
             # 可能显示错误提示或者登录按钮不可点击
@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+"""
+LPT调度测试
+用模拟的xdist worker验证按历史耗时从长到短分配用例，不需要浏览器
+"""
+from types import SimpleNamespace
+
+from utils.duration_history import DEFAULT_DURATION, predict, simulate_makespan
+from utils.lpt_scheduler import LPTScheduling
+
+
+class FakeNode:
+    """模拟xdist的WorkerController，记录收到的用例下标"""
+
+    def __init__(self, name: str):
+        self.gateway = SimpleNamespace(id=name)
+        self.shutting_down = False
+        self.received = []
+
+    def send_runtest_some(self, indices):
+        self.received.extend(indices)
+
+    def shutdown(self):
+        self.shutting_down = True
+
+
+def _scheduler(durations: dict, workers: int = 2):
+    """按durations预测耗时、已收集完用例的调度器（相当于 -n workers）"""
+    config = SimpleNamespace(getvalue=lambda name: [f'{workers}*popen'], getoption=lambda name: None)
+    scheduler = LPTScheduling(config, None, lambda nodeid: durations[nodeid])
+    nodes = [FakeNode(f'gw{index}') for index in range(workers)]
+    for node in nodes:
+        scheduler.add_node(node)
+    for node in nodes:
+        scheduler.add_node_collection(node, list(durations))
+    return scheduler, nodes
+
+
+class TestLPTScheduling:
+    """LPTScheduling测试类"""
+
+    def test_longest_first(self):
+        """按预测耗时降序排列，耗时相同的用例保持收集顺序"""
+        durations = {'a': 1.0, 'b': 5.0, 'c': 3.0, 'd': 5.0, 'e': 2.0}
+        scheduler, nodes = _scheduler(durations)
+        scheduler.schedule()
+        assert scheduler.schedule_order == ['b', 'd', 'c', 'e', 'a']
+        # 每个worker先领取两个用例，轮流分配
+        assert [[scheduler.collection[index] for index in node.received] for node in nodes] == [
+            ['b', 'c'], ['d', 'e']
+        ]
+
+    def test_idle_worker_takes_longest_remaining(self):
+        """最先完成用例的worker领取剩余用例中最长的一个，用例发完后关闭worker"""
+        durations = {'a': 1.0, 'b': 5.0, 'c': 3.0, 'd': 5.0, 'e': 2.0, 'f': 4.0}
+        scheduler, nodes = _scheduler(durations)
+        scheduler.schedule()
+        assert [scheduler.collection[index] for index in scheduler.pending] == ['e', 'a']
+        scheduler.mark_test_complete(nodes[1], nodes[1].received[0])
+        assert scheduler.collection[nodes[1].received[-1]] == 'e'
+        scheduler.mark_test_complete(nodes[0], nodes[0].received[0])
+        assert scheduler.collection[nodes[0].received[-1]] == 'a'
+        assert not scheduler.pending
+        scheduler.mark_test_complete(nodes[0], nodes[0].received[1])
+        assert nodes[0].shutting_down
+
+
+class TestDurationPrediction:
+    """耗时预测和makespan模拟测试类"""
+
+    def test_predict(self):
+        """有历史用历史平均，没有时用已知用例的平均值，没有任何历史时用默认值"""
+        history = {'a': 2.0, 'b': 4.0}
+        assert predict(history, 'a') == 2.0
+        assert predict(history, 'new') == 3.0
+        assert predict({}, 'new') == DEFAULT_DURATION
+
+    def test_lpt_makespan_not_worse(self):
+        """LPT顺序的总耗时不超过收集顺序"""
+        durations = [1.0, 1.0, 1.0, 1.0, 4.0]
+        assert simulate_makespan(durations, 2) == 6.0
+        assert simulate_makespan(sorted(durations, reverse=True), 2) == 4.0
+        assert simulate_makespan([], 2) == 0.0
@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+"""
+资源拦截测试
+验证拦截规则、performance日志解析、页面基准的本机地址归一化以及拦截列表的清除，不需要浏览器
+"""
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from utils.driver_pool import DriverPool
+from utils.resource_blocker import (
+    ResourceBlockingPlugin, ResourceProfile, ResourceRules, blocker_for, parse_network_events
+)
+
+
+def _entry(method: str, **params) -> dict:
+    """构造driver.get_log('performance')中的一条日志"""
+    return {'message': json.dumps({'message': {'method': method, 'params': params}})}
+
+
+class TestResourceRules:
+    """ResourceRules测试类"""
+
+    def test_block_by_type_and_pattern(self):
+        """按资源类型或URL通配符拦截，页面文档从不拦截"""
+        rules = ResourceRules(deny_types=['Image'], deny_patterns=['*analytics*'], allow_patterns=[])
+        assert rules.should_block('http://a.com/logo.png', 'Image')
+        assert rules.should_block('http://analytics.com/a.js', 'Script')
+        assert not rules.should_block('http://a.com/app.js', 'Script')
+        assert not rules.should_block('http://a.com/analytics', 'Document')
+
+    def test_allow_overrides_deny(self):
+        """放行规则优先于拦截规则"""
+        rules = ResourceRules(deny_types=['Image'], deny_patterns=[], allow_patterns=['*/captcha/*'])
+        assert not rules.should_block('http://a.com/captcha/1.png', 'Image')
+        assert rules.should_block('http://a.com/logo.png', 'Image')
+
+    def test_browser_patterns(self):
+        """有放行规则时不能直接下发拦截通配符"""
+        assert ResourceRules(deny_patterns=['*ads*'], allow_patterns=[]).browser_patterns() == ['*ads*']
+        assert ResourceRules(deny_patterns=['*ads*'], allow_patterns=['*ok*']).browser_patterns() == []
+
+
+class TestParseNetworkEvents:
+    """parse_network_events测试类"""
+
+    def test_requests_bytes_and_blocked(self):
+        """整理请求的URL、类型、大小以及是否被拦截，忽略无法解析的日志"""
+        entries = [
+            _entry('Network.requestWillBeSent', requestId='1', type='Document', request={'url': 'http://a.com/'}),
+            _entry('Network.requestWillBeSent', requestId='2', type='Image', request={'url': 'http://a.com/a.png'}),
+            _entry('Network.requestWillBeSent', requestId='3', request={'url': 'http://a.com/x'}),
+            _entry('Network.loadingFinished', requestId='1', encodedDataLength=1024),
+            _entry('Network.loadingFailed', requestId='2', blockedReason='inspector'),
+            _entry('Network.loadingFailed', requestId='3', errorText='net::ERR_FAILED'),
+            _entry('Network.loadingFinished', requestId='99', encodedDataLength=1),
+            {'message': 'not json'},
+            {},
+        ]
+        requests = parse_network_events(entries)
+        assert requests == {
+            '1': {'url': 'http://a.com/', 'type': 'Document', 'bytes': 1024, 'blocked': False},
+            '2': {'url': 'http://a.com/a.png', 'type': 'Image', 'bytes': 0, 'blocked': True},
+            '3': {'url': 'http://a.com/x', 'type': 'Other', 'bytes': 0, 'blocked': False},
+        }
+
+
+class TestResourceProfile:
+    """ResourceProfile测试类"""
+
+    @pytest.fixture
+    def profile(self, tmp_path):
+        return ResourceProfile(str(tmp_path / 'resource_profile.json'))
+
+    def test_loopback_port_ignored(self, profile, tmp_path):
+        """本机地址去掉端口存储，读取时还原为当前页面的端口"""
+        profile.update('http://127.0.0.1:8001/login', {
+            'http://127.0.0.1:8001/logo.png': {'type': 'Image', 'bytes': 100},
+            'https://cdn.example.com/font.woff': {'type': 'Font', 'bytes': 50},
+        }, load_ms=120.0)
+        with open(tmp_path / 'resource_profile.json', encoding='utf-8') as f:
+            stored = json.load(f)
+        assert list(stored) == ['http://127.0.0.1/login']
+        assert set(stored['http://127.0.0.1/login']['resources']) == {
+            'http://127.0.0.1/logo.png', 'https://cdn.example.com/font.woff'
+        }
+
+        baseline = ResourceProfile(profile.path).get('http://127.0.0.1:9002/login')
+        assert baseline['load_ms'] == 120.0
+        assert set(baseline['resources']) == {'http://127.0.0.1:9002/logo.png', 'https://cdn.example.com/font.woff'}
+
+    def test_non_loopback_port_kept(self, profile):
+        """非本机地址保留端口"""
+        profile.update('http://test.example.com:8080/login', {}, load_ms=10.0)
+        assert profile.get('http://test.example.com:8080/login') is not None
+        assert profile.get('http://test.example.com:9090/login') is None
+
+    def test_expired_or_missing_baseline(self, profile):
+        """没有基准加载耗时或已过期时为None"""
+        profile.update('http://127.0.0.1:8001/login', {'http://127.0.0.1:8001/a.js': {'type': 'Script', 'bytes': 1}})
+        assert profile.get('http://127.0.0.1:8001/login') is None
+        profile.update('http://127.0.0.1:8001/login', {}, load_ms=100.0)
+        profile.pages['http://127.0.0.1/login']['measured_at'] = time.time() - profile.ttl - 1
+        assert profile.get('http://127.0.0.1:8001/login') is None
+
+    def test_merge_keeps_known_size(self, profile):
+        """被拦截或命中缓存的请求大小为0，保留基准中记录的大小"""
+        page_url = 'http://127.0.0.1:8001/login'
+        profile.update(page_url, {'http://127.0.0.1:8001/a.png': {'type': 'Image', 'bytes': 300}}, load_ms=1.0)
+        profile.update(page_url, {'http://127.0.0.1:8002/a.png': {'type': 'Image', 'bytes': 0}})
+        assert profile.get(page_url)['resources']['http://127.0.0.1:8001/a.png']['bytes'] == 300
+
+
+class TestBlockedUrlsReset:
+    """拦截列表清除测试类"""
+
+    def test_pool_reset_clears_blocked_urls(self, tmp_path):
+        """driver池复用浏览器前清除仍生效的拦截列表，插件卸载后解除拦截器"""
+        commands = []
+
+        class FakeDriver:
+            window_handles = ['main']
+            switch_to = SimpleNamespace(window=lambda handle: None)
+
+            def execute_cdp_cmd(self, cmd, params):
+                commands.append((cmd, params))
+
+            def delete_all_cookies(self):
+                pass
+
+            def execute_script(self, script):
+                pass
+
+            def get(self, url):
+                pass
+
+        driver = FakeDriver()
+        plugin = ResourceBlockingPlugin(None, profile=ResourceProfile(str(tmp_path / 'resource_profile.json')))
+        plugin.attach(driver)
+        blocker_for(driver)._blocking = True
+        DriverPool.reset(driver)
+        DriverPool.reset(driver)
+        assert commands == [('Network.setBlockedURLs', {'urls': []})]
+
+        plugin.pytest_unconfigure(None)
+        assert blocker_for(driver) is None
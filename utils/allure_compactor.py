@@ -0,0 +1,250 @@
+# -*- coding: utf-8 -*-
+"""
+Allure结果压缩
+按内容哈希存储附件：内容相同的附件（每个用例重复的测试环境信息、登录页面URL、相同的截图等）只保留一份，
+结果JSON中的引用改写为同一个文件；可选把截图缩小到指定宽度并按指定质量重新编码为JPEG（需要安装Pillow）。
+压缩在生成报告前执行，输出节省的字节数，--measure 时对比压缩前后 allure generate 的耗时
+
+用法:
+    python -m utils.allure_compactor                                   # 压缩reports/allure
+    python -m utils.allure_compactor --max-width 1280 --quality 75     # 同时缩小截图
+    python -m utils.allure_compactor --measure                         # 对比压缩前后生成报告的耗时
+"""
+import argparse
+import hashlib
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterator, Optional
+
+from config.config import ALLURE_REPORT_DIR, SCREENSHOT_MAX_WIDTH, SCREENSHOT_QUALITY
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow为可选依赖，未安装时只做去重
+    Image = None
+
+
+logger = logging.getLogger(__name__)
+
+RESULT_SUFFIXES = ('-result.json', '-container.json')
+ATTACHMENT_SUFFIX = '-attachment'
+IMAGE_TYPES = ('image/png', 'image/jpeg')
+
+
+def iter_attachments(node) -> Iterator[Dict]:
+    """遍历结果/容器JSON中的附件（包括步骤和前后置fixture中的附件）"""
+    if not isinstance(node, dict):
+        return
+    yield from node.get('attachments') or []
+    for key in ('steps', 'befores', 'afters'):
+        for child in node.get(key) or []:
+            yield from iter_attachments(child)
+
+
+def _digest(path: str) -> str:
+    """文件内容的sha256"""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def _reencode(path: str, max_width: int, quality: int) -> Optional[bytes]:
+    """
+    缩小并重新编码截图为JPEG
+    :return: 新的图片内容，无需处理或处理后没有变小时为None
+    """
+    with Image.open(path) as image:
+        if image.format == 'JPEG' and image.width <= max_width:
+            return None
+        if image.width > max_width:
+            image = image.resize((max_width, max(1, round(image.height * max_width / image.width))), Image.LANCZOS)
+        buffer = io.BytesIO()
+        image.convert('RGB').save(buffer, 'JPEG', quality=quality, optimize=True)
+    data = buffer.getvalue()
+    return data if data and len(data) < os.path.getsize(path) else None
+
+
+def _link_or_copy(source: str, target: str):
+    """创建硬链接，不支持时复制"""
+    try:
+        os.link(source, target)
+    except OSError:
+        shutil.copyfile(source, target)
+
+
+def _write_json(path: str, data):
+    """先写临时文件再替换"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def compact_results(results_dir: str = ALLURE_REPORT_DIR, max_width: int = SCREENSHOT_MAX_WIDTH,
+                    quality: int = SCREENSHOT_QUALITY, workers: int = 4) -> Dict:
+    """
+    压缩Allure结果目录
+    先写入按内容命名的附件，再改写结果JSON，最后删除旧附件：中途中断时结果目录仍然可以生成报告
+    :param results_dir: allure结果目录（--alluredir）
+    :param max_width: 截图最大宽度(像素)，None或0表示不缩小截图
+    :param quality: 重新编码截图的JPEG质量(1-95)
+    :param workers: 计算哈希和重新编码的线程数
+    :return: 统计信息
+    """
+    start = time.perf_counter()
+    documents = {}
+    for name in os.listdir(results_dir):
+        if name.endswith(RESULT_SUFFIXES):
+            path = os.path.join(results_dir, name)
+            try:
+                with open(path, encoding='utf-8') as f:
+                    documents[path] = json.load(f)
+            except (OSError, ValueError) as e:
+                logger.warning("跳过无法读取的结果文件 %s: %s", name, e)
+
+    types = {}
+    for data in documents.values():
+        for attachment in iter_attachments(data):
+            source = attachment.get('source')
+            if source and os.path.isfile(os.path.join(results_dir, source)):
+                types.setdefault(source, attachment.get('type'))
+    sources = sorted(types)
+    bytes_before = sum(os.path.getsize(os.path.join(results_dir, source)) for source in sources)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        digests = dict(zip(sources, executor.map(lambda s: _digest(os.path.join(results_dir, s)), sources)))
+
+    # 相同内容（且扩展名相同）的附件对应同一个文件
+    originals = {}
+    for source in sources:
+        key = (digests[source], os.path.splitext(source)[1])
+        originals.setdefault(key, source)
+
+    reencode = bool(max_width)
+    if reencode and Image is None:
+        logger.warning("未安装Pillow，跳过截图缩小和重新编码（pip install Pillow）")
+        reencode = False
+    images = [key for key, source in originals.items() if reencode and types[source] in IMAGE_TYPES]
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        encoded = dict(zip(images, executor.map(
+            lambda key: _reencode(os.path.join(results_dir, originals[key]), max_width, quality), images
+        )))
+
+    # 写入按内容命名的附件
+    targets = {}
+    for key, source in originals.items():
+        data = encoded.get(key)
+        if data is not None:
+            target = f"{hashlib.sha256(data).hexdigest()[:32]}{ATTACHMENT_SUFFIX}.jpg"
+            with open(os.path.join(results_dir, target), 'wb') as f:
+                f.write(data)
+            targets[key] = (target, 'image/jpeg')
+            continue
+        target = f"{key[0][:32]}{ATTACHMENT_SUFFIX}{key[1]}"
+        if target != source and not os.path.exists(os.path.join(results_dir, target)):
+            _link_or_copy(os.path.join(results_dir, source), os.path.join(results_dir, target))
+        targets[key] = (target, None)
+
+    # 改写结果JSON中的引用
+    rewritten = 0
+    for path, data in documents.items():
+        changed = False
+        for attachment in iter_attachments(data):
+            source = attachment.get('source')
+            if source not in digests:
+                continue
+            target, attachment_type = targets[(digests[source], os.path.splitext(source)[1])]
+            if attachment['source'] != target:
+                attachment['source'] = target
+                changed = True
+            if attachment_type and attachment.get('type') != attachment_type:
+                attachment['type'] = attachment_type
+                changed = True
+        if changed:
+            _write_json(path, data)
+            rewritten += 1
+
+    # 删除不再被引用的旧附件
+    kept = {target for target, _ in targets.values()}
+    for source in sources:
+        if source not in kept:
+            os.remove(os.path.join(results_dir, source))
+    bytes_after = sum(os.path.getsize(os.path.join(results_dir, target)) for target in kept)
+
+    return {
+        'attachments': sum(1 for data in documents.values() for _ in iter_attachments(data)),
+        'files_before': len(sources),
+        'files_after': len(kept),
+        'reencoded': sum(1 for data in encoded.values() if data is not None),
+        'results_rewritten': rewritten,
+        'bytes_before': bytes_before,
+        'bytes_after': bytes_after,
+        'bytes_saved': bytes_before - bytes_after,
+        'seconds': round(time.perf_counter() - start, 3),
+    }
+
+
+def format_summary(stats: Dict) -> str:
+    """格式化压缩统计"""
+    ratio = stats['bytes_saved'] / stats['bytes_before'] if stats['bytes_before'] else 0.0
+    return (f"附件引用: {stats['attachments']}, 附件文件: {stats['files_before']} -> {stats['files_after']}, "
+            f"重新编码截图: {stats['reencoded']}\n"
+            f"附件大小: {stats['bytes_before'] / 1024:.1f}KB -> {stats['bytes_after'] / 1024:.1f}KB, "
+            f"节省 {stats['bytes_saved'] / 1024:.1f}KB ({ratio:.1%}), 耗时 {stats['seconds']}s")
+
+
+def time_report_generation(results_dir: str) -> float:
+    """
+    生成一次Allure报告（输出到临时目录）并返回耗时
+    :param results_dir: allure结果目录
+    :return: 耗时(秒)
+    """
+    with tempfile.TemporaryDirectory() as output_dir:
+        start = time.perf_counter()
+        subprocess.run(['allure', 'generate', results_dir, '-o', output_dir, '--clean'],
+                       check=True, stdout=subprocess.DEVNULL)
+        return time.perf_counter() - start
+
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="压缩Allure结果目录：附件按内容去重，可选缩小截图")
+    parser.add_argument('results_dir', nargs='?', default=ALLURE_REPORT_DIR, help="allure结果目录")
+    parser.add_argument('--max-width', type=int, default=SCREENSHOT_MAX_WIDTH,
+                        help="截图最大宽度(像素)，0表示不缩小（需要Pillow）")
+    parser.add_argument('--quality', type=int, default=SCREENSHOT_QUALITY, help="截图重新编码的JPEG质量(1-95)")
+    parser.add_argument('--measure', action='store_true', help="对比压缩前后 allure generate 的耗时（需要allure命令行）")
+    options = parser.parse_args(argv)
+
+    if not os.path.isdir(options.results_dir):
+        print(f"结果目录不存在: {options.results_dir}")
+        return 1
+    measure = options.measure and shutil.which('allure') is not None
+    if options.measure and not measure:
+        print("未找到allure命令行，跳过报告生成耗时对比")
+
+    with tempfile.TemporaryDirectory() as original_dir:
+        if measure:
+            original_copy = os.path.join(original_dir, 'allure')
+            shutil.copytree(options.results_dir, original_copy)
+        stats = compact_results(options.results_dir, options.max_width, options.quality)
+        print(format_summary(stats))
+        if measure:
+            before = time_report_generation(original_copy)
+            after = time_report_generation(options.results_dir)
+            print(f"报告生成耗时: {before:.2f}s -> {after:.2f}s, 加速 {before / after:.2f}x")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,153 @@
+# -*- coding: utf-8 -*-
+"""
+失败产物后台写入器
+截图、页面源码等文件和Allure附件的写盘操作交给有界线程池执行，测试线程不阻塞在磁盘IO上
+"""
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from uuid import uuid4
+
+import allure
+import allure_commons
+
+from config.config import ARTIFACT_WRITER_WORKERS, ARTIFACT_WRITER_MAX_PENDING
+
+
+logger = logging.getLogger(__name__)
+
+
+class ArtifactWriter:
+    """后台产物写入器类"""
+
+    def __init__(self, max_workers: int = ARTIFACT_WRITER_WORKERS,
+                 max_pending: int = ARTIFACT_WRITER_MAX_PENDING):
+        """
+        初始化写入器
+        :param max_workers: 写盘线程数
+        :param max_pending: 最多排队的写入任务数，队列满时提交方阻塞等待，避免大量失败时内存暴涨
+        """
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='artifact-writer')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._futures = set()
+        self._lock = threading.Lock()
+        self.written = 0
+        self.errors = []
+
+    def submit(self, fn, *args, **kwargs):
+        """
+        提交一个后台写入任务
+        :param fn: 写入函数
+        """
+        self._slots.acquire()
+        try:
+            future = self._executor.submit(fn, *args, **kwargs)
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._futures.add(future)
+        future.add_done_callback(self._on_done)
+
+    def write_file(self, path: str, data):
+        """
+        后台写入文件
+        :param path: 文件路径
+        :param data: bytes或str内容
+        """
+        self.submit(_write_file, path, data)
+
+    def attach(self, body, name: str, attachment_type, extension: str = None):
+        """
+        添加Allure附件：附件元数据在当前线程登记到正在执行的测试上，附件内容在后台写盘
+        :param body: 附件内容
+        :param name: 附件名称
+        :param attachment_type: allure.attachment_type
+        :param extension: 文件扩展名
+        """
+        reporter = _allure_reporter()
+        file_name = None
+        if reporter is not None:
+            try:
+                file_name = reporter._attach(uuid4(), name=name, attachment_type=attachment_type,
+                                             extension=extension)
+            except Exception:
+                file_name = None
+        if file_name is None:
+            # 未启用allure-pytest、其内部接口不可用或当前没有正在执行的测试，退回同步附加
+            allure.attach(body, name=name, attachment_type=attachment_type, extension=extension)
+            return
+        self.submit(allure_commons.plugin_manager.hook.report_attached_data, body=body, file_name=file_name)
+
+    def flush(self):
+        """等待所有已提交的写入任务完成"""
+        with self._lock:
+            pending = list(self._futures)
+        for future in pending:
+            future.exception()
+
+    def shutdown(self):
+        """完成剩余写入并关闭线程池"""
+        self.flush()
+        self._executor.shutdown(wait=True)
+
+    def _on_done(self, future):
+        """写入任务完成回调"""
+        with self._lock:
+            self._futures.discard(future)
+        self._slots.release()
+        error = future.exception()
+        if error is not None:
+            self.errors.append(error)
+            logger.warning("后台写入产物失败: %s", error)
+        else:
+            self.written += 1
+
+
+def _write_file(path: str, data):
+    """写入文件"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    mode = 'wb' if isinstance(data, bytes) else 'w'
+    encoding = None if isinstance(data, bytes) else 'utf-8'
+    with open(path, mode, encoding=encoding) as f:
+        f.write(data)
+
+
+def _allure_reporter():
+    """
+    获取allure-pytest的AllureReporter，用于在测试线程上登记附件
+    :return: AllureReporter实例，不可用时返回None
+    """
+    for plugin in allure_commons.plugin_manager.get_plugins():
+        reporter = getattr(plugin, 'allure_logger', None)
+        if reporter is not None and hasattr(reporter, '_attach'):
+            return reporter
+    return None
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def get_artifact_writer() -> ArtifactWriter:
+    """
+    获取进程内共享的写入器，首次调用时创建
+    :return: ArtifactWriter
+    """
+    global _writer
+    with _writer_lock:
+        if _writer is None:
+            _writer = ArtifactWriter()
+        return _writer
+
+
+def shutdown_artifact_writer():
+    """会话结束时调用：等待所有写入完成并关闭写入器"""
+    global _writer
+    with _writer_lock:
+        writer, _writer = _writer, None
+    if writer is not None:
+        writer.shutdown()
+        if writer.errors:
+            logger.warning("共有 %d 个产物写入失败", len(writer.errors))
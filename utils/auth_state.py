@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+"""
+登录状态缓存
+某个账号在某个站点成功登录一次后，保存浏览器的cookie和localStorage/sessionStorage，
+之后的用例直接把登录状态注入到新的或池化复用的浏览器中，跳过完整的界面登录流程。
+缓存以文件形式保存（xdist多个worker共享，文件锁保证同一账号只有一个worker去登录），
+超过有效期或注入后探测发现已失效的状态会被淘汰并重新登录
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urljoin, urlsplit
+
+from config.config import AUTH_STATE_DIR, AUTH_STATE_TTL, AUTH_PROBE_PATH
+from utils.file_lock import FileLock
+
+
+logger = logging.getLogger(__name__)
+
+# 读取当前源下的localStorage和sessionStorage
+CAPTURE_STORAGE_SCRIPT = """
+var dump = function (storage) {
+    var result = {};
+    for (var i = 0; i < storage.length; i++) {
+        var key = storage.key(i);
+        result[key] = storage.getItem(key);
+    }
+    return result;
+};
+return [dump(window.localStorage), dump(window.sessionStorage)];
+"""
+
+# 写入localStorage和sessionStorage
+RESTORE_STORAGE_SCRIPT = """
+var local = arguments[0], session = arguments[1];
+Object.keys(local).forEach(function (key) { window.localStorage.setItem(key, local[key]); });
+Object.keys(session).forEach(function (key) { window.sessionStorage.setItem(key, session[key]); });
+"""
+
+CLEAR_STORAGE_SCRIPT = "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+
+# 注入cookie时只保留WebDriver add_cookie接受的字段
+COOKIE_FIELDS = ('name', 'value', 'path', 'domain', 'secure', 'httpOnly', 'expiry', 'sameSite')
+
+
+def origin_of(url: str) -> str:
+    """获取URL的源，如 https://demo.com/login -> https://demo.com"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+class AuthStateCache:
+    """按 账号+站点 保存的登录状态缓存"""
+
+    def __init__(self, store_dir: str = AUTH_STATE_DIR, ttl: float = AUTH_STATE_TTL,
+                 probe_path: str = AUTH_PROBE_PATH):
+        """
+        初始化缓存
+        :param store_dir: 状态文件目录
+        :param ttl: 有效期(秒)，cookie自身更早过期时以cookie为准
+        :param probe_path: 注入后用于确认登录状态仍有效的页面路径（未登录时应跳转到登录页）
+        """
+        self.store_dir = store_dir
+        self.ttl = ttl
+        self.probe_path = probe_path
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.restore_time = 0.0  # 成功注入并确认登录状态的累计耗时(秒)
+        self.login_time = 0.0  # 界面登录并保存状态的累计耗时(秒)
+
+    def _path(self, username: str, base_url: str) -> str:
+        """状态文件路径"""
+        key = hashlib.sha256(f"{username}@{origin_of(base_url)}".encode('utf-8')).hexdigest()[:32]
+        return os.path.join(self.store_dir, f"{key}.json")
+
+    def load(self, username: str, base_url: str) -> Optional[Dict]:
+        """
+        读取未过期的登录状态
+        :param username: 账号
+        :param base_url: 站点地址
+        :return: 状态字典，不存在或已过期时为None
+        """
+        path = self._path(username, base_url)
+        try:
+            with open(path, encoding='utf-8') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if state.get('expires_at', 0) <= time.time():
+            self.evict(username, base_url)
+            return None
+        return state
+
+    def save(self, username: str, base_url: str, state: Dict):
+        """保存登录状态（先写临时文件再替换，读者不会读到半个文件）"""
+        os.makedirs(self.store_dir, exist_ok=True)
+        path = self._path(username, base_url)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(state, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def evict(self, username: str, base_url: str, created_at: float = None):
+        """
+        淘汰登录状态
+        :param created_at: 只淘汰该时间创建的状态（其他进程可能已保存了新的状态）
+        """
+        if created_at is not None:
+            state = self.load(username, base_url)
+            if state is None or state['created_at'] != created_at:
+                return
+        try:
+            os.remove(self._path(username, base_url))
+            self.evictions += 1
+        except OSError:
+            pass
+
+    def capture(self, driver, username: str, base_url: str) -> Dict:
+        """
+        从已登录的浏览器中保存登录状态（需要在站点的页面上调用，storage按源隔离）
+        :param driver: WebDriver实例
+        :param username: 账号
+        :param base_url: 站点地址
+        :return: 状态字典
+        """
+        cookies = driver.get_cookies()
+        local_storage, session_storage = driver.execute_script(CAPTURE_STORAGE_SCRIPT)
+        now = time.time()
+        expiries = [cookie['expiry'] for cookie in cookies if cookie.get('expiry')]
+        state = {
+            'username': username,
+            'origin': origin_of(base_url),
+            'created_at': now,
+            'expires_at': min([now + self.ttl] + expiries),
+            'cookies': [{key: cookie[key] for key in COOKIE_FIELDS if key in cookie} for cookie in cookies],
+            'local_storage': local_storage or {},
+            'session_storage': session_storage or {},
+        }
+        self.save(username, base_url, state)
+        return state
+
+    def inject(self, driver, state: Dict):
+        """
+        把登录状态注入浏览器：打开站点源（cookie和storage只能写入当前源），写入cookie和storage
+        :param driver: WebDriver实例
+        :param state: 状态字典
+        """
+        origin = state['origin']
+        if origin_of(driver.current_url) != origin:
+            driver.get(origin + '/')
+        for cookie in state['cookies']:
+            driver.add_cookie(cookie)
+        if state['local_storage'] or state['session_storage']:
+            driver.execute_script(RESTORE_STORAGE_SCRIPT, state['local_storage'], state['session_storage'])
+
+    def probe(self, driver, login_url: str) -> bool:
+        """
+        确认注入的登录状态有效：打开探测页面，没有被重定向到登录页即为有效
+        :param driver: WebDriver实例
+        :param login_url: 登录页面地址
+        :return: True表示有效
+        """
+        driver.get(urljoin(origin_of(login_url) + '/', self.probe_path.lstrip('/')))
+        return driver.current_url.split('?')[0].rstrip('/') != login_url.split('?')[0].rstrip('/')
+
+    def ensure_logged_in(self, driver, username: str, password: str, login_url: str,
+                         login: Callable[[object, str, str], None]) -> bool:
+        """
+        保证浏览器处于已登录状态：优先注入缓存的登录状态，缓存缺失、过期或失效时执行登录并保存状态。
+        只有登录过程持有文件锁：同一账号同时只有一个进程执行登录，其他进程等待后直接使用其结果
+        :param driver: WebDriver实例
+        :param username: 账号
+        :param password: 密码
+        :param login_url: 登录页面地址
+        :param login: 执行界面登录的函数(driver, username, password)，登录失败时应抛出异常
+        :return: True表示使用了缓存的登录状态
+        """
+        tried = self._try_restore(driver, username, login_url, self.load(username, login_url))
+        if tried is True:
+            return True
+
+        with FileLock(self._path(username, login_url) + '.lock'):
+            # 等锁期间其他进程可能已经重新登录并保存了新的状态
+            state = self.load(username, login_url)
+            if state is not None and state['created_at'] != tried:
+                if self._try_restore(driver, username, login_url, state) is True:
+                    return True
+
+            self.misses += 1
+            start = time.perf_counter()
+            login(driver, username, password)
+            self.capture(driver, username, login_url)
+            self.login_time += time.perf_counter() - start
+            return False
+
+    def _try_restore(self, driver, username: str, login_url: str, state: Optional[Dict]):
+        """
+        注入并探测登录状态
+        :return: True表示成功；失败时返回所尝试状态的created_at（没有状态时为None）
+        """
+        if state is None:
+            return None
+        start = time.perf_counter()
+        self.inject(driver, state)
+        if self.probe(driver, login_url):
+            self.hits += 1
+            self.restore_time += time.perf_counter() - start
+            return True
+        logger.info("缓存的登录状态已失效，重新登录: %s", username)
+        self.evict(username, login_url, created_at=state['created_at'])
+        driver.delete_all_cookies()
+        driver.execute_script(CLEAR_STORAGE_SCRIPT)
+        return state['created_at']
+
+    def stats(self) -> Dict[str, int]:
+        """
+        获取缓存统计
+        :return: {'hits', 'misses', 'evictions', 'restore_time', 'login_time'}
+        """
+        return {'hits': self.hits, 'misses': self.misses, 'evictions': self.evictions,
+                'restore_time': round(self.restore_time, 3), 'login_time': round(self.login_time, 3)}
@@ -0,0 +1,170 @@
+# -*- coding: utf-8 -*-
+"""
+基准测试统计
+对本地登录替身服务执行用例，统计每个用例的总耗时、浏览器启动耗时、各步骤耗时以及每分钟执行用例数，
+用来衡量测试框架自身的开销（被测服务延迟可控，几乎不引入额外耗时）
+"""
+import json
+import os
+import time
+from typing import Dict, List
+
+import pytest
+
+from utils.driver_pool import driver_pool_stats_key
+from utils.step_timing import add_listener, percentile, remove_listener
+
+
+STEP_TIMINGS_PROPERTY = 'benchmark_step_timings'
+
+
+def describe(values: List[float]) -> Dict[str, float]:
+    """耗时分布: 次数、合计、平均、p50、p95、最大"""
+    return {
+        'count': len(values),
+        'total': round(sum(values), 3),
+        'mean': round(sum(values) / len(values), 3) if values else 0.0,
+        'p50': round(percentile(values, 50), 3),
+        'p95': round(percentile(values, 95), 3),
+        'max': round(max(values), 3) if values else 0.0,
+    }
+
+
+class StepTimer:
+    """timed_step监听器：记录页面对象各步骤的耗时（与--step-timings使用同一套计时）"""
+
+    def __init__(self):
+        self.finished: List[tuple] = []
+
+    def __call__(self, step: str, seconds: float):
+        self.finished.append((step, round(seconds, 4)))
+
+    def take(self) -> List[tuple]:
+        """取出并清空已完成的步骤耗时"""
+        finished, self.finished = self.finished, []
+        return finished
+
+
+class BenchmarkPlugin:
+    """基准测试插件：xdist下worker把步骤耗时放在报告中带回主进程，统一由主进程汇总并保存"""
+
+    def __init__(self, config, output_dir: str):
+        """
+        初始化插件
+        :param config: pytest配置
+        :param output_dir: 结果保存目录
+        """
+        self.config = config
+        self.output_dir = output_dir
+        self.step_timer = StepTimer()
+        add_listener(self.step_timer)
+        self.cases: Dict[str, Dict] = {}
+        self.steps: Dict[str, List[float]] = {}
+        self.driver_pool = None
+        self.started_at = None
+        self.finished_at = None
+        self.saved_to = None
+
+    def pytest_unconfigure(self, config):
+        remove_listener(self.step_timer)
+
+    def pytest_sessionstart(self, session):
+        self.started_at = time.perf_counter()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        """把本阶段的步骤耗时放进报告"""
+        outcome = yield
+        report = outcome.get_result()
+        timings = self.step_timer.take()
+        if timings:
+            report.user_properties.append((STEP_TIMINGS_PROPERTY, timings))
+
+    def pytest_runtest_logreport(self, report):
+        """累计每个用例各阶段的耗时和步骤耗时"""
+        case = self.cases.setdefault(report.nodeid, {'seconds': 0.0, 'outcome': 'passed'})
+        case['seconds'] = round(case['seconds'] + report.duration, 3)
+        if report.failed:
+            case['outcome'] = 'failed'
+        elif report.skipped:
+            case['outcome'] = 'skipped'
+        for name, value in report.user_properties:
+            if name != STEP_TIMINGS_PROPERTY:
+                continue
+            for step, seconds in value:
+                self.steps.setdefault(step, []).append(seconds)
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_sessionfinish(self, session):
+        """主进程汇总并保存结果"""
+        self.finished_at = time.perf_counter()
+        if hasattr(self.config, 'workerinput'):
+            return
+        self.driver_pool = session.config.stash.get(driver_pool_stats_key, None)
+        self.saved_to = save_summary(self.summary(), self.output_dir)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """输出基准测试结果"""
+        if self.saved_to is None:
+            return
+        terminalreporter.section("基准测试")
+        for line in format_summary(self.summary()):
+            terminalreporter.write_line(line)
+        terminalreporter.write_line(f"结果已保存: {self.saved_to}")
+
+    def summary(self) -> Dict:
+        """
+        汇总基准测试结果
+        :return: 结果字典
+        """
+        executed = {nodeid: case for nodeid, case in self.cases.items() if case['outcome'] != 'skipped'}
+        wall_time = (self.finished_at or time.perf_counter()) - (self.started_at or time.perf_counter())
+        return {
+            'wall_time': round(wall_time, 3),
+            'cases': len(executed),
+            'failed': sum(1 for case in executed.values() if case['outcome'] == 'failed'),
+            'cases_per_minute': round(len(executed) / wall_time * 60, 1) if wall_time > 0 else 0.0,
+            'case_time': describe([case['seconds'] for case in executed.values()]),
+            'driver_pool': self.driver_pool,
+            'steps': {step: describe(values) for step, values in sorted(self.steps.items())},
+            'per_case': executed,
+        }
+
+
+def format_summary(summary: Dict) -> List[str]:
+    """格式化基准测试结果为文本行"""
+    case_time = summary['case_time']
+    lines = [
+        f"用例数: {summary['cases']}, 失败: {summary['failed']}, 总耗时: {summary['wall_time']}s, "
+        f"每分钟执行: {summary['cases_per_minute']} 个",
+        f"单用例耗时: 平均 {case_time['mean']}s, p50 {case_time['p50']}s, "
+        f"p95 {case_time['p95']}s, 最大 {case_time['max']}s",
+    ]
+    pool = summary['driver_pool']
+    if pool:
+        lines.append(
+            f"浏览器启动: {pool['launches']} 次, 累计 {pool['launch_time']}s; "
+            f"状态重置累计 {pool['reset_time']}s"
+        )
+    if summary['steps']:
+        lines.append(f"{'步骤':<40}{'次数':>6}{'平均(s)':>10}{'p50(s)':>10}{'p95(s)':>10}{'最大(s)':>10}")
+        for step, stats in summary['steps'].items():
+            lines.append(
+                f"{step:<40}{stats['count']:>6}{stats['mean']:>10}{stats['p50']:>10}"
+                f"{stats['p95']:>10}{stats['max']:>10}"
+            )
+    return lines
+
+
+def save_summary(summary: Dict, output_dir: str) -> str:
+    """
+    保存基准测试结果
+    :param summary: 结果字典
+    :param output_dir: 输出目录
+    :return: 文件路径
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    path = os.path.join(output_dir, f"benchmark_{time.strftime('%Y%m%d_%H%M%S')}.json")
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    return path
@@ -0,0 +1,462 @@
+# -*- coding: utf-8 -*-
+"""
+共享浏览器 + 独立浏览器上下文
+只启动一个Chrome（开启remote debugging），每个进程（xdist worker）通过debuggerAddress连接到它，
+每个用例通过CDP Target.createBrowserContext创建一个独立的上下文（cookie、storage、缓存互相隔离），
+用例结束后销毁上下文。多个并发用例共享浏览器主进程、GPU进程和网络进程，每个用例只多占一个渲染进程。
+
+注意：连接到同一个浏览器的各进程都能看到所有标签页，用例中不要遍历或关闭 window_handles 中的其他窗口
+
+用法:
+    pytest -n 4 --browser-contexts                          # 用例共享一个Chrome
+    python -m utils.browser_contexts --measure 4 --headless  # 对比每GB内存可并发的用例数
+"""
+import argparse
+import json
+import logging
+import os
+import socket
+import sys
+import threading
+import time
+from typing import Dict, Optional
+
+import pytest
+
+from config.config import BENCHMARK_REPORT_DIR, LOGIN_URL
+from utils.browser_factory import attach_chrome, create_driver
+
+
+logger = logging.getLogger(__name__)
+
+# --measure 的结果，作为终端摘要中"一个用例一个浏览器进程"的对比基准
+MEASURE_FILE = os.path.join(BENCHMARK_REPORT_DIR, 'browser_contexts.json')
+# 各进程连接共享浏览器用的chromedriver的pid，通过测试报告传回主进程，计入内存采样
+DRIVER_PID_PROPERTY = 'browser_context_driver_pid'
+
+
+def _free_port() -> int:
+    """获取一个空闲端口"""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _process_tree(pid: int) -> list:
+    """进程及其所有子进程的pid（读取/proc）"""
+    parents = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                parents[int(entry)] = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, ValueError, IndexError):
+            continue
+    tree, pending = [], [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(child for child, parent in parents.items() if parent == current)
+    return tree
+
+
+def _proc_memory_kb(pid: int) -> int:
+    """单个进程的PSS(KB)，内核不支持smaps_rollup时退回RSS"""
+    try:
+        with open(f'/proc/{pid}/smaps_rollup') as f:
+            for line in f:
+                if line.startswith('Pss:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    try:
+        with open(f'/proc/{pid}/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') // 1024
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def process_tree_memory_mb(pid: int) -> Optional[float]:
+    """
+    进程树占用的内存(MB)：Chrome是多进程的，优先使用PSS（共享内存按进程数分摊），避免重复计算
+    :param pid: 根进程pid（chromedriver）
+    :return: 内存，无法获取时为None
+    """
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+    if psutil is not None:
+        try:
+            root = psutil.Process(pid)
+            total = 0
+            for process in [root] + root.children(recursive=True):
+                try:
+                    info = process.memory_full_info()
+                    total += getattr(info, 'pss', info.rss)
+                except (psutil.NoSuchProcess, psutil.AccessDenied):
+                    continue
+            return round(total / (1024 * 1024), 1)
+        except psutil.NoSuchProcess:
+            return None
+    if not os.path.isdir('/proc'):
+        return None
+    return round(sum(_proc_memory_kb(child) for child in _process_tree(pid)) / 1024, 1)
+
+
+def tests_per_gb(mb_per_test: Optional[float]) -> Optional[float]:
+    """每GB内存可并发的用例数"""
+    return round(1024 / mb_per_test, 1) if mb_per_test else None
+
+
+class SharedBrowser:
+    """开启remote debugging的共享Chrome"""
+
+    def __init__(self, headless: bool):
+        """
+        :param headless: 是否无头模式
+        """
+        self.headless = headless
+        self.driver = None
+        self.address = None
+
+    def start(self) -> 'SharedBrowser':
+        """启动浏览器"""
+        port = _free_port()
+        self.driver = create_driver('chrome', self.headless, arguments=(
+            f'--remote-debugging-port={port}', '--remote-allow-origins=*'
+        ))
+        self.address = f'127.0.0.1:{port}'
+        return self
+
+    def context_count(self) -> int:
+        """用例上下文中打开的标签页数（不含默认上下文中各进程的主标签页）"""
+        created = set(self.driver.execute_cdp_cmd('Target.getBrowserContexts', {})['browserContextIds'])
+        targets = self.driver.execute_cdp_cmd('Target.getTargets', {})['targetInfos']
+        return sum(1 for target in targets
+                   if target.get('type') == 'page' and target.get('browserContextId') in created)
+
+    def memory_mb(self) -> Optional[float]:
+        """浏览器进程树（含启动它的chromedriver）占用的内存(MB)"""
+        return process_tree_memory_mb(self.driver.service.process.pid)
+
+    def stop(self):
+        """关闭浏览器"""
+        if self.driver is not None:
+            try:
+                self.driver.quit()
+            except Exception:
+                pass
+            self.driver = None
+
+
+class ContextPool:
+    """
+    与DriverPool接口一致的上下文池：每个进程一个连接到共享浏览器的WebDriver，
+    acquire时创建新的浏览器上下文和标签页并切换过去，release时销毁上下文
+    """
+
+    def __init__(self, debugger_address: str):
+        """
+        :param debugger_address: 共享浏览器的调试地址
+        """
+        self.debugger_address = debugger_address
+        self.driver = None
+        self._home = None
+        self._context_id = None
+        self.attaches = 0  # 连接共享浏览器次数
+        self.reattaches = 0  # 连接失效后重新连接次数
+        self.contexts = 0  # 创建的上下文数（即用例数）
+        self.attach_time = 0.0
+        self.context_time = 0.0  # 创建和销毁上下文累计耗时(秒)
+
+    def acquire(self):
+        """
+        创建独立的浏览器上下文
+        :return: 已切换到新上下文标签页的WebDriver
+        """
+        if self.driver is not None and not self._is_healthy():
+            self.reattaches += 1
+            self._detach()
+        if self.driver is None:
+            start = time.perf_counter()
+            self.driver = attach_chrome(self.debugger_address)
+            self._home = self._create_home()
+            self.attach_time += time.perf_counter() - start
+            self.attaches += 1
+
+        start = time.perf_counter()
+        self._context_id = self.driver.execute_cdp_cmd(
+            'Target.createBrowserContext', {'disposeOnDetach': True}
+        )['browserContextId']
+        target_id = self.driver.execute_cdp_cmd('Target.createTarget', {
+            'url': 'about:blank', 'browserContextId': self._context_id, 'width': 1920, 'height': 1080
+        })['targetId']
+        # chromedriver的窗口句柄即CDP的targetId
+        self.driver.switch_to.window(target_id)
+        self.context_time += time.perf_counter() - start
+        self.contexts += 1
+        return self.driver
+
+    def release(self, driver, broken: bool = False):
+        """
+        销毁用例的浏览器上下文（连同其中的标签页、cookie和storage）
+        :param driver: WebDriver实例
+        :param broken: 为True时同时断开连接，下次acquire时重新连接
+        """
+        if self._context_id is None:
+            return
+        start = time.perf_counter()
+        try:
+            self.driver.switch_to.window(self._home)
+            self.driver.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': self._context_id})
+        except Exception as e:
+            logger.warning("销毁浏览器上下文失败，将重新连接共享浏览器: %s", e)
+            broken = True
+        finally:
+            self._context_id = None
+            self.context_time += time.perf_counter() - start
+        if broken:
+            self._detach()
+
+    def _create_home(self) -> str:
+        """
+        在默认浏览器上下文中为本进程新建主标签页并切换过去，CDP命令和销毁上下文都经由它发送。
+        连接后chromedriver所在的标签页可能属于其他进程正在使用的上下文，随时会被销毁，不能作为主标签页
+        :return: 主标签页的targetId
+        """
+        error = None
+        for handle in self.driver.window_handles:
+            try:
+                self.driver.switch_to.window(handle)
+                # 不指定browserContextId即在默认上下文中创建
+                target_id = self.driver.execute_cdp_cmd('Target.createTarget', {'url': 'about:blank'})['targetId']
+            except Exception as e:
+                # 该标签页所在的上下文刚被其他进程销毁，换一个标签页发送
+                error = e
+                continue
+            self.driver.switch_to.window(target_id)
+            return target_id
+        raise RuntimeError(f"无法在共享浏览器中创建主标签页: {error}")
+
+    def _is_healthy(self) -> bool:
+        try:
+            return self.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _detach(self):
+        """关闭本进程的主标签页，停止连接用的chromedriver（不发送quit，共享浏览器保持运行）"""
+        try:
+            self.driver.execute_cdp_cmd('Target.closeTarget', {'targetId': self._home})
+        except Exception:
+            pass
+        try:
+            self.driver.service.stop()
+        except Exception:
+            pass
+        self.driver = None
+        self._home = None
+
+    def shutdown(self):
+        """销毁当前上下文并断开连接"""
+        if self.driver is not None:
+            self.release(self.driver)
+            self._detach()
+
+    def stats(self) -> dict:
+        """统计信息，键与DriverPool.stats一致"""
+        return {
+            'launches': self.attaches,
+            'reuses': max(self.contexts - self.attaches, 0),
+            'relaunches': self.reattaches,
+            'launches_avoided': max(self.contexts - self.attaches, 0),
+            'launch_time': round(self.attach_time, 3),
+            'reset_time': round(self.context_time, 3),
+        }
+
+
+class BrowserContextPlugin:
+    """
+    --browser-contexts 插件：主进程（或未使用xdist时的唯一进程）启动共享浏览器，
+    通过workerinput把调试地址传给各worker，后台采样浏览器内存和并发上下文数，在终端摘要中输出每GB可并发的用例数
+    """
+
+    def __init__(self, config, headless: bool, sample_interval: float = 0.5):
+        """
+        :param config: pytest配置对象
+        :param headless: 是否无头模式
+        :param sample_interval: 内存采样间隔(秒)
+        """
+        self.config = config
+        self.browser = None
+        self.pool = None
+        self.driver_pids = set()
+        self.peak = None  # 并发上下文最多的一次采样: (上下文数, 内存MB)
+        self._stop = threading.Event()
+        self._sampler = None
+        if hasattr(config, 'workerinput'):
+            self.address = config.workerinput['browser_context_address']
+            return
+        self.browser = SharedBrowser(headless).start()
+        self.address = self.browser.address
+        self._sampler = threading.Thread(target=self._sample, args=(sample_interval,),
+                                         name='browser-context-sampler', daemon=True)
+        self._sampler.start()
+
+    def memory_mb(self) -> Optional[float]:
+        """共享浏览器进程树加上各进程连接用的chromedriver占用的内存(MB)"""
+        memory = self.browser.memory_mb()
+        if memory is None:
+            return None
+        return round(memory + sum(process_tree_memory_mb(pid) or 0 for pid in list(self.driver_pids)), 1)
+
+    def _sample(self, interval: float):
+        """采样并发上下文数（用例上下文中的标签页）和同一时刻的内存，保留并发最多（同并发时内存最大）的一次"""
+        while not self._stop.wait(interval):
+            try:
+                contexts = self.browser.context_count()
+            except Exception:
+                continue
+            memory = self.memory_mb()
+            if contexts > 0 and memory is not None and (self.peak is None or (contexts, memory) > self.peak):
+                self.peak = (contexts, memory)
+
+    def create_pool(self) -> ContextPool:
+        """当前进程使用的上下文池"""
+        self.pool = ContextPool(self.address)
+        return self.pool
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_configure_node(self, node):
+        """xdist主进程: 把共享浏览器的调试地址传给worker"""
+        node.workerinput['browser_context_address'] = self.address
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        """setup结束时把连接用的chromedriver的pid放进报告"""
+        outcome = yield
+        report = outcome.get_result()
+        if call.when == 'setup' and self.pool is not None and self.pool.driver is not None:
+            report.user_properties.append((DRIVER_PID_PROPERTY, self.pool.driver.service.process.pid))
+
+    def pytest_runtest_logreport(self, report):
+        """收集各进程的chromedriver pid（xdist下在主进程收集）"""
+        for name, value in report.user_properties:
+            if name == DRIVER_PID_PROPERTY:
+                self.driver_pids.add(value)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if self.browser is None:
+            return
+        terminalreporter.section("共享浏览器上下文")
+        if self.peak is None:
+            terminalreporter.write_line("未采样到并发上下文或浏览器内存（需要/proc或psutil）")
+            return
+        contexts, memory = self.peak
+        per_test = round(memory / contexts, 1)
+        terminalreporter.write_line(
+            f"峰值并发上下文: {contexts}, 同时刻内存（浏览器及 {len(self.driver_pids)} 个连接用的chromedriver）: "
+            f"{memory} MB, 每个用例: {per_test} MB, 每GB可并发: {tests_per_gb(per_test)} 个用例"
+        )
+        baseline = load_measurement()
+        if baseline:
+            process_per_test = baseline['process_per_test_mb']
+            terminalreporter.write_line(
+                f"一个用例一个浏览器进程（{MEASURE_FILE}）: 每个用例: {process_per_test} MB, "
+                f"每GB可并发: {tests_per_gb(process_per_test)} 个用例, "
+                f"提升: {process_per_test / per_test:.1f}x"
+            )
+        else:
+            terminalreporter.write_line(
+                "运行 python -m utils.browser_contexts --measure N 获取一个用例一个浏览器进程的对比基准"
+            )
+
+    def pytest_unconfigure(self, config):
+        self._stop.set()
+        if self.browser is not None:
+            self.browser.stop()
+
+
+def load_measurement() -> Optional[Dict]:
+    """读取--measure保存的结果"""
+    try:
+        with open(MEASURE_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def measure(tests: int, url: str = LOGIN_URL, headless: bool = True, settle: float = 2.0) -> Dict:
+    """
+    分别以"一个用例一个浏览器进程"和"共享浏览器+独立上下文"打开tests个并发页面，对比内存占用
+    :param tests: 并发用例数
+    :param url: 每个用例打开的页面
+    :param headless: 是否无头模式
+    :param settle: 页面打开后等待内存稳定的时间(秒)
+    :return: 对比结果
+    """
+    drivers = []
+    try:
+        for _ in range(tests):
+            drivers.append(create_driver('chrome', headless))
+            drivers[-1].get(url)
+        time.sleep(settle)
+        process_mb = sum(process_tree_memory_mb(driver.service.process.pid) or 0 for driver in drivers)
+    finally:
+        for driver in drivers:
+            driver.quit()
+
+    browser = SharedBrowser(headless).start()
+    pools = [ContextPool(browser.address) for _ in range(tests)]
+    try:
+        for pool in pools:
+            pool.acquire().get(url)
+        time.sleep(settle)
+        # 与xdist一致：每个并发用例一个连接用的chromedriver
+        context_mb = (browser.memory_mb() or 0) + sum(
+            process_tree_memory_mb(pool.driver.service.process.pid) or 0 for pool in pools
+        )
+    finally:
+        for pool in pools:
+            pool.shutdown()
+        browser.stop()
+
+    process_per_test = round(process_mb / tests, 1)
+    context_per_test = round(context_mb / tests, 1)
+    return {
+        'tests': tests,
+        'url': url,
+        'process_total_mb': round(process_mb, 1),
+        'context_total_mb': round(context_mb, 1),
+        'process_per_test_mb': process_per_test,
+        'context_per_test_mb': context_per_test,
+        'process_tests_per_gb': tests_per_gb(process_per_test),
+        'context_tests_per_gb': tests_per_gb(context_per_test),
+    }
+
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="对比每个用例一个浏览器进程与共享浏览器上下文的内存占用")
+    parser.add_argument('--measure', type=int, default=4, metavar='N', help="并发用例数")
+    parser.add_argument('--url', default=LOGIN_URL, help="每个用例打开的页面")
+    parser.add_argument('--headless', action='store_true', help="无头模式")
+    options = parser.parse_args(argv)
+
+    result = measure(options.measure, options.url, options.headless)
+    print(f"并发用例: {result['tests']}")
+    print(f"一个用例一个浏览器进程: 共 {result['process_total_mb']} MB, 每个用例 {result['process_per_test_mb']} MB, "
+          f"每GB可并发 {result['process_tests_per_gb']} 个用例")
+    print(f"共享浏览器+独立上下文: 共 {result['context_total_mb']} MB, 每个用例 {result['context_per_test_mb']} MB, "
+          f"每GB可并发 {result['context_tests_per_gb']} 个用例")
+    os.makedirs(os.path.dirname(MEASURE_FILE), exist_ok=True)
+    with open(MEASURE_FILE, 'w', encoding='utf-8') as f:
+        json.dump(result, f, ensure_ascii=False, indent=2)
+    print(f"结果已保存: {MEASURE_FILE}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,136 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器后端注册表
+各浏览器的selenium模块只在真正创建该浏览器时才导入，
+pytest --collect-only、-k筛选等不需要浏览器的场景不再承担这部分导入开销
+"""
+import time
+from typing import Callable, Dict
+
+from config.config import IMPLICIT_WAIT, PAGE_LOAD_TIMEOUT
+from utils.driver_resolver import resolve_driver_path
+
+
+# {浏览器名称: 创建函数(headless, arguments, capabilities) -> WebDriver}
+BROWSER_BACKENDS: Dict[str, Callable] = {}
+
+# 各后端首次创建浏览器时导入依赖模块的耗时(秒)
+backend_import_times: Dict[str, float] = {}
+
+
+def register_backend(name: str):
+    """
+    注册浏览器后端的装饰器
+    :param name: 浏览器名称
+    """
+    def decorator(func: Callable) -> Callable:
+        BROWSER_BACKENDS[name] = func
+        return func
+    return decorator
+
+
+@register_backend('chrome')
+def _create_chrome(headless: bool, arguments=(), capabilities=None):
+    """创建Chrome浏览器"""
+    start = time.perf_counter()
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    backend_import_times.setdefault('chrome', time.perf_counter() - start)
+
+    options = webdriver.ChromeOptions()
+    if headless:
+        options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    options.add_argument('--disable-gpu')
+    options.add_argument('--window-size=1920,1080')
+    for argument in arguments:
+        options.add_argument(argument)
+    for name, value in (capabilities or {}).items():
+        options.set_capability(name, value)
+
+    service = ChromeService(resolve_driver_path('chrome'))
+    return webdriver.Chrome(service=service, options=options)
+
+
+@register_backend('firefox')
+def _create_firefox(headless: bool, arguments=(), capabilities=None):
+    """创建Firefox浏览器"""
+    start = time.perf_counter()
+    from selenium import webdriver
+    from selenium.webdriver.firefox.service import Service as FirefoxService
+    backend_import_times.setdefault('firefox', time.perf_counter() - start)
+
+    options = webdriver.FirefoxOptions()
+    if headless:
+        options.add_argument('--headless')
+    for argument in arguments:
+        options.add_argument(argument)
+    for name, value in (capabilities or {}).items():
+        options.set_capability(name, value)
+
+    service = FirefoxService(resolve_driver_path('firefox'))
+    return webdriver.Firefox(service=service, options=options)
+
+
+@register_backend('edge')
+def _create_edge(headless: bool, arguments=(), capabilities=None):
+    """创建Edge浏览器"""
+    start = time.perf_counter()
+    from selenium import webdriver
+    from selenium.webdriver.edge.service import Service as EdgeService
+    backend_import_times.setdefault('edge', time.perf_counter() - start)
+
+    options = webdriver.EdgeOptions()
+    if headless:
+        options.add_argument('--headless')
+    for argument in arguments:
+        options.add_argument(argument)
+    for name, value in (capabilities or {}).items():
+        options.set_capability(name, value)
+
+    service = EdgeService(resolve_driver_path('edge'))
+    return webdriver.Edge(service=service, options=options)
+
+
+def create_driver(browser: str, headless: bool, arguments=(), capabilities=None):
+    """
+    根据配置创建WebDriver
+    :param browser: 浏览器类型
+    :param headless: 是否无头模式
+    :param arguments: 额外的浏览器命令行参数
+    :param capabilities: 额外的capability，如启用performance日志
+    :return: WebDriver实例
+    """
+    backend = BROWSER_BACKENDS.get(browser)
+    if backend is None:
+        raise ValueError(f"不支持的浏览器类型: {browser}")
+    driver = backend(headless, arguments, capabilities)
+
+    # 设置隐式等待和页面加载超时
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+
+    # 最大化窗口
+    driver.maximize_window()
+
+    return driver
+
+
+def attach_chrome(debugger_address: str):
+    """
+    连接到已启动的Chrome（--remote-debugging-port），不启动新的浏览器进程
+    :param debugger_address: 调试地址，如 127.0.0.1:9222
+    :return: WebDriver实例
+    """
+    start = time.perf_counter()
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service as ChromeService
+    backend_import_times.setdefault('chrome', time.perf_counter() - start)
+
+    options = webdriver.ChromeOptions()
+    options.debugger_address = debugger_address
+    driver = webdriver.Chrome(service=ChromeService(resolve_driver_path('chrome')), options=options)
+    driver.implicitly_wait(IMPLICIT_WAIT)
+    driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+    return driver
@@ -0,0 +1,266 @@
+# -*- coding: utf-8 -*-
+"""
+SQLite用例库
+把Excel工作表导入带索引的SQLite数据库（Excel内容不变时不重复导入），按查询条件只取出需要的用例，
+用例收集的耗时随选中的用例数增长，而不是随整个用例库的大小增长。
+
+查询语法（条件之间用 and 连接，条件前可加 not）:
+    tag:smoke                    带有smoke标签
+    expected=fail                列比较，支持 = != < <= > >=
+    priority<=P1                 优先级（P0最高，也可以直接写数字）
+    case_id~TC00*                通配符匹配（* 任意字符，? 单个字符）
+    case_name="登录 and 注销"    值中含空格或 and 时用引号括起来
+例如: "tag:smoke and not expected=success and priority<=1"
+"""
+import hashlib
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, List, Tuple
+
+from config.config import CASE_STORE_DB
+from utils import test_data_cache
+from utils.file_lock import FileLock
+
+
+# 可以在查询中使用的列
+QUERY_COLUMNS = ('case_id', 'case_name', 'username', 'password', 'expected', 'description', 'priority')
+TERM_PATTERN = re.compile(r'^(\w+)\s*(!=|<=|>=|=|<|>|~)\s*(.+)$')
+PRIORITY_PATTERN = re.compile(r'^[Pp]?(\d+)$')
+# 查询分词：连续的非空白字符，其中引号括起来的部分可以包含空白；单独的引号表示引号未闭合
+TOKEN_PATTERN = re.compile(r'(?:"[^"]*"|\'[^\']*\'|[^\s"\'])+|["\']')
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS imports (
+    sheet TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    size INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS cases (
+    sheet TEXT NOT NULL,
+    row_num INTEGER NOT NULL,
+    case_id TEXT,
+    case_name TEXT,
+    username TEXT,
+    password TEXT,
+    expected TEXT,
+    description TEXT,
+    run INTEGER NOT NULL,
+    priority INTEGER,
+    tags TEXT,
+    PRIMARY KEY (sheet, row_num)
+);
+CREATE INDEX IF NOT EXISTS idx_cases_expected ON cases (sheet, expected);
+CREATE INDEX IF NOT EXISTS idx_cases_priority ON cases (sheet, priority);
+CREATE INDEX IF NOT EXISTS idx_cases_case_id ON cases (sheet, case_id);
+CREATE TABLE IF NOT EXISTS case_tags (
+    sheet TEXT NOT NULL,
+    row_num INTEGER NOT NULL,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (sheet, tag, row_num)
+);
+"""
+
+
+def parse_priority(value):
+    """优先级转为整数：'P1'/'p1'/1 -> 1，无法识别时为None"""
+    match = PRIORITY_PATTERN.match(str(value).strip()) if value not in (None, '') else None
+    return int(match.group(1)) if match else None
+
+
+def parse_tags(value) -> List[str]:
+    """标签列：逗号、分号或空白分隔"""
+    return [tag for tag in re.split(r'[,;，\s]+', str(value or '').strip().lower()) if tag]
+
+
+def format_priority(value):
+    """整数优先级转回Excel中的写法：1 -> 'P1'，None保持None"""
+    return None if value is None else f'P{value}'
+
+
+def _unquote(value: str) -> str:
+    """去掉值两端成对的引号"""
+    value = value.strip()
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in '\'"':
+        return value[1:-1]
+    return value
+
+
+def split_terms(query: str) -> List[str]:
+    """
+    按不在引号内的 and 拆分查询语句
+    :param query: 查询语句
+    :return: 条件列表
+    """
+    terms, words = [], []
+    for token in TOKEN_PATTERN.findall(query):
+        if token in ('"', "'"):
+            raise ValueError(f"查询语句中的引号未闭合: {query}")
+        if token.lower() == 'and':
+            terms.append(' '.join(words))
+            words = []
+        else:
+            words.append(token)
+    terms.append(' '.join(words))
+    return terms
+
+
+def build_where(query: str) -> Tuple[str, list]:
+    """
+    把查询语句转换为SQL条件（参数化，不拼接值）
+    :param query: 查询语句
+    :return: (SQL条件, 参数)
+    """
+    clauses, params = [], []
+    for raw_term in split_terms(query):
+        term = raw_term.strip()
+        if not term:
+            continue
+        negate = False
+        if term.lower().startswith('not '):
+            negate, term = True, term[4:].strip()
+
+        if term.lower().startswith('tag:'):
+            clause = ("EXISTS (SELECT 1 FROM case_tags t "
+                      "WHERE t.sheet = cases.sheet AND t.row_num = cases.row_num AND t.tag = ?)")
+            params.append(_unquote(term[4:]).lower())
+        else:
+            match = TERM_PATTERN.match(term)
+            if not match:
+                raise ValueError(f"无法解析的查询条件: {raw_term}")
+            column, operator, value = match.groups()
+            if column not in QUERY_COLUMNS:
+                raise ValueError(f"不支持查询的列: {column}，可用: {', '.join(QUERY_COLUMNS)}")
+            value = _unquote(value)
+            if column == 'priority':
+                value = parse_priority(value)
+                if value is None:
+                    raise ValueError(f"无法识别的优先级: {match.group(3)}")
+            if operator == '~':
+                clause = f"{column} GLOB ?"
+            else:
+                clause = f"{column} {operator} ?"
+            params.append(value)
+        clauses.append(f"NOT ({clause})" if negate else clause)
+    return (' AND '.join(clauses) or '1'), params
+
+
+class CaseStore:
+    """基于SQLite的用例库"""
+
+    def __init__(self, db_path: str = CASE_STORE_DB):
+        """
+        打开（必要时创建）用例库
+        :param db_path: SQLite文件路径
+        """
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript(SCHEMA)
+
+    def sync(self, excel_file: str, sheet_name: str) -> bool:
+        """
+        Excel有变化时重新导入工作表（xdist多个worker同时收集时只有一个导入）
+        :param excel_file: Excel文件路径
+        :param sheet_name: 工作表名称
+        :return: True表示执行了导入
+        """
+        stat = os.stat(excel_file)
+        if self._import_state(sheet_name) == (os.path.abspath(excel_file), stat.st_mtime_ns, stat.st_size):
+            return False
+        with FileLock(self.db_path + '.lock'):
+            if self._import_state(sheet_name) == (os.path.abspath(excel_file), stat.st_mtime_ns, stat.st_size):
+                return False
+            with open(excel_file, 'rb') as f:
+                digest = hashlib.sha256(f.read()).hexdigest()
+            row = self.conn.execute(
+                "SELECT source, sha256 FROM imports WHERE sheet = ?", (sheet_name,)
+            ).fetchone()
+            if row != (os.path.abspath(excel_file), digest):
+                self._import(excel_file, sheet_name)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO imports (sheet, source, sha256, mtime_ns, size) VALUES (?, ?, ?, ?, ?)",
+                (sheet_name, os.path.abspath(excel_file), digest, stat.st_mtime_ns, stat.st_size)
+            )
+            self.conn.commit()
+            return True
+
+    def _import_state(self, sheet_name: str):
+        """上次导入时Excel的路径、修改时间和大小"""
+        return self.conn.execute(
+            "SELECT source, mtime_ns, size FROM imports WHERE sheet = ?", (sheet_name,)
+        ).fetchone()
+
+    def _import(self, excel_file: str, sheet_name: str):
+        """流式读取工作表并整体替换该工作表的用例（在同一个事务中）"""
+        from utils.excel_reader import ExcelReader, _is_enabled
+        reader = ExcelReader(excel_file, sheet_name=sheet_name)
+        try:
+            self.conn.execute("DELETE FROM cases WHERE sheet = ?", (sheet_name,))
+            self.conn.execute("DELETE FROM case_tags WHERE sheet = ?", (sheet_name,))
+            case_rows, tag_rows = [], []
+            for row_num, case in enumerate(reader.iter_cases(only_enabled=False), 2):
+                case_rows.append((
+                    sheet_name, row_num, case.get('case_id'), case.get('case_name'), case.get('username'),
+                    case.get('password'), case.get('expected'), case.get('description'),
+                    int(_is_enabled(case.get('run'))), parse_priority(case.get('priority')), case.get('tags'),
+                ))
+                tag_rows.extend((sheet_name, row_num, tag) for tag in set(parse_tags(case.get('tags'))))
+            self.conn.executemany("INSERT INTO cases VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", case_rows)
+            self.conn.executemany("INSERT INTO case_tags VALUES (?, ?, ?)", tag_rows)
+        finally:
+            reader.close()
+
+    def query(self, sheet_name: str, query: str = '', only_enabled: bool = True) -> List[Dict]:
+        """
+        按查询语句取出用例（按Excel行顺序）
+        :param sheet_name: 工作表名称
+        :param query: 查询语句，空字符串表示全部
+        :param only_enabled: 是否只返回run为yes的用例
+        :return: 用例字典列表，键与Excel列一致
+        """
+        where, params = build_where(query or '')
+        if only_enabled:
+            where = f"run = 1 AND ({where})"
+        cursor = self.conn.execute(
+            "SELECT case_id, case_name, username, password, expected, description, run, priority, tags "
+            f"FROM cases WHERE sheet = ? AND {where} ORDER BY row_num",
+            [sheet_name] + params
+        )
+        columns = [description[0] for description in cursor.description]
+        cases = []
+        for row in cursor:
+            case = dict(zip(columns, row))
+            # 与ExcelReader读出的数据保持一致：run列为yes/no，优先级为P0、P1...
+            case['run'] = 'yes' if case['run'] else 'no'
+            case['priority'] = format_priority(case['priority'])
+            cases.append(case)
+        return cases
+
+    def close(self):
+        """关闭数据库"""
+        self.conn.close()
+
+
+def query_test_cases(excel_file: str, sheet_name: str, query: str) -> List[Dict]:
+    """
+    同步Excel后按查询语句加载用例，统计信息写入test_data_cache.last_load_stats
+    :param excel_file: Excel文件路径
+    :param sheet_name: 工作表名称
+    :param query: 查询语句
+    :return: 用例列表
+    """
+    start = time.perf_counter()
+    store = CaseStore()
+    try:
+        imported = store.sync(excel_file, sheet_name)
+        cases = store.query(sheet_name, query)
+    finally:
+        store.close()
+    test_data_cache.last_load_stats.update(
+        source='excel' if imported else 'case_store', seconds=time.perf_counter() - start, cases=len(cases)
+    )
+    return cases
@@ -0,0 +1,184 @@
+# -*- coding: utf-8 -*-
+"""
+WebDriver命令耗时分析
+替换driver.command_executor.execute，统计每个用例发出的每条协议命令的次数和耗时，
+并把命令归属到发起调用的页面对象方法（调用栈中最近的一个项目内函数），
+同一用例中参数完全相同的命令重复出现时标记为冗余（如重复的maximizeWindow、WebDriverWait轮询的findElement）
+"""
+import functools
+import hashlib
+import json
+import os
+import sys
+import sysconfig
+import time
+from typing import Dict, List, Optional
+
+import pytest
+
+from config.config import BASE_DIR
+
+
+PROFILE_PROPERTY = 'command_profile'
+
+# 归属调用方时跳过的文件：本模块以及项目外（selenium等第三方库）的代码，
+# 虚拟环境建在项目目录下（.venv、venv）时，其中的标准库和第三方库也不算项目内代码
+_THIS_FILE = os.path.abspath(__file__)
+_PROJECT_DIR = os.path.abspath(BASE_DIR) + os.sep
+_LIBRARY_DIRS = tuple(sorted({
+    os.path.abspath(path) + os.sep
+    for name, path in sysconfig.get_paths().items() if name in ('stdlib', 'platstdlib', 'purelib', 'platlib')
+}))
+_LIBRARY_MARKERS = {'site-packages', 'dist-packages'}
+
+
+@functools.lru_cache(maxsize=None)
+def _is_project_file(filename: str) -> bool:
+    """文件是否为项目内代码（结果按文件名缓存，每条命令都要遍历调用栈）"""
+    return (filename.startswith(_PROJECT_DIR) and filename != _THIS_FILE
+            and not filename.startswith(_LIBRARY_DIRS)
+            and _LIBRARY_MARKERS.isdisjoint(filename.split(os.sep)))
+
+
+def caller_of_command() -> str:
+    """
+    找到发起WebDriver命令的项目内函数
+    :return: '类名.方法名'（方法）或 '模块文件:函数名'
+    """
+    frame = sys._getframe(2)
+    while frame is not None:
+        filename = os.path.abspath(frame.f_code.co_filename)
+        if _is_project_file(filename):
+            owner = frame.f_locals.get('self')
+            if owner is not None:
+                return f"{type(owner).__name__}.{frame.f_code.co_name}"
+            return f"{os.path.basename(filename)}:{frame.f_code.co_name}"
+        frame = frame.f_back
+    return "(项目外)"
+
+
+class CaseCommandProfile:
+    """单个用例的命令统计"""
+
+    def __init__(self):
+        self.commands: Dict[str, List[float]] = {}  # {命令: [次数, 耗时]}
+        self.owners: Dict[str, List[float]] = {}  # {调用方: [次数, 耗时]}
+        self.repeats: Dict[tuple, int] = {}  # {(命令, 调用方): 重复次数}
+        self._seen = set()
+
+    def record(self, command: str, params: Optional[dict], owner: str, seconds: float):
+        """记录一条命令"""
+        for table, key in ((self.commands, command), (self.owners, owner)):
+            entry = table.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += seconds
+        signature = hashlib.md5(
+            f"{command}:{json.dumps(params, sort_keys=True, default=str)}".encode('utf-8')
+        ).hexdigest()
+        if signature in self._seen:
+            self.repeats[(command, owner)] = self.repeats.get((command, owner), 0) + 1
+        else:
+            self._seen.add(signature)
+
+    def to_dict(self) -> Dict:
+        """转换为可序列化的字典（通过报告的user_properties传回xdist主进程）"""
+        return {
+            'count': sum(count for count, _ in self.commands.values()),
+            'seconds': round(sum(seconds for _, seconds in self.commands.values()), 4),
+            'commands': {key: [count, round(seconds, 4)] for key, (count, seconds) in self.commands.items()},
+            'owners': {key: [count, round(seconds, 4)] for key, (count, seconds) in self.owners.items()},
+            'repeats': [[command, owner, count] for (command, owner), count in self.repeats.items()],
+        }
+
+
+class CommandProfiler:
+    """WebDriver命令耗时分析插件"""
+
+    def __init__(self, config, top: int = 10):
+        """
+        初始化插件
+        :param config: pytest配置
+        :param top: 会话汇总中输出的条目数
+        """
+        self.config = config
+        self.top = top
+        self.current: Optional[CaseCommandProfile] = None
+        self.results: Dict[str, Dict] = {}
+
+    def attach(self, driver):
+        """
+        替换driver的命令执行函数（同一个driver只替换一次，池化复用的driver不会重复包装）
+        run_tests.py在同一进程中多轮运行时，预热池中的driver会被下一轮新的插件实例再次attach，
+        此时只把记录目标换成新的插件，不再嵌套包装
+        :param driver: WebDriver实例
+        """
+        executor = driver.command_executor
+        if not hasattr(executor, '_command_profiler'):
+            original = executor.execute
+
+            def execute(command, params=None):
+                start = time.perf_counter()
+                try:
+                    return original(command, params)
+                finally:
+                    seconds = time.perf_counter() - start
+                    current = executor._command_profiler.current
+                    if current is not None:
+                        current.record(command, params, caller_of_command(), seconds)
+
+            executor.execute = execute
+        executor._command_profiler = self
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        """开始统计当前用例（包括fixture中的命令，如driver池的重置）"""
+        self.current = CaseCommandProfile()
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        """teardown结束时把用例的命令统计放进报告"""
+        outcome = yield
+        report = outcome.get_result()
+        if call.when == 'teardown' and self.current is not None:
+            if self.current.commands:
+                report.user_properties.append((PROFILE_PROPERTY, self.current.to_dict()))
+            self.current = None
+
+    def pytest_runtest_logreport(self, report):
+        """汇总各用例的命令统计（xdist下在主进程汇总）"""
+        for name, value in report.user_properties:
+            if name == PROFILE_PROPERTY:
+                self.results[report.nodeid] = value
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """输出每个用例的命令统计以及会话内耗时最多的命令、调用方和冗余命令"""
+        if not self.results:
+            return
+        terminalreporter.section("WebDriver命令统计")
+        terminalreporter.write_line(f"{'用例':<60}{'命令数':>8}{'耗时(s)':>10}{'冗余':>6}  耗时最多的调用方")
+        for nodeid, profile in self.results.items():
+            owner, (_, seconds) = max(profile['owners'].items(), key=lambda kv: kv[1][1])
+            redundant = sum(count for _, _, count in profile['repeats'])
+            terminalreporter.write_line(
+                f"{nodeid[-60:]:<60}{profile['count']:>8}{profile['seconds']:>10.3f}{redundant:>6}  "
+                f"{owner} ({seconds:.3f}s)"
+            )
+
+        commands, owners, repeats = {}, {}, {}
+        for profile in self.results.values():
+            for table, values in ((commands, profile['commands']), (owners, profile['owners'])):
+                for key, (count, seconds) in values.items():
+                    entry = table.setdefault(key, [0, 0.0])
+                    entry[0] += count
+                    entry[1] += seconds
+            for command, owner, count in profile['repeats']:
+                repeats[(command, owner)] = repeats.get((command, owner), 0) + count
+
+        for title, table in (("命令", commands), ("调用方", owners)):
+            terminalreporter.write_line(f"耗时最多的{title} (前{self.top}):")
+            for key, (count, seconds) in sorted(table.items(), key=lambda kv: kv[1][1], reverse=True)[:self.top]:
+                terminalreporter.write_line(f"  {key:<50}{count:>8} 次{seconds:>10.3f}s")
+        if repeats:
+            terminalreporter.write_line(f"重复次数最多的冗余命令 (同一用例中参数完全相同，前{self.top}):")
+            for (command, owner), count in sorted(repeats.items(), key=lambda kv: kv[1], reverse=True)[:self.top]:
+                terminalreporter.write_line(f"  {command:<30}{owner:<40}{count:>6} 次")
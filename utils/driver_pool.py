@@ -0,0 +1,195 @@
+# -*- coding: utf-8 -*-
+"""
+WebDriver池
+在整个会话（或xdist的每个worker）内复用浏览器，用例之间只做轻量的状态重置
+"""
+import logging
+import time
+from typing import Callable, Optional
+
+import pytest
+
+from utils.resource_blocker import blocker_for
+
+
+logger = logging.getLogger(__name__)
+
+# driver池统计信息在会话结束时写入config.stash（xdist主进程中为各worker的汇总），供终端摘要和基准测试使用
+driver_pool_stats_key = pytest.StashKey[dict]()
+
+# 进程内多次执行pytest（run_tests.py的快速循环）时，跨会话保留的driver池
+warm_pool_key = pytest.StashKey['WarmPoolPlugin']()
+
+
+def merge_stats(total: Optional[dict], stats: dict) -> dict:
+    """
+    累加多个池（xdist各worker）的统计信息
+    :param total: 已累加的统计，None表示尚无
+    :param stats: 新的统计
+    :return: 累加结果
+    """
+    if not total:
+        return dict(stats)
+    return {key: round(total.get(key, 0) + value, 3) for key, value in stats.items()}
+
+
+class DriverPool:
+    """会话级WebDriver池，每个进程持有一个浏览器实例"""
+
+    def __init__(self, factory: Callable, enabled: bool = True):
+        """
+        初始化driver池
+        :param factory: 创建WebDriver的无参函数
+        :param enabled: 是否启用复用，关闭时每次都重新启动浏览器
+        """
+        self.factory = factory
+        self.enabled = enabled
+        self._driver = None
+        self.launches = 0  # 实际启动浏览器次数
+        self.reuses = 0  # 复用浏览器次数（即节省的启动次数）
+        self.relaunches = 0  # 健康检查失败后重启次数
+        self.launch_time = 0.0  # 启动浏览器累计耗时(秒)
+        self.reset_time = 0.0  # 状态重置累计耗时(秒)
+
+    def acquire(self):
+        """
+        获取一个可用的WebDriver
+        :return: WebDriver实例
+        """
+        if self._driver is not None:
+            if self.enabled and self.is_healthy(self._driver):
+                self.reuses += 1
+                return self._driver
+            # 浏览器已失效，丢弃后重新启动
+            self.relaunches += 1
+            self._quit(self._driver)
+            self._driver = None
+
+        self._driver = self._launch()
+        return self._driver
+
+    def release(self, driver, broken: bool = False):
+        """
+        归还WebDriver，重置状态供下一个用例使用
+        :param driver: WebDriver实例
+        :param broken: 为True时直接关闭，不再复用
+        """
+        if not self.enabled or broken:
+            self._quit(driver)
+            self._driver = None
+            return
+
+        start = time.perf_counter()
+        try:
+            self.reset(driver)
+        except Exception as e:
+            # 重置失败说明浏览器状态不可信，下次acquire时重新启动
+            logger.warning("重置浏览器状态失败，将重新启动浏览器: %s", e)
+            self._quit(driver)
+            self._driver = None
+        finally:
+            self.reset_time += time.perf_counter() - start
+
+    @staticmethod
+    def reset(driver):
+        """
+        清理浏览器状态：清除资源拦截列表、关闭多余窗口、清除cookie和storage、回到空白页
+        :param driver: WebDriver实例
+        """
+        blocker = blocker_for(driver)
+        if blocker is not None:
+            blocker.clear()
+
+        handles = driver.window_handles
+        for handle in handles[1:]:
+            driver.switch_to.window(handle)
+            driver.close()
+        driver.switch_to.window(handles[0])
+
+        driver.delete_all_cookies()
+        # storage按源隔离，必须在当前页面的源下清除；about:blank等页面无权访问storage
+        driver.execute_script(
+            "try { window.localStorage.clear(); window.sessionStorage.clear(); } catch (e) {}"
+        )
+        driver.get('about:blank')
+
+    @staticmethod
+    def is_healthy(driver) -> bool:
+        """
+        健康检查：浏览器会话存活并能执行脚本
+        :param driver: WebDriver实例
+        :return: True表示可以复用
+        """
+        try:
+            return driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def shutdown(self):
+        """关闭池中的浏览器"""
+        if self._driver is not None:
+            self._quit(self._driver)
+            self._driver = None
+
+    def stats(self) -> dict:
+        """
+        获取池统计信息
+        :return: 统计字典
+        """
+        return {
+            'launches': self.launches,
+            'reuses': self.reuses,
+            'relaunches': self.relaunches,
+            'launches_avoided': self.reuses,
+            'launch_time': round(self.launch_time, 3),
+            'reset_time': round(self.reset_time, 3),
+        }
+
+    def _launch(self):
+        """启动新的浏览器并计时"""
+        start = time.perf_counter()
+        driver = self.factory()
+        self.launch_time += time.perf_counter() - start
+        self.launches += 1
+        return driver
+
+    @staticmethod
+    def _quit(driver):
+        """关闭浏览器，忽略已断开的会话"""
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+
+class WarmPoolPlugin:
+    """
+    跨会话保留的driver池（按浏览器类型和无头模式区分）
+    由run_tests.py作为插件传给每次pytest.main，会话结束时不关闭浏览器，下一轮直接复用；调用方最终负责shutdown
+    """
+
+    def __init__(self):
+        self._pools = {}
+
+    def pytest_configure(self, config):
+        config.stash[warm_pool_key] = self
+
+    def pool_for(self, browser: str, headless: bool, factory: Callable, enabled: bool = True) -> DriverPool:
+        """
+        获取（必要时创建）对应配置的driver池
+        :param browser: 浏览器类型
+        :param headless: 是否无头模式
+        :param factory: 创建WebDriver的无参函数
+        :param enabled: 是否启用复用
+        :return: DriverPool实例
+        """
+        key = (browser, headless)
+        if key not in self._pools:
+            self._pools[key] = DriverPool(factory, enabled=enabled)
+        return self._pools[key]
+
+    def shutdown(self):
+        """关闭所有保留的浏览器"""
+        for pool in self._pools.values():
+            pool.shutdown()
+        self._pools.clear()
@@ -0,0 +1,137 @@
+# -*- coding: utf-8 -*-
+"""
+浏览器驱动路径解析
+每个会话只解析一次，结果记录在本地缓存目录的版本清单中；多个xdist worker通过文件锁共享，
+只有第一个worker在缓存缺失或浏览器升级（主版本号与缓存的驱动不一致）时联网下载，之后的运行完全离线
+"""
+import json
+import logging
+import os
+import re
+import time
+from typing import Dict, Optional
+
+from config.config import DRIVER_CACHE_DIR, DRIVER_PATHS
+from utils.file_lock import FileLock
+
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = os.path.join(DRIVER_CACHE_DIR, 'manifest.json')
+LOCK_FILE = os.path.join(DRIVER_CACHE_DIR, '.lock')
+
+# 驱动主版本号与浏览器主版本号一致的浏览器（webdriver_manager中的浏览器类型），geckodriver版本独立，不比较
+BROWSER_TYPES = {'chrome': 'google-chrome', 'edge': 'edge'}
+
+# 本进程已解析的驱动路径（解析失败的不记录，下次创建浏览器时重试）
+_resolved: Dict[str, str] = {}
+
+
+def resolve_driver_path(browser: str) -> Optional[str]:
+    """
+    获取浏览器驱动路径
+    解析顺序: 本进程缓存 -> config中指定的路径 -> 本地版本清单 -> 加锁后联网下载并写入清单
+    :param browser: 浏览器类型: chrome, firefox, edge
+    :return: 驱动可执行文件路径；无法获取时返回None，由Selenium Manager自动查找
+    """
+    if browser in _resolved:
+        return _resolved[browser]
+
+    path = DRIVER_PATHS.get(browser)
+    if not (path and os.path.isfile(path)):
+        browser_version = browser_major_version(browser)
+        path = _cached_path(browser, browser_version)
+        if path is None:
+            with FileLock(LOCK_FILE):
+                # 等锁期间其他worker可能已经下载完成
+                path = _cached_path(browser, browser_version)
+                if path is None:
+                    path = _download(browser)
+    if path is None:
+        logger.warning("未能获取%s驱动，交给Selenium Manager自动查找", browser)
+        return None
+
+    _resolved[browser] = path
+    return path
+
+
+def browser_major_version(browser: str) -> Optional[str]:
+    """
+    已安装浏览器的主版本号
+    :param browser: 浏览器类型
+    :return: 主版本号，如'120'；不需要比较或无法获取时返回None
+    """
+    browser_type = BROWSER_TYPES.get(browser)
+    if browser_type is None:
+        return None
+    try:
+        from webdriver_manager.core.os_manager import OperationSystemManager
+        version = OperationSystemManager().get_browser_version_from_os(browser_type)
+    except Exception as e:
+        logger.debug("获取%s浏览器版本失败: %s", browser, e)
+        return None
+    return version.split('.')[0] if version else None
+
+
+def _read_manifest() -> Dict:
+    """读取版本清单"""
+    try:
+        with open(MANIFEST_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _cached_path(browser: str, browser_version: Optional[str] = None) -> Optional[str]:
+    """
+    从版本清单中查找已缓存且文件仍存在的驱动
+    :param browser: 浏览器类型
+    :param browser_version: 浏览器主版本号，与缓存的驱动主版本号不一致时视为缓存失效；为None时不比较
+    :return: 驱动路径，没有可用的缓存时返回None
+    """
+    entry = _read_manifest().get(browser)
+    if not (entry and os.path.isfile(entry.get('path', ''))):
+        return None
+    driver_version = entry.get('version')
+    if browser_version and driver_version and driver_version.split('.')[0] != browser_version:
+        logger.info("%s浏览器主版本%s与缓存的驱动%s不一致，重新下载", browser, browser_version, driver_version)
+        return None
+    return entry['path']
+
+
+def _download(browser: str) -> Optional[str]:
+    """
+    使用webdriver_manager下载驱动到本地缓存目录，并记录到版本清单（调用方需持有文件锁）
+    :return: 驱动路径，下载失败时返回None
+    """
+    try:
+        from webdriver_manager.core.driver_cache import DriverCacheManager
+        cache_manager = DriverCacheManager(root_dir=DRIVER_CACHE_DIR)
+        if browser == 'chrome':
+            from webdriver_manager.chrome import ChromeDriverManager
+            manager = ChromeDriverManager(cache_manager=cache_manager)
+        elif browser == 'firefox':
+            from webdriver_manager.firefox import GeckoDriverManager
+            manager = GeckoDriverManager(cache_manager=cache_manager)
+        elif browser == 'edge':
+            from webdriver_manager.microsoft import EdgeChromiumDriverManager
+            manager = EdgeChromiumDriverManager(cache_manager=cache_manager)
+        else:
+            raise ValueError(f"不支持的浏览器类型: {browser}")
+        path = manager.install()
+    except Exception as e:
+        logger.warning("下载%s驱动失败: %s", browser, e)
+        return None
+
+    version = re.search(r'[\\/](\d+(?:\.\d+)+)[\\/]', path)
+    manifest = _read_manifest()
+    manifest[browser] = {
+        'path': path,
+        'version': version.group(1) if version else None,
+        'resolved_at': time.strftime('%Y-%m-%d %H:%M:%S'),
+    }
+    tmp_file = f"{MANIFEST_FILE}.{os.getpid()}.tmp"
+    with open(tmp_file, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_file, MANIFEST_FILE)
+    return path
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""
+用例耗时历史
+每个用例（按nodeid和case_id）的实际耗时记录在本地SQLite中，
+供xdist调度时按"最长处理时间优先"(LPT)分配用例，并对比预测与实际的总耗时
+"""
+import heapq
+import os
+import re
+import sqlite3
+import time
+from typing import Dict, List, Optional
+
+import pytest
+
+from config.config import DURATION_HISTORY_DB
+
+
+# 新耗时在平滑平均中的权重，兼顾历史稳定性和对最近变化的响应
+EWMA_ALPHA = 0.3
+
+# 没有历史记录时假定的用例耗时(秒)
+DEFAULT_DURATION = 5.0
+
+CASE_ID_PATTERN = re.compile(r'\[([^\]]+)\]$')
+
+
+class DurationHistory:
+    """用例耗时历史存储"""
+
+    def __init__(self, db_path: str = DURATION_HISTORY_DB):
+        """
+        打开（必要时创建）耗时历史数据库
+        :param db_path: SQLite文件路径
+        """
+        os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.conn = sqlite3.connect(db_path)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS durations (
+                nodeid TEXT PRIMARY KEY,
+                case_id TEXT,
+                runs INTEGER NOT NULL,
+                average REAL NOT NULL,
+                last REAL NOT NULL,
+                updated TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_durations_case_id ON durations (case_id);
+        """)
+
+    def record(self, nodeid: str, duration: float):
+        """
+        记录一次用例耗时，更新平滑平均值
+        :param nodeid: 用例nodeid
+        :param duration: 耗时(秒)
+        """
+        row = self.conn.execute("SELECT runs, average FROM durations WHERE nodeid = ?", (nodeid,)).fetchone()
+        if row:
+            runs, average = row[0] + 1, row[1] + EWMA_ALPHA * (duration - row[1])
+        else:
+            runs, average = 1, duration
+        self.conn.execute(
+            "INSERT OR REPLACE INTO durations (nodeid, case_id, runs, average, last, updated) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (nodeid, case_id_of(nodeid), runs, average, duration, time.strftime('%Y-%m-%d %H:%M:%S'))
+        )
+
+    def load(self) -> Dict[str, float]:
+        """
+        读取全部历史平均耗时
+        :return: {nodeid: 平均耗时}
+        """
+        return dict(self.conn.execute("SELECT nodeid, average FROM durations"))
+
+    def commit(self):
+        """提交写入"""
+        self.conn.commit()
+
+    def close(self):
+        """关闭数据库"""
+        self.conn.commit()
+        self.conn.close()
+
+
+def case_id_of(nodeid: str) -> Optional[str]:
+    """从参数化用例的nodeid中取出case_id，如 test_login_with_excel_data[TC001] -> TC001"""
+    match = CASE_ID_PATTERN.search(nodeid)
+    return match.group(1) if match else None
+
+
+def predict(history: Dict[str, float], nodeid: str) -> float:
+    """
+    预测用例耗时：有历史记录用历史平均，否则用所有已知用例的平均值
+    :param history: {nodeid: 平均耗时}
+    :param nodeid: 用例nodeid
+    :return: 预测耗时(秒)
+    """
+    if nodeid in history:
+        return history[nodeid]
+    if history:
+        return sum(history.values()) / len(history)
+    return DEFAULT_DURATION
+
+
+def simulate_makespan(durations: List[float], workers: int) -> float:
+    """
+    按给定顺序模拟列表调度（每个空闲worker领取下一个用例）的总耗时
+    :param durations: 按调度顺序排列的耗时
+    :param workers: worker数量
+    :return: 最后一个worker完成的时间
+    """
+    if workers <= 0 or not durations:
+        return 0.0
+    finish_times = [0.0] * min(workers, len(durations))
+    for duration in durations:
+        heapq.heapreplace(finish_times, finish_times[0] + duration)
+    return max(finish_times)
+
+
+class DurationHistoryPlugin:
+    """记录用例耗时并在xdist下启用LPT调度的pytest插件"""
+
+    def __init__(self, config, lpt: bool = False):
+        """
+        初始化插件
+        :param config: pytest配置
+        :param lpt: 是否启用最长处理时间优先调度
+        """
+        self.config = config
+        self.lpt = lpt
+        # xdist worker只执行用例，耗时统一由主进程记录
+        self.history = None if hasattr(config, 'workerinput') else DurationHistory()
+        self.known = self.history.load() if self.history else {}
+        self.scheduler = None
+        self._phase_totals: Dict[str, float] = {}
+        self._worker_busy: Dict[str, float] = {}
+        self._last_finish = None
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_xdist_make_scheduler(self, config, log):
+        """xdist主进程: 启用--lpt时返回按历史耗时排序的调度器"""
+        if not self.lpt:
+            return None
+        from utils.lpt_scheduler import LPTScheduling
+        self.scheduler = LPTScheduling(config, log, lambda nodeid: predict(self.known, nodeid))
+        return self.scheduler
+
+    def pytest_runtest_logreport(self, report):
+        """累计用例setup/call/teardown的耗时，teardown结束时写入历史"""
+        if self.history is None:
+            # xdist worker的报告会转发到主进程，由主进程统一写库
+            return
+        nodeid = report.nodeid
+        self._phase_totals[nodeid] = self._phase_totals.get(nodeid, 0.0) + report.duration
+        if report.when != 'teardown':
+            return
+
+        duration = self._phase_totals.pop(nodeid)
+        self.history.record(nodeid, duration)
+        worker = getattr(getattr(report, 'node', None), 'gateway', None)
+        worker_id = worker.id if worker else 'main'
+        self._worker_busy[worker_id] = self._worker_busy.get(worker_id, 0.0) + duration
+        self._last_finish = time.time()
+
+    def pytest_sessionfinish(self, session):
+        """保存耗时历史"""
+        if self.history is not None:
+            self.history.close()
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """输出预测与实际的总耗时对比"""
+        scheduler = self.scheduler
+        if scheduler is None or not scheduler.schedule_order or not self._worker_busy:
+            return
+        workers = scheduler.numnodes or 1
+        predicted = [scheduler.predicted[nodeid] for nodeid in scheduler.schedule_order]
+        predicted_makespan = simulate_makespan(predicted, workers)
+        actual_makespan = self._last_finish - scheduler.started_at
+        ideal = sum(self._worker_busy.values()) / workers
+
+        terminalreporter.section("LPT调度统计")
+        terminalreporter.write_line(
+            f"worker数: {workers}, 用例数: {len(predicted)}, "
+            f"无历史记录的用例: {sum(1 for nodeid in scheduler.schedule_order if nodeid not in self.known)}"
+        )
+        terminalreporter.write_line(
+            f"预测总耗时(makespan): {predicted_makespan:.2f}s, 实际: {actual_makespan:.2f}s, "
+            f"理想均衡(总耗时/worker数): {ideal:.2f}s"
+        )
+        for worker_id, busy in sorted(self._worker_busy.items()):
+            terminalreporter.write_line(f"  {worker_id}: 累计执行 {busy:.2f}s")
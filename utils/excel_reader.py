@@ -3,67 +3,131 @@
 Excel数据读取工具类
 """
 import openpyxl
-from typing import List, Dict
+from typing import Any, Dict, Iterator, List, Optional
 
 
 class ExcelReader:
     """Excel读取器类"""
     
-    def __init__(self, excel_file: str, sheet_name: str = None):
+    def __init__(self, excel_file: str, sheet_name: str = None, read_only: bool = True, data_only: bool = False):
         """
         初始化Excel读取器
         :param excel_file: Excel文件路径
         :param sheet_name: 工作表名称，默认读取第一个工作表
+        :param read_only: 是否以只读流式模式打开，只读模式不会把整个工作簿加载到内存
+        :param data_only: 是否读取公式单元格上次保存时的计算结果，默认返回公式本身（如'=A1'）
         """
         self.excel_file = excel_file
-        self.workbook = openpyxl.load_workbook(excel_file)
+        self.read_only = read_only
+        self.workbook = openpyxl.load_workbook(excel_file, read_only=read_only, data_only=data_only)
         
         if sheet_name:
             self.sheet = self.workbook[sheet_name]
         else:
             self.sheet = self.workbook.active
+        
+        self._headers = None
+        self._index = None  # {case_id: 启用用例的行}
+    
+    @property
+    def headers(self) -> List[str]:
+        """表头（第一行）"""
+        if self._headers is None:
+            first_row = next(self.sheet.iter_rows(min_row=1, max_row=1, values_only=True), ())
+            self._headers = list(first_row)
+        return self._headers
     
-    def read_data(self) -> List[Dict]:
+    def iter_cases(self, only_enabled: bool = True, **predicates) -> Iterator[Dict]:
         """
-        读取Excel数据，返回字典列表
-        :return: 测试数据列表
+        流式读取测试用例，逐行过滤后再构造字典
+        :param only_enabled: 是否只返回run列为'yes'的用例
+        :param predicates: 列过滤条件，值为具体值时按相等比较，为函数时按返回值判断，
+                           例如 expected='fail', case_id=lambda v: v.startswith('TC0')
+        :return: 测试用例字典迭代器
         """
-        data = []
-        
-        # 获取表头（第一行）
-        headers = []
-        for cell in self.sheet[1]:
-            headers.append(cell.value)
+        headers = self.headers
+        unknown = set(predicates) - set(headers)
+        if unknown:
+            raise KeyError(f"Excel中不存在列: {', '.join(sorted(unknown))}")
+        filters = [(headers.index(column), condition) for column, condition in predicates.items()]
+        run_col = headers.index('run') if 'run' in headers else None
         
-        # 读取数据行
         for row in self.sheet.iter_rows(min_row=2, values_only=True):
-            row_data = {}
-            for header, value in zip(headers, row):
-                row_data[header] = value
-            
             # 只读取run列为'yes'的用例
-            if row_data.get('run', '').lower() == 'yes':
-                data.append(row_data)
-        
-        return data
+            if only_enabled and not _is_enabled(_cell(row, run_col)):
+                continue
+            if not all(_matches(_cell(row, col), condition) for col, condition in filters):
+                continue
+            yield dict(zip(headers, row))
     
-    def get_case_by_id(self, case_id: str) -> Dict:
+    def read_data(self, **predicates) -> List[Dict]:
+        """
+        读取Excel数据，返回字典列表
+        :param predicates: 列过滤条件，见iter_cases
+        :return: 测试数据列表
+        """
+        return list(self.iter_cases(**predicates))
+    
+    def get_case_by_id(self, case_id: str) -> Optional[Dict]:
         """
         根据用例ID获取单个测试用例
+        首次调用时扫描一次工作表，建立case_id到行内容的索引，之后的查询直接从内存中返回
+        （只读模式下按行号读取仍会从头解析工作表XML，因此索引保存行内容而不是行号；
+        未启用的用例不会被返回，也不放入索引，内存只随启用的用例数增长）
         :param case_id: 用例ID
-        :return: 测试用例数据
+        :return: 测试用例数据，不存在或未启用时为None
         """
-        all_data = self.read_data()
-        for case in all_data:
-            if case.get('case_id') == case_id:
-                return case
-        return None
+        if self._index is None:
+            self._index = self._build_index()
+        row = self._index.get(case_id)
+        if row is None:
+            return None
+        return dict(zip(self.headers, row))
+    
+    def _build_index(self) -> Dict[Any, tuple]:
+        """
+        扫描一次工作表，建立启用用例的ID到行内容的索引
+        （同一ID出现多次时以第一行为准，第一行未启用时该ID不可查）
+        :return: {case_id: 行}
+        """
+        if 'case_id' not in self.headers:
+            return {}
+        id_col = self.headers.index('case_id')
+        run_col = self.headers.index('run') if 'run' in self.headers else None
+        index, seen = {}, set()
+        for row in self.sheet.iter_rows(min_row=2, values_only=True):
+            case_id = _cell(row, id_col)
+            if case_id is None or case_id in seen:
+                continue
+            seen.add(case_id)
+            if _is_enabled(_cell(row, run_col)):
+                index[case_id] = row
+        return index
     
     def close(self):
         """关闭工作簿"""
         self.workbook.close()
 
 
+def _cell(row: tuple, col: Optional[int]):
+    """取行中指定列的值，列不存在或行较短时返回None"""
+    if col is None or col >= len(row):
+        return None
+    return row[col]
+
+
+def _is_enabled(value) -> bool:
+    """run列是否为'yes'"""
+    return str(value or '').strip().lower() == 'yes'
+
+
+def _matches(value, condition) -> bool:
+    """单元格值是否满足过滤条件"""
+    if callable(condition):
+        return bool(condition(value))
+    return value == condition
+
+
 if __name__ == '__main__':
     # 测试代码
     from config.config import TEST_DATA_FILE
@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+"""
+跨进程文件锁
+用于xdist多个worker之间串行化共享资源（驱动下载、缓存文件写入等）
+"""
+import os
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+
+class FileLock:
+    """基于操作系统文件锁的跨进程互斥锁，支持with语句"""
+
+    def __init__(self, path: str, timeout: float = 300, poll_interval: float = 0.1):
+        """
+        初始化文件锁
+        :param path: 锁文件路径
+        :param timeout: 获取锁的超时时间(秒)
+        :param poll_interval: 轮询间隔(秒)
+        """
+        self.path = path
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def acquire(self):
+        """获取锁，超时抛出TimeoutError"""
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT)
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                if fcntl:
+                    fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                else:
+                    msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+                self._fd = fd
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"获取文件锁超时: {self.path}")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """释放锁"""
+        if self._fd is None:
+            return
+        try:
+            if fcntl:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+            else:
+                os.lseek(self._fd, 0, os.SEEK_SET)
+                msvcrt.locking(self._fd, msvcrt.LK_UNLCK, 1)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.release()
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""
+增量执行
+每个用例的指纹由Excel行内容、其依赖的页面对象源码、config/config.py和conftest.py源码、执行引擎
+（api引擎另加pages/login_api.py）、被测服务（真实地址或本地替身服务，后者另加utils/login_server.py）
+以及目标构建号组成。
+增量模式下只执行指纹有变化或上次未通过的用例，其余用例直接取消选择
+"""
+import hashlib
+import inspect
+import json
+import os
+from typing import Dict, List
+
+import pytest
+
+from config.config import BASE_DIR, CACHE_DIR, LOGIN_URL
+
+
+INCREMENTAL_STATE_FILE = os.path.join(CACHE_DIR, 'incremental.json')
+CONFIG_FILE = os.path.join(BASE_DIR, 'config', 'config.py')
+CONFTEST_FILE = os.path.join(BASE_DIR, 'conftest.py')
+# 不在测试模块命名空间中、由conftest按引擎/选项替换进来的实现
+ENGINE_FILES = {'api': [os.path.join(BASE_DIR, 'pages', 'login_api.py')]}
+LOCAL_SERVER_FILE = os.path.join(BASE_DIR, 'utils', 'login_server.py')
+FINGERPRINT_PROPERTY = 'incremental_fingerprint'
+
+# 本次会话内已计算的源文件哈希（每次会话开始时清空）
+_file_digests: Dict[str, str] = {}
+
+
+def file_digest(path: str) -> str:
+    """计算源文件的sha256（同一进程内缓存结果）"""
+    if path not in _file_digests:
+        with open(path, 'rb') as f:
+            _file_digests[path] = hashlib.sha256(f.read()).hexdigest()
+    return _file_digests[path]
+
+
+def page_object_files(module) -> List[str]:
+    """
+    测试模块依赖的页面对象源文件：模块中引用的pages包内的类及其所有基类所在的文件
+    :param module: 测试模块
+    :return: 源文件路径列表（已排序）
+    """
+    files = set()
+    for value in vars(module).values():
+        if not inspect.isclass(value) or not value.__module__.startswith('pages.'):
+            continue
+        for cls in inspect.getmro(value):
+            if cls.__module__.startswith('pages.'):
+                files.add(inspect.getsourcefile(cls))
+    return sorted(files)
+
+
+def dependency_files(engine: str = 'ui', local_server: bool = False) -> List[str]:
+    """
+    引擎和被测服务相关的源文件：测试模块只引用LoginPage，api引擎的LoginApi和本地替身服务不会被page_object_files找到
+    :param engine: 执行引擎(ui/api)
+    :param local_server: 是否使用本地登录替身服务
+    :return: 源文件路径列表
+    """
+    return ENGINE_FILES.get(engine, []) + ([LOCAL_SERVER_FILE] if local_server else [])
+
+
+def server_target(local_server: bool = False, server_latency: float = None) -> str:
+    """
+    被测服务标识：本地替身服务每次监听的端口不同，只记录是否使用替身服务及其模拟延迟
+    :param local_server: 是否使用本地登录替身服务（--local-server）
+    :param server_latency: 替身服务的模拟延迟（--server-latency），None表示使用config.py中的默认值
+    :return: 标识字符串
+    """
+    if local_server:
+        return f"local-server(latency={'default' if server_latency is None else server_latency})"
+    return LOGIN_URL
+
+
+def fingerprint(item, build_id: str, engine: str = 'ui', target: str = LOGIN_URL,
+                dependencies: List[str] = ()) -> str:
+    """
+    计算用例指纹
+    :param item: pytest用例
+    :param build_id: 目标构建号
+    :param engine: 执行引擎(ui/api)，api引擎通过的用例不代表ui引擎也通过
+    :param target: 被测服务标识（见server_target），替身服务上通过的用例不代表真实服务也通过
+    :param dependencies: 额外的源文件（见dependency_files）
+    :return: 指纹(sha256)
+    """
+    digest = hashlib.sha256()
+    digest.update(item.nodeid.encode('utf-8'))
+    params = getattr(getattr(item, 'callspec', None), 'params', {})
+    digest.update(json.dumps(params, sort_keys=True, ensure_ascii=False, default=str).encode('utf-8'))
+    files = [str(item.path), CONFIG_FILE, CONFTEST_FILE] + page_object_files(item.module)
+    for path in files + sorted(set(dependencies) - set(files)):
+        digest.update(file_digest(path).encode('ascii'))
+    digest.update(engine.encode('utf-8'))
+    digest.update(target.encode('utf-8'))
+    digest.update((build_id or '').encode('utf-8'))
+    return digest.hexdigest()
+
+
+class IncrementalPlugin:
+    """增量执行插件：记录每个用例的指纹和结果，增量模式下跳过未变化且已通过的用例"""
+
+    def __init__(self, config, enabled: bool, build_id: str, engine: str = 'ui',
+                 local_server: bool = False, server_latency: float = None):
+        """
+        初始化插件
+        :param config: pytest配置
+        :param enabled: 是否启用增量模式（未启用时只记录指纹和结果）
+        :param build_id: 目标构建号
+        :param engine: 执行引擎(ui/api)
+        :param local_server: 是否使用本地登录替身服务
+        :param server_latency: 替身服务的模拟延迟(秒)
+        """
+        self.config = config
+        self.enabled = enabled
+        self.build_id = build_id
+        self.engine = engine
+        self.target = server_target(local_server, server_latency)
+        self.dependencies = dependency_files(engine, local_server)
+        self.state = self._load()
+        self.skipped = 0
+        self._results: Dict[str, Dict] = {}
+
+    def pytest_sessionstart(self, session):
+        """同一进程内再次执行pytest.main（run_tests.py --loop）时，源文件可能已修改，丢弃上一轮的哈希"""
+        _file_digests.clear()
+
+    @staticmethod
+    def _load() -> Dict:
+        """读取上次运行保存的指纹和结果"""
+        try:
+            with open(INCREMENTAL_STATE_FILE, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    @pytest.hookimpl(trylast=True)
+    def pytest_collection_modifyitems(self, config, items):
+        """计算用例指纹，增量模式下取消选择未变化且上次通过的用例"""
+        selected, deselected = [], []
+        for item in items:
+            fp = fingerprint(item, self.build_id, self.engine, self.target, self.dependencies)
+            # 通过user_properties把指纹带到测试报告中，xdist下主进程据此记录结果
+            item.user_properties.append((FINGERPRINT_PROPERTY, fp))
+            previous = self.state.get(item.nodeid)
+            if self.enabled and previous and previous['fingerprint'] == fp and previous['outcome'] == 'passed':
+                deselected.append(item)
+            else:
+                selected.append(item)
+
+        if deselected:
+            config.hook.pytest_deselected(items=deselected)
+            items[:] = selected
+        self.skipped = len(deselected)
+        if hasattr(config, 'workeroutput'):
+            config.workeroutput['incremental_skipped'] = self.skipped
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """xdist主进程: 各worker的取消选择结果相同，取回传的数量"""
+        self.skipped = max(self.skipped, getattr(node, 'workeroutput', {}).get('incremental_skipped', 0))
+
+    def pytest_runtest_logreport(self, report):
+        """记录用例结果：任一阶段失败即为失败，call阶段通过且无失败为通过"""
+        fp = dict(report.user_properties).get(FINGERPRINT_PROPERTY)
+        if fp is None or hasattr(self.config, 'workerinput'):
+            return
+        result = self._results.setdefault(report.nodeid, {'fingerprint': fp, 'outcome': None})
+        if report.failed:
+            result['outcome'] = 'failed'
+        elif report.when == 'call' and report.passed and result['outcome'] is None:
+            result['outcome'] = 'passed'
+
+    def pytest_sessionfinish(self, session):
+        """合并本次结果并保存（只在主进程保存）"""
+        if hasattr(self.config, 'workerinput') or not self._results:
+            return
+        for nodeid, result in self._results.items():
+            if result['outcome'] is None:
+                # 被跳过等没有明确结果的用例，下次仍需执行
+                self.state.pop(nodeid, None)
+            else:
+                self.state[nodeid] = result
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        tmp_file = f"{INCREMENTAL_STATE_FILE}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f, ensure_ascii=False, indent=2)
+        os.replace(tmp_file, INCREMENTAL_STATE_FILE)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """输出增量模式跳过的用例数"""
+        if not self.enabled:
+            return
+        terminalreporter.section("增量执行")
+        terminalreporter.write_line(
+            f"构建号: {self.build_id or '(未指定)'}, 指纹未变化且上次通过而跳过的用例: {self.skipped} 个"
+        )
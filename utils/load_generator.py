@@ -0,0 +1,287 @@
+# -*- coding: utf-8 -*-
+"""
+登录接口压测
+把Excel中的登录用例作为虚拟用户的请求数据循环回放，基于asyncio实现的HTTP/1.1客户端（每个虚拟用户一个keep-alive连接），
+支持三种负载模型：
+    closed   : 闭环，N个虚拟用户各自"请求-等待响应-思考时间"循环
+    ramp     : 爬坡，闭环模型，虚拟用户在ramp_up秒内逐个启动
+    fixed    : 固定速率（开环），按rate个/秒的节奏发起请求，最多N个并发连接；
+               延迟从计划发起时间算起，服务端变慢时排队等待的时间也计入延迟
+结果按时间窗口统计吞吐、延迟百分位和错误率
+"""
+import asyncio
+import itertools
+import ssl
+import time
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from config.config import LOGIN_FORM_FIELDS, LOGIN_RESPONSE_TIMEOUT
+from pages.login_api import classify_login_response
+from utils.step_timing import percentile
+
+
+PROFILES = ('closed', 'ramp', 'fixed')
+
+# 结果分类: ok(与预期一致), mismatch(登录结果与预期不符), error(服务异常、超时或连接失败)
+OUTCOMES = ('ok', 'mismatch', 'error')
+
+
+class HttpConnection:
+    """基于asyncio streams的HTTP/1.1 keep-alive连接，断开后自动重连"""
+
+    def __init__(self, url: str, timeout: float = LOGIN_RESPONSE_TIMEOUT):
+        """
+        初始化连接
+        :param url: 目标地址（决定主机、端口和是否使用TLS）
+        :param timeout: 单个请求超时时间(秒)
+        """
+        parts = urlsplit(url)
+        self.host = parts.hostname
+        self.use_tls = parts.scheme == 'https'
+        self.port = parts.port or (443 if self.use_tls else 80)
+        self.host_header = parts.netloc
+        self.timeout = timeout
+        self._reader = None
+        self._writer = None
+
+    async def request(self, method: str, path: str, body: bytes = b'',
+                      headers: Dict[str, str] = None) -> Tuple[int, Dict[str, str], bytes]:
+        """
+        发送请求
+        :return: (状态码, 响应头(小写键), 响应体)
+        """
+        return await asyncio.wait_for(self._request(method, path, body, headers or {}), self.timeout)
+
+    async def _request(self, method, path, body, headers):
+        if self._writer is None:
+            self._reader, self._writer = await asyncio.open_connection(
+                self.host, self.port, ssl=ssl.create_default_context() if self.use_tls else None
+            )
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host_header}", "Connection: keep-alive",
+                 f"Content-Length: {len(body)}"]
+        lines += [f"{name}: {value}" for name, value in headers.items()]
+        self._writer.write(("\r\n".join(lines) + "\r\n\r\n").encode('latin-1') + body)
+        try:
+            await self._writer.drain()
+            status, response_headers, response_body = await self._read_response()
+        except BaseException:
+            # 连接状态未知（超时、断开等），丢弃后下次重连
+            self.close()
+            raise
+        if response_headers.get('connection', '').lower() == 'close' or self._reader.at_eof():
+            self.close()
+        return status, response_headers, response_body
+
+    async def _read_response(self):
+        status_line = await self._reader.readline()
+        if not status_line:
+            raise ConnectionError("连接已被服务端关闭")
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self._reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            chunks = []
+            while True:
+                size = int((await self._reader.readline()).split(b';')[0], 16)
+                if size == 0:
+                    await self._reader.readline()
+                    break
+                chunks.append(await self._reader.readexactly(size))
+                await self._reader.readline()
+            body = b''.join(chunks)
+        elif 'content-length' in headers:
+            body = await self._reader.readexactly(int(headers['content-length']))
+        elif status in (204, 304) or 100 <= status < 200:
+            body = b''
+        else:
+            # 既没有Content-Length也不是chunked：响应体直到服务端关闭连接为止，之后该连接不能复用
+            body = await self._reader.read()
+        return status, headers, body
+
+    def close(self):
+        """关闭连接"""
+        if self._writer is not None:
+            self._writer.close()
+            self._reader = self._writer = None
+
+
+class LoadStats:
+    """按时间窗口汇总请求结果"""
+
+    def __init__(self, interval: float = 1.0):
+        """
+        :param interval: 统计窗口长度(秒)
+        """
+        self.interval = interval
+        self.started_at = time.perf_counter()
+        self.ended_at: Optional[float] = None  # 压测结束时间，未设置时以最后一个请求的完成时间为准
+        self.last_finished_at = self.started_at
+        self.windows: Dict[int, Dict] = {}
+        self.latencies: List[float] = []
+        self.outcomes = dict.fromkeys(OUTCOMES, 0)
+
+    def record(self, finished_at: float, latency: float, outcome: str):
+        """
+        记录一个请求
+        :param finished_at: 完成时间(perf_counter)
+        :param latency: 延迟(秒)
+        :param outcome: 结果分类
+        """
+        index = int((finished_at - self.started_at) // self.interval)
+        window = self.windows.setdefault(index, {'latencies': [], **dict.fromkeys(OUTCOMES, 0)})
+        window['latencies'].append(latency)
+        window[outcome] += 1
+        self.latencies.append(latency)
+        self.outcomes[outcome] += 1
+        self.last_finished_at = max(self.last_finished_at, finished_at)
+
+    @staticmethod
+    def _describe(latencies: List[float], outcomes: Dict[str, int], seconds: float) -> Dict:
+        total = sum(outcomes[outcome] for outcome in OUTCOMES)
+        return {
+            'requests': total,
+            'throughput': round(total / seconds, 2) if seconds > 0 else 0.0,
+            'p50_ms': round(percentile(latencies, 50) * 1000, 1),
+            'p95_ms': round(percentile(latencies, 95) * 1000, 1),
+            'p99_ms': round(percentile(latencies, 99) * 1000, 1),
+            'max_ms': round(max(latencies) * 1000, 1) if latencies else 0.0,
+            'mismatch_rate': round(outcomes['mismatch'] / total, 4) if total else 0.0,
+            'error_rate': round(outcomes['error'] / total, 4) if total else 0.0,
+        }
+
+    def timeline(self) -> List[Dict]:
+        """每个时间窗口的统计（最后一个窗口通常不完整，吞吐按其实际经过的时间计算）"""
+        elapsed = (self.ended_at or self.last_finished_at) - self.started_at
+        result = []
+        for index in sorted(self.windows):
+            window = self.windows[index]
+            row = {'t': round(index * self.interval, 2)}
+            seconds = min(self.interval, elapsed - index * self.interval)
+            row.update(self._describe(window['latencies'], window, seconds))
+            result.append(row)
+        return result
+
+    def summary(self, duration: float) -> Dict:
+        """整体统计"""
+        result = self._describe(self.latencies, self.outcomes, duration)
+        result.update(self.outcomes)
+        result['duration'] = round(duration, 2)
+        return result
+
+
+class LoadGenerator:
+    """登录接口负载生成器"""
+
+    def __init__(self, login_url: str, cases: List[Dict], users: int = 10, profile: str = 'closed',
+                 duration: float = 30, rate: float = 10, ramp_up: float = 10, think_time: float = 0,
+                 interval: float = 1.0, timeout: float = LOGIN_RESPONSE_TIMEOUT):
+        """
+        :param login_url: 登录地址
+        :param cases: 登录用例（username/password/expected）
+        :param users: 虚拟用户数（fixed模型下为最大并发连接数）
+        :param profile: 负载模型 closed/ramp/fixed
+        :param duration: 持续时间(秒)
+        :param rate: fixed模型的请求速率(个/秒)
+        :param ramp_up: ramp模型的爬坡时间(秒)
+        :param think_time: 闭环模型中每个虚拟用户两次请求之间的思考时间(秒)
+        :param interval: 统计窗口长度(秒)
+        :param timeout: 单个请求超时时间(秒)
+        """
+        if profile not in PROFILES:
+            raise ValueError(f"不支持的负载模型: {profile}，可选: {', '.join(PROFILES)}")
+        if not cases:
+            raise ValueError("没有可回放的登录用例")
+        self.login_url = login_url
+        self.path = urlsplit(login_url).path or '/'
+        self.cases = cases
+        self.users = users
+        self.profile = profile
+        self.duration = duration
+        self.rate = rate
+        self.ramp_up = ramp_up
+        self.think_time = think_time
+        self.interval = interval
+        self.timeout = timeout
+        self._case_cycle = itertools.cycle(cases)
+        self.stats: Optional[LoadStats] = None
+
+    async def _login_once(self, connection: HttpConnection, scheduled_at: float = None):
+        """发送一次登录请求并记录结果，scheduled_at为计划发起时间（开环模型）"""
+        case = next(self._case_cycle)
+        body = urlencode({
+            LOGIN_FORM_FIELDS['username']: case.get('username') or '',
+            LOGIN_FORM_FIELDS['password']: case.get('password') or '',
+        }).encode('utf-8')
+        start = scheduled_at if scheduled_at is not None else time.perf_counter()
+        try:
+            status, headers, response = await connection.request(
+                'POST', self.path, body, {'Content-Type': 'application/x-www-form-urlencoded'}
+            )
+            result = classify_login_response(
+                status, headers.get('location'), response.decode('utf-8', errors='replace'), self.login_url
+            )
+            outcome = 'error' if result == 'error' else ('ok' if result == case.get('expected') else 'mismatch')
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError, ValueError, IndexError):
+            outcome = 'error'
+        finished = time.perf_counter()
+        self.stats.record(finished, finished - start, outcome)
+
+    async def _virtual_user(self, start_delay: float, deadline: float):
+        """闭环虚拟用户"""
+        await asyncio.sleep(start_delay)
+        connection = HttpConnection(self.login_url, self.timeout)
+        try:
+            while time.perf_counter() < deadline:
+                await self._login_once(connection)
+                if self.think_time > 0:
+                    await asyncio.sleep(self.think_time)
+        finally:
+            connection.close()
+
+    async def _fixed_rate(self, deadline: float):
+        """开环：按固定速率发起请求，空闲连接不足时排队"""
+        idle = asyncio.Queue()
+        connections = [HttpConnection(self.login_url, self.timeout) for _ in range(self.users)]
+        for connection in connections:
+            idle.put_nowait(connection)
+
+        async def fire(scheduled_at):
+            connection = await idle.get()
+            try:
+                await self._login_once(connection, scheduled_at)
+            finally:
+                idle.put_nowait(connection)
+
+        tasks = []
+        next_at = time.perf_counter()
+        while next_at < deadline:
+            delay = next_at - time.perf_counter()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            tasks.append(asyncio.ensure_future(fire(next_at)))
+            next_at += 1.0 / self.rate
+        await asyncio.gather(*tasks)
+        for connection in connections:
+            connection.close()
+
+    async def run(self) -> LoadStats:
+        """
+        执行压测
+        :return: 统计结果
+        """
+        self.stats = LoadStats(self.interval)
+        deadline = self.stats.started_at + self.duration
+        if self.profile == 'fixed':
+            await self._fixed_rate(deadline)
+        else:
+            step = self.ramp_up / self.users if self.profile == 'ramp' else 0
+            await asyncio.gather(*(self._virtual_user(index * step, deadline) for index in range(self.users)))
+        self.stats.ended_at = time.perf_counter()
+        return self.stats
@@ -0,0 +1,234 @@
+# -*- coding: utf-8 -*-
+"""
+本地登录替身服务
+在进程内启动一个HTTP服务，提供与LoginPage定位器一致的登录页面和表单提交接口，
+用于在没有真实被测环境时验证测试框架本身（UI引擎和API引擎都可以直接对接），
+也是基准测试的被测目标：错误提示按ERROR_MESSAGE_DISPLAY_TIME自动隐藏，响应延迟可配置
+"""
+import html
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict
+from urllib.parse import parse_qs, urlsplit
+
+from config.config import SUPER_ADMIN, ERROR_MESSAGE, ERROR_MESSAGE_DISPLAY_TIME, LOGIN_FORM_FIELDS
+
+
+LOGIN_PATH = '/login'
+HOME_PATH = '/home'
+SESSION_COOKIE = 'session'
+# 保留的登录会话数上限，超出时丢弃最早创建的会话（压测时每次登录成功都会创建会话）
+MAX_SESSIONS = 10000
+
+LOGIN_PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>登录</title></head>
+<body>
+<div class="login-container">
+  <form method="post" action="{login_path}">
+    <div><input id="identifier" name="{username_field}" type="text" value="{username}" placeholder="账号"></div>
+    <div><input id="password" name="{password_field}" type="password" placeholder="密码"></div>
+    <button type="submit" class="bg-gradient-to-r text-white">登录</button>
+  </form>
+  {error}
+</div>
+</body>
+</html>
+"""
+
+# 错误提示（toast），展示指定时间后自动隐藏
+ERROR_TOAST_TEMPLATE = """<div class="error-message" role="alert">{message}</div>
+  <script>
+    setTimeout(function () {{
+      document.querySelectorAll('.error-message').forEach(function (el) {{ el.style.display = 'none'; }});
+    }}, {display_ms});
+  </script>"""
+
+HOME_PAGE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head><meta charset="utf-8"><title>首页</title></head>
+<body><h1 class="welcome">欢迎, {username}</h1></body>
+</html>
+"""
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    """每个连接一个线程；加大监听队列，压测时大量并发建连不会因队列溢出而等待SYN重传(约1秒)"""
+
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class LoginServer:
+    """本地登录替身服务，支持with语句"""
+
+    def __init__(self, accounts: Dict[str, str] = None, host: str = '127.0.0.1', port: int = 0,
+                 latency: float = 0.0, error_display_time: float = ERROR_MESSAGE_DISPLAY_TIME,
+                 max_sessions: int = MAX_SESSIONS):
+        """
+        初始化服务
+        :param accounts: 允许登录的账号 {用户名: 密码}，默认使用SUPER_ADMIN
+        :param host: 监听地址
+        :param port: 监听端口，0表示随机可用端口
+        :param latency: 每个响应的模拟延迟(秒)，用于模拟真实服务端耗时
+        :param error_display_time: 错误提示展示时间(秒)，之后自动隐藏
+        :param max_sessions: 保留的登录会话数上限
+        """
+        self.accounts = accounts or {SUPER_ADMIN['username']: SUPER_ADMIN['password']}
+        self.latency = latency
+        self.error_display_time = error_display_time
+        self.sessions: Dict[str, str] = {}  # {会话ID: 用户名}，按创建顺序
+        self.max_sessions = max_sessions
+        self.login_attempts = 0
+        self._lock = threading.Lock()
+        self._httpd = _HTTPServer((host, port), self._make_handler())
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        """服务根地址"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def login_url(self) -> str:
+        """登录页面地址"""
+        return self.base_url + LOGIN_PATH
+
+    def start(self):
+        """在后台线程中启动服务"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name='login-server', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """停止服务"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    def authenticate(self, username: str, password: str) -> bool:
+        """校验账号密码，并统计登录请求次数"""
+        with self._lock:
+            self.login_attempts += 1
+        return bool(username) and self.accounts.get(username) == password
+
+    def create_session(self, username: str) -> str:
+        """创建登录会话，返回会话ID；会话数超过上限时丢弃最早创建的会话"""
+        token = secrets.token_hex(16)
+        with self._lock:
+            self.sessions[token] = username
+            while len(self.sessions) > self.max_sessions:
+                del self.sessions[next(iter(self.sessions))]
+        return token
+
+    def render_login_page(self, username: str = '', error: bool = False) -> str:
+        """渲染登录页面，error为True时带错误提示"""
+        return LOGIN_PAGE_TEMPLATE.format(
+            login_path=LOGIN_PATH,
+            username_field=LOGIN_FORM_FIELDS['username'],
+            password_field=LOGIN_FORM_FIELDS['password'],
+            username=html.escape(username or '', quote=True),
+            error=ERROR_TOAST_TEMPLATE.format(
+                message=html.escape(ERROR_MESSAGE),
+                display_ms=int(self.error_display_time * 1000),
+            ) if error else '',
+        )
+
+    def _make_handler(self):
+        """创建绑定到当前服务实例的请求处理类"""
+        server = self
+
+        class Handler(LoginRequestHandler):
+            login_server = server
+
+        return Handler
+
+
+class LoginRequestHandler(BaseHTTPRequestHandler):
+    """登录替身服务的请求处理"""
+
+    # HTTP/1.1 支持keep-alive，客户端可以复用连接
+    protocol_version = 'HTTP/1.1'
+    # 响应头和响应体分两次写出，关闭Nagle算法避免keep-alive连接上的延迟确认等待(约40ms)
+    disable_nagle_algorithm = True
+    login_server: LoginServer = None
+
+    def do_GET(self):
+        """登录页面、登录后首页"""
+        path = urlsplit(self.path).path
+        if path == '/':
+            # 站点根路径：已登录进入首页，未登录跳转到登录页
+            logged_in = self._session_id() in self.login_server.sessions
+            self._redirect(HOME_PATH if logged_in else LOGIN_PATH)
+        elif path == LOGIN_PATH:
+            self._send_html(200, self.login_server.render_login_page())
+        elif path == HOME_PATH:
+            username = self.login_server.sessions.get(self._session_id())
+            if username is None:
+                self._redirect(LOGIN_PATH)
+            else:
+                self._send_html(200, HOME_PAGE.format(username=html.escape(username)))
+        else:
+            self._send_html(404, '<h1>404</h1>')
+
+    def do_POST(self):
+        """提交登录表单：成功302跳转到首页，失败返回带错误提示的登录页"""
+        if urlsplit(self.path).path != LOGIN_PATH:
+            self._send_html(404, '<h1>404</h1>')
+            return
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)
+        username = form.get(LOGIN_FORM_FIELDS['username'], [''])[0]
+        password = form.get(LOGIN_FORM_FIELDS['password'], [''])[0]
+
+        if self.login_server.authenticate(username, password):
+            token = self.login_server.create_session(username)
+            self._redirect(HOME_PATH, cookie=f"{SESSION_COOKIE}={token}; Path=/; HttpOnly")
+        else:
+            self._send_html(200, self.login_server.render_login_page(username, error=True))
+
+    def log_message(self, format, *args):
+        """不输出访问日志"""
+
+    def _session_id(self) -> str:
+        """从Cookie中取出会话ID"""
+        for part in (self.headers.get('Cookie') or '').split(';'):
+            name, _, value = part.strip().partition('=')
+            if name == SESSION_COOKIE:
+                return value
+        return ''
+
+    def _delay(self):
+        """模拟服务端响应延迟"""
+        if self.login_server.latency > 0:
+            time.sleep(self.login_server.latency)
+
+    def _send_html(self, status: int, body: str):
+        """返回HTML"""
+        self._delay()
+        data = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _redirect(self, location: str, cookie: str = None):
+        """302跳转"""
+        self._delay()
+        self.send_response(302)
+        self.send_header('Location', location)
+        if cookie:
+            self.send_header('Set-Cookie', cookie)
+        self.send_header('Content-Length', '0')
+        self.end_headers()
@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+"""
+最长处理时间优先(LPT)的xdist调度器
+按历史耗时从长到短排列用例，每个worker只保留两个待执行用例（xdist的worker需要知道下一个用例
+才会开始执行当前用例），执行完一个就领取剩余用例中预计最长的一个，使各worker尽量同时结束
+"""
+import time
+from typing import Callable, Dict, List
+
+from xdist.scheduler import LoadScheduling
+
+
+# 每个worker保留的待执行用例数
+WORKER_QUEUE_SIZE = 2
+
+
+class LPTScheduling(LoadScheduling):
+    """基于历史耗时的LPT调度"""
+
+    def __init__(self, config, log, predictor: Callable[[str], float]):
+        """
+        初始化调度器
+        :param config: pytest配置
+        :param log: xdist日志
+        :param predictor: 根据nodeid预测耗时的函数
+        """
+        super().__init__(config, log)
+        self.predictor = predictor
+        self.predicted: Dict[str, float] = {}
+        self.schedule_order: List[str] = []
+        self.started_at = None
+
+    def schedule(self):
+        """首次调度时按预测耗时降序排列用例，轮流给每个worker分配"""
+        assert self.collection_is_completed
+
+        if self.collection is not None:
+            for node in self.nodes:
+                self.check_schedule(node)
+            return
+
+        if not self._check_nodes_have_same_collection():
+            self.log("**Different tests collected, aborting run**")
+            return
+
+        self.collection = next(iter(self.node2collection.values()))
+        self.predicted = {nodeid: self.predictor(nodeid) for nodeid in self.collection}
+        # sorted是稳定排序，耗时相同的用例保持原有顺序
+        self.pending[:] = sorted(range(len(self.collection)),
+                                 key=lambda index: self.predicted[self.collection[index]],
+                                 reverse=True)
+        self.schedule_order = [self.collection[index] for index in self.pending]
+        self.started_at = time.time()
+        if not self.collection:
+            return
+
+        for _ in range(WORKER_QUEUE_SIZE):
+            for node in self.nodes:
+                self._send_tests(node, 1)
+
+        if not self.pending:
+            for node in self.nodes:
+                node.shutdown()
+
+    def check_schedule(self, node, duration: float = 0):
+        """worker完成一个用例后补足队列，剩余用例中最长的总是交给最先空闲的worker"""
+        if node.shutting_down:
+            return
+
+        if self.pending:
+            missing = WORKER_QUEUE_SIZE - len(self.node2pending[node])
+            if missing > 0:
+                self._send_tests(node, missing)
+        else:
+            node.shutdown()
+
+        self.log("num items waiting for node:", len(self.pending))
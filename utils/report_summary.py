@@ -0,0 +1,255 @@
+# -*- coding: utf-8 -*-
+"""
+轻量测试报告摘要
+不启动JVM的allure命令行，直接逐个读取allure结果目录中的 *-result.json，
+输出每个用例的状态、耗时和失败附件链接（summary.json + index.html）。
+已读取的结果文件记录在summary.json中，再次更新时只解析新增或变化的文件；
+结果目录被清空（--clean-alluredir）后自动重新汇总
+
+用法:
+    python -m utils.report_summary                  # 汇总reports/allure到reports/summary
+    python -m utils.report_summary --watch          # 测试执行期间持续更新（页面自动刷新）
+"""
+import argparse
+import html
+import json
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from config.config import ALLURE_REPORT_DIR, SUMMARY_REPORT_DIR
+
+
+RESULT_SUFFIX = '-result.json'
+STATUSES = ('failed', 'broken', 'passed', 'skipped', 'unknown')
+MESSAGE_LIMIT = 500
+
+HTML_TEMPLATE = """<!DOCTYPE html>
+<html lang="zh-CN">
+<head>
+<meta charset="utf-8">
+{refresh}<title>测试结果摘要</title>
+<style>
+body {{ font-family: sans-serif; margin: 24px; color: #333; }}
+table {{ border-collapse: collapse; width: 100%; font-size: 14px; }}
+th, td {{ border-bottom: 1px solid #ddd; padding: 6px 8px; text-align: left; vertical-align: top; }}
+th {{ background: #f5f5f5; }}
+.failed {{ color: #d9534f; }} .broken {{ color: #f0ad4e; }} .passed {{ color: #5cb85c; }}
+.skipped, .unknown {{ color: #999; }}
+pre {{ margin: 0; white-space: pre-wrap; font-size: 12px; }}
+</style>
+</head>
+<body>
+<h2>测试结果摘要</h2>
+<p>{totals}</p>
+<p>更新时间: {generated_at}</p>
+<table>
+<tr><th>用例</th><th>状态</th><th>耗时(s)</th><th>失败信息</th><th>附件</th></tr>
+{rows}
+</table>
+</body>
+</html>
+"""
+
+
+def _write_atomic(path: str, text: str):
+    """先写临时文件再替换，浏览器或其他进程不会读到半个文件"""
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class ReportSummarizer:
+    """增量汇总allure结果目录"""
+
+    def __init__(self, results_dir: str = ALLURE_REPORT_DIR, output_dir: str = SUMMARY_REPORT_DIR):
+        """
+        :param results_dir: allure结果目录（--alluredir）
+        :param output_dir: 摘要输出目录
+        """
+        self.results_dir = results_dir
+        self.output_dir = output_dir
+        self.json_path = os.path.join(output_dir, 'summary.json')
+        self.html_path = os.path.join(output_dir, 'index.html')
+        self.files: Dict[str, int] = {}
+        self.cases: Dict[str, Dict] = {}
+        self._load()
+
+    def _load(self):
+        """读取上次的摘要，继续增量汇总"""
+        try:
+            with open(self.json_path, encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get('results_dir') == os.path.abspath(self.results_dir):
+            self.files = data.get('files', {})
+            self.cases = {case['key']: case for case in data.get('cases', [])}
+
+    def _parse(self, name: str) -> Optional[Dict]:
+        """
+        解析一个结果文件
+        :return: 用例摘要，文件正在写入（内容不完整）时为None
+        """
+        try:
+            with open(os.path.join(self.results_dir, name), encoding='utf-8') as f:
+                result = json.load(f)
+        except (OSError, ValueError):
+            return None
+        status = result.get('status') or 'unknown'
+        start, stop = result.get('start') or 0, result.get('stop') or 0
+        labels = {label.get('name'): label.get('value') for label in result.get('labels') or []}
+        case = {
+            'key': result.get('historyId') or result.get('fullName') or name,
+            'name': result.get('name') or name,
+            'full_name': result.get('fullName'),
+            'feature': labels.get('feature'),
+            'status': status if status in STATUSES else 'unknown',
+            'start': start,
+            'stop': stop,
+            'duration': round(max(stop - start, 0) / 1000, 3),
+            'message': ((result.get('statusDetails') or {}).get('message') or '')[:MESSAGE_LIMIT],
+            'attachments': [],
+        }
+        if case['status'] in ('failed', 'broken'):
+            # 失败链接：只保留顶层附件（失败截图、页面源码等），链接到结果目录中的文件
+            case['attachments'] = [
+                {'name': attachment.get('name'),
+                 'href': os.path.relpath(os.path.join(self.results_dir, attachment['source']), self.output_dir)}
+                for attachment in result.get('attachments') or [] if attachment.get('source')
+            ]
+        return case
+
+    def update(self, refresh: int = 0) -> int:
+        """
+        解析新增或变化的结果文件并重写摘要
+        :param refresh: 页面自动刷新间隔(秒)，0表示不刷新
+        :return: 本次解析的结果文件数
+        """
+        try:
+            current = {entry.name: entry.stat().st_mtime_ns for entry in os.scandir(self.results_dir)
+                       if entry.name.endswith(RESULT_SUFFIX)}
+        except FileNotFoundError:
+            current = {}
+        if any(name not in current for name in self.files):
+            # 结果目录已被清空或替换，重新汇总
+            self.files, self.cases = {}, {}
+
+        parsed = 0
+        for name, mtime_ns in sorted(current.items()):
+            if self.files.get(name) == mtime_ns:
+                continue
+            case = self._parse(name)
+            if case is None:
+                continue
+            self.files[name] = mtime_ns
+            previous = self.cases.get(case['key'])
+            # 同一用例有多个结果（重跑）时保留最后一次
+            if previous is None or case['stop'] >= previous['stop']:
+                self.cases[case['key']] = case
+            parsed += 1
+
+        if parsed or not os.path.exists(self.json_path):
+            self.write(refresh)
+        return parsed
+
+    def totals(self) -> Dict:
+        """各状态用例数、累计耗时和墙钟耗时"""
+        cases = list(self.cases.values())
+        totals = {status: sum(1 for case in cases if case['status'] == status) for status in STATUSES}
+        totals['total'] = len(cases)
+        totals['duration'] = round(sum(case['duration'] for case in cases), 3)
+        totals['wall_time'] = round(
+            (max(case['stop'] for case in cases) - min(case['start'] for case in cases)) / 1000, 3
+        ) if cases else 0.0
+        return totals
+
+    def sorted_cases(self) -> List[Dict]:
+        """失败的用例在前，同状态按名称排序"""
+        return sorted(self.cases.values(), key=lambda case: (STATUSES.index(case['status']), case['name']))
+
+    def write(self, refresh: int = 0):
+        """写入summary.json和index.html"""
+        os.makedirs(self.output_dir, exist_ok=True)
+        generated_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        totals = self.totals()
+        cases = self.sorted_cases()
+        _write_atomic(self.json_path, json.dumps({
+            'generated_at': generated_at,
+            'results_dir': os.path.abspath(self.results_dir),
+            'totals': totals,
+            'cases': cases,
+            'files': self.files,
+        }, ensure_ascii=False, indent=2))
+
+        rows = []
+        for case in cases:
+            links = ' '.join(f'<a href="{html.escape(attachment["href"])}">{html.escape(attachment["name"] or "附件")}</a>'
+                             for attachment in case['attachments'])
+            rows.append(
+                f'<tr><td title="{html.escape(case["full_name"] or "")}">{html.escape(case["name"])}</td>'
+                f'<td class="{case["status"]}">{case["status"]}</td><td>{case["duration"]}</td>'
+                f'<td><pre>{html.escape(case["message"])}</pre></td><td>{links}</td></tr>'
+            )
+        _write_atomic(self.html_path, HTML_TEMPLATE.format(
+            refresh=f'<meta http-equiv="refresh" content="{refresh}">\n' if refresh else '',
+            totals=html.escape(format_totals(totals)),
+            generated_at=generated_at,
+            rows='\n'.join(rows),
+        ))
+
+    def watch(self, interval: float = 2.0):
+        """持续更新摘要，直到Ctrl+C"""
+        try:
+            while True:
+                if self.update(refresh=max(1, round(interval))):
+                    print(format_totals(self.totals()))
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.write()
+
+
+def format_totals(totals: Dict) -> str:
+    """格式化汇总信息"""
+    return (f"共 {totals['total']} 个用例: 通过 {totals['passed']}, 失败 {totals['failed']}, "
+            f"异常 {totals['broken']}, 跳过 {totals['skipped']}；"
+            f"累计耗时 {totals['duration']}s, 墙钟耗时 {totals['wall_time']}s")
+
+
+def generate_summary(results_dir: str = ALLURE_REPORT_DIR, output_dir: str = SUMMARY_REPORT_DIR) -> Dict:
+    """
+    更新摘要
+    :return: 汇总信息
+    """
+    summarizer = ReportSummarizer(results_dir, output_dir)
+    summarizer.update()
+    return summarizer.totals()
+
+
+def main(argv=None) -> int:
+    """命令行入口"""
+    parser = argparse.ArgumentParser(description="不启动allure命令行，汇总allure结果为轻量的JSON/HTML摘要")
+    parser.add_argument('--results', default=ALLURE_REPORT_DIR, help="allure结果目录")
+    parser.add_argument('--output', default=SUMMARY_REPORT_DIR, help="摘要输出目录")
+    parser.add_argument('--watch', action='store_true', help="持续监视结果目录并更新摘要")
+    parser.add_argument('--interval', type=float, default=2.0, help="监视间隔(秒)")
+    options = parser.parse_args(argv)
+
+    summarizer = ReportSummarizer(options.results, options.output)
+    if options.watch:
+        print(f"监视 {options.results}，摘要: {summarizer.html_path}（Ctrl+C 结束）")
+        summarizer.watch(options.interval)
+    else:
+        start = time.perf_counter()
+        parsed = summarizer.update()
+        print(f"{format_totals(summarizer.totals())}\n"
+              f"解析 {parsed} 个结果文件，耗时 {time.perf_counter() - start:.3f}s，摘要: {summarizer.html_path}")
+    totals = summarizer.totals()
+    return 1 if totals['failed'] or totals['broken'] else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
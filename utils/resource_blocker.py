@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""
+页面资源拦截（仅Chrome）
+打开页面时通过CDP Network.setBlockedURLs拦截与登录校验无关的资源（图片、字体、统计脚本等）。
+
+setBlockedURLs只支持URL通配符，无法按资源类型拦截，也没有放行规则，因此：
+    1. 每个页面第一次打开时（或基准超过RESOURCE_BASELINE_TTL后）不拦截，连续加载两次：第一次从performance日志中
+       记录该页面加载的资源（URL、类型、大小），同时预热HTTP缓存、DNS和连接；第二次的加载耗时作为基准。
+       之后拦截时打开页面同样是预热过的浏览器，节省的耗时不包含缓存预热带来的差异
+    2. 之后打开该页面时，按资源类型、拦截/放行通配符从基准资源中选出要拦截的URL逐个下发；
+       未配置放行规则时，拦截通配符也直接下发给浏览器（基准中没有出现过的新资源同样会被拦截）
+每次打开页面统计请求数、被拦截的请求数和字节数（按基准中记录的大小），以及相对基准节省的页面加载耗时
+"""
+import json
+import logging
+import os
+import time
+import weakref
+from fnmatch import fnmatchcase
+from typing import Dict, Iterable, Optional
+from urllib.parse import urlsplit
+
+import pytest
+
+from config.config import (
+    ALLOWED_URL_PATTERNS, BLOCKED_RESOURCE_TYPES, BLOCKED_URL_PATTERNS, RESOURCE_BASELINE_TTL, RESOURCE_PROFILE_FILE
+)
+from utils.file_lock import FileLock
+
+
+logger = logging.getLogger(__name__)
+
+BLOCKING_PROPERTY = 'resource_blocking'
+
+# 启用performance日志的capability，拦截统计依赖其中的Network事件
+PERFORMANCE_LOG_CAPABILITIES = {'goog:loggingPrefs': {'performance': 'ALL'}}
+
+# 页面自身的加载耗时（导航开始到load事件结束）
+LOAD_TIME_SCRIPT = """
+var entry = performance.getEntriesByType('navigation')[0];
+return entry && entry.loadEventEnd > 0 ? entry.loadEventEnd - entry.startTime : null;
+"""
+
+# 本地替身服务每次监听随机端口，这些主机上的地址去掉端口后再作为基准的键
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost')
+
+_blockers = weakref.WeakKeyDictionary()
+
+
+def blocker_for(driver) -> Optional['ResourceBlocker']:
+    """
+    获取driver对应的资源拦截器
+    :param driver: WebDriver实例
+    :return: 未启用资源拦截时为None
+    """
+    return _blockers.get(driver)
+
+
+class ResourceRules:
+    """拦截/放行规则"""
+
+    def __init__(self, deny_types: Iterable[str] = BLOCKED_RESOURCE_TYPES,
+                 deny_patterns: Iterable[str] = BLOCKED_URL_PATTERNS,
+                 allow_patterns: Iterable[str] = ALLOWED_URL_PATTERNS):
+        """
+        :param deny_types: 拦截的CDP资源类型，如 Image、Font、Media、Script
+        :param deny_patterns: 拦截的URL通配符
+        :param allow_patterns: 放行的URL通配符，优先于拦截规则
+        """
+        self.deny_types = set(deny_types)
+        self.deny_patterns = list(deny_patterns)
+        self.allow_patterns = list(allow_patterns)
+
+    def should_block(self, url: str, resource_type: str) -> bool:
+        """是否拦截该请求（页面文档本身从不拦截）"""
+        if resource_type == 'Document' or any(fnmatchcase(url, pattern) for pattern in self.allow_patterns):
+            return False
+        return resource_type in self.deny_types or any(fnmatchcase(url, pattern) for pattern in self.deny_patterns)
+
+    def browser_patterns(self) -> list:
+        """可以直接下发给浏览器的通配符：有放行规则时无法表达例外，只按基准资源逐个下发"""
+        return [] if self.allow_patterns else list(self.deny_patterns)
+
+
+def _normalize(url: str) -> str:
+    """本机地址去掉端口"""
+    parts = urlsplit(url)
+    if parts.hostname in LOOPBACK_HOSTS and parts.port is not None:
+        return parts._replace(netloc=parts.hostname).geturl()
+    return url
+
+
+def _localize(url: str, page_url: str) -> str:
+    """把去掉端口的本机地址还原为当前页面的端口"""
+    parts, page = urlsplit(url), urlsplit(page_url)
+    if parts.hostname in LOOPBACK_HOSTS and parts.port is None and parts.hostname == page.hostname:
+        return parts._replace(netloc=page.netloc).geturl()
+    return url
+
+
+class ResourceProfile:
+    """各页面的基准资源清单和加载耗时（文件存储，xdist各worker共享；本机地址不区分端口）"""
+
+    def __init__(self, path: str = RESOURCE_PROFILE_FILE, ttl: float = RESOURCE_BASELINE_TTL):
+        """
+        :param path: 基准文件路径
+        :param ttl: 基准加载耗时的有效期(秒)
+        """
+        self.path = path
+        self.ttl = ttl
+        self.pages: Dict[str, Dict] = self._read()
+
+    def _read(self) -> Dict:
+        try:
+            with open(self.path, encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def get(self, page_url: str) -> Optional[Dict]:
+        """
+        获取页面基准
+        :return: {'resources': {url: {'type', 'bytes'}}, 'load_ms': 基准加载耗时, 'measured_at': 测量时间}，
+                 没有或已过期时为None
+        """
+        page = self.pages.get(_normalize(page_url))
+        if page is None or page.get('load_ms') is None or time.time() - page.get('measured_at', 0) > self.ttl:
+            return None
+        return dict(page, resources={_localize(url, page_url): info for url, info in page['resources'].items()})
+
+    def update(self, page_url: str, resources: Dict[str, Dict], load_ms: Optional[float] = None):
+        """
+        合并页面资源（load_ms不为None时同时更新基准加载耗时和测量时间），只在有新资源或新基准时写文件
+        :param page_url: 页面地址
+        :param resources: {url: {'type', 'bytes'}}
+        :param load_ms: 未拦截时的页面加载耗时(毫秒)
+        """
+        key = _normalize(page_url)
+        resources = {_normalize(url): info for url, info in resources.items()}
+        if load_ms is None and not self._merge(self.pages.get(key, {'resources': {}}), resources):
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        with FileLock(self.path + '.lock'):
+            self.pages = self._read()
+            page = self.pages.setdefault(key, {'resources': {}, 'load_ms': None})
+            self._merge(page, resources)
+            if load_ms is not None:
+                page['load_ms'] = load_ms
+                page['measured_at'] = time.time()
+            tmp_path = f"{self.path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.pages, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def _merge(page: Dict, resources: Dict[str, Dict]) -> bool:
+        """
+        把资源合并到页面基准中
+        :return: 是否有新资源或新的大小
+        """
+        changed = False
+        for url, info in resources.items():
+            # 被拦截或命中缓存的请求没有大小，保留基准中记录的大小
+            known = page['resources'].get(url)
+            if known is None or (info['bytes'] and info != known):
+                page['resources'][url] = info
+                changed = True
+        return changed
+
+
+def parse_network_events(entries) -> Dict[str, Dict]:
+    """
+    从performance日志中整理本次导航的请求
+    :param entries: driver.get_log('performance')的结果
+    :return: {requestId: {'url', 'type', 'bytes', 'blocked'}}
+    """
+    requests = {}
+    for entry in entries:
+        try:
+            message = json.loads(entry['message'])['message']
+        except (KeyError, ValueError, TypeError):
+            continue
+        method, params = message.get('method'), message.get('params', {})
+        if method == 'Network.requestWillBeSent':
+            requests[params['requestId']] = {
+                'url': params['request']['url'], 'type': params.get('type', 'Other'), 'bytes': 0, 'blocked': False
+            }
+        elif method == 'Network.loadingFinished' and params.get('requestId') in requests:
+            requests[params['requestId']]['bytes'] = int(params.get('encodedDataLength', 0))
+        elif method == 'Network.loadingFailed' and params.get('requestId') in requests:
+            if params.get('blockedReason') == 'inspector':
+                requests[params['requestId']]['blocked'] = True
+    return requests
+
+
+class ResourceBlocker:
+    """绑定到一个WebDriver的资源拦截器"""
+
+    def __init__(self, driver, rules: ResourceRules, profile: ResourceProfile, on_navigation=None):
+        """
+        :param driver: WebDriver实例（需要启用performance日志，见PERFORMANCE_LOG_CAPABILITIES）
+        :param rules: 拦截/放行规则
+        :param profile: 页面基准
+        :param on_navigation: 每次打开页面后的回调(统计字典)
+        """
+        self.driver = driver
+        self.rules = rules
+        self.profile = profile
+        self.on_navigation = on_navigation
+        self._blocking = False  # 浏览器中是否还有生效的拦截列表
+
+    def _read_log(self) -> Optional[list]:
+        """读取并清空performance日志，未启用时为None"""
+        try:
+            return self.driver.get_log('performance')
+        except Exception:
+            return None
+
+    def _load(self, url: str, blocked_urls: list):
+        """
+        按拦截列表打开页面
+        :return: (页面加载耗时(毫秒), 本次导航的请求，无法读取performance日志时为None)
+        """
+        self._read_log()
+        self.driver.execute_cdp_cmd('Network.enable', {})
+        self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': blocked_urls})
+        self._blocking = bool(blocked_urls)
+        start = time.perf_counter()
+        self.driver.get(url)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        try:
+            load_ms = self.driver.execute_script(LOAD_TIME_SCRIPT)
+        except Exception:
+            load_ms = None
+        entries = self._read_log()
+        requests = parse_network_events(entries) if entries is not None else None
+        return round(load_ms if load_ms is not None else elapsed_ms, 1), requests
+
+    def clear(self):
+        """清除浏览器中的拦截列表：setBlockedURLs在浏览器会话中一直有效，池化复用的driver归还时需要清除"""
+        if self._blocking:
+            self.driver.execute_cdp_cmd('Network.setBlockedURLs', {'urls': []})
+            self._blocking = False
+
+    def get(self, url: str) -> Dict:
+        """
+        按规则拦截资源后打开页面（没有有效基准时不拦截，先测量基准）
+        :param url: 页面地址
+        :return: 本次导航的统计
+        """
+        baseline = self.profile.get(url)
+        if baseline is None:
+            # 第一次加载记录资源并预热，预热后再次打开的耗时作为基准
+            _, first = self._load(url, [])
+            load_ms, requests = self._load(url, [])
+            if first is None or requests is None:
+                logger.warning("无法读取performance日志，页面基准无法记录，资源拦截不会生效: %s", url)
+                requests = requests or {}
+            else:
+                self.profile.update(url, _resources(list(first.values()) + list(requests.values())), load_ms)
+        else:
+            blocked_urls = sorted(
+                resource_url for resource_url, info in baseline['resources'].items()
+                if self.rules.should_block(resource_url, info['type'])
+            ) + self.rules.browser_patterns()
+            load_ms, requests = self._load(url, blocked_urls)
+            if requests is None:
+                requests = {}
+            else:
+                self.profile.update(url, _resources(requests.values()))
+
+        known = (baseline or {}).get('resources', {})
+        blocked = [request for request in requests.values() if request['blocked']]
+        stats = {
+            'url': url,
+            'baseline': baseline is None,
+            'requests': len(requests),
+            'blocked': len(blocked),
+            'blocked_bytes': sum(known.get(request['url'], {}).get('bytes', 0) for request in blocked),
+            'load_ms': load_ms,
+            'saved_ms': round(baseline['load_ms'] - load_ms, 1) if baseline is not None else 0.0,
+        }
+        if self.on_navigation is not None:
+            self.on_navigation(stats)
+        return stats
+
+
+def _resources(requests) -> Dict[str, Dict]:
+    """请求列表转为资源清单（忽略data:地址；同一URL多次请求时取最大的大小，命中缓存的请求大小为0）"""
+    resources = {}
+    for request in requests:
+        if request['url'].startswith('data:'):
+            continue
+        known = resources.get(request['url'])
+        if known is None or request['bytes'] > known['bytes']:
+            resources[request['url']] = {'type': request['type'], 'bytes': request['bytes']}
+    return resources
+
+
+class ResourceBlockingPlugin:
+    """--block-resources 插件：为每个driver挂载资源拦截器，按用例汇总拦截统计"""
+
+    def __init__(self, config, rules: ResourceRules = None, profile: ResourceProfile = None):
+        """
+        :param config: pytest配置
+        :param rules: 拦截/放行规则，默认读取config.py
+        :param profile: 页面基准，默认使用RESOURCE_PROFILE_FILE
+        """
+        self.config = config
+        self.rules = rules or ResourceRules()
+        self.profile = profile or ResourceProfile()
+        self.current: Optional[Dict] = None
+        self.results: Dict[str, Dict] = {}
+
+    def attach(self, driver):
+        """
+        为driver挂载资源拦截器（池化复用的driver在同一会话中只挂载一次）
+        :param driver: WebDriver实例
+        """
+        blocker = _blockers.get(driver)
+        if blocker is None or blocker.on_navigation != self._record:
+            _blockers[driver] = ResourceBlocker(driver, self.rules, self.profile, self._record)
+
+    def _record(self, stats: Dict):
+        if self.current is None:
+            return
+        for key in ('requests', 'blocked', 'blocked_bytes', 'load_ms', 'saved_ms'):
+            self.current[key] = round(self.current[key] + stats[key], 1)
+        self.current['navigations'] += 1
+        self.current['baselines'] += int(stats['baseline'])
+
+    @pytest.hookimpl(tryfirst=True)
+    def pytest_runtest_setup(self, item):
+        self.current = dict.fromkeys(
+            ('navigations', 'baselines', 'requests', 'blocked', 'blocked_bytes', 'load_ms', 'saved_ms'), 0
+        )
+
+    @pytest.hookimpl(hookwrapper=True)
+    def pytest_runtest_makereport(self, item, call):
+        """teardown结束时把用例的拦截统计放进报告"""
+        outcome = yield
+        report = outcome.get_result()
+        if call.when == 'teardown' and self.current is not None:
+            if self.current['navigations']:
+                report.user_properties.append((BLOCKING_PROPERTY, self.current))
+            self.current = None
+
+    def pytest_runtest_logreport(self, report):
+        """汇总各用例的拦截统计（xdist下在主进程汇总）"""
+        for name, value in report.user_properties:
+            if name == BLOCKING_PROPERTY:
+                self.results[report.nodeid] = value
+
+    def pytest_terminal_summary(self, terminalreporter):
+        if not self.results:
+            return
+        terminalreporter.section("资源拦截统计")
+        terminalreporter.write_line(
+            f"{'用例':<60}{'打开页面':>8}{'请求数':>8}{'拦截数':>8}{'拦截(KB)':>10}{'加载(ms)':>10}{'节省(ms)':>10}"
+        )
+        for nodeid, stats in self.results.items():
+            terminalreporter.write_line(
+                f"{nodeid[-60:]:<60}{stats['navigations']:>8}{stats['requests']:>8}{stats['blocked']:>8}"
+                f"{stats['blocked_bytes'] / 1024:>10.1f}{stats['load_ms']:>10.1f}{stats['saved_ms']:>10.1f}"
+            )
+        totals = {key: sum(stats[key] for stats in self.results.values())
+                  for key in ('navigations', 'baselines', 'requests', 'blocked', 'blocked_bytes', 'saved_ms')}
+        terminalreporter.write_line(
+            f"合计: 打开页面 {totals['navigations']} 次（其中 {totals['baselines']} 次为测量基准，未拦截），"
+            f"拦截请求 {totals['blocked']}/{totals['requests']} 个, {totals['blocked_bytes'] / 1024:.1f} KB, "
+            f"节省页面加载 {totals['saved_ms'] / 1000:.2f}s"
+        )
+
+    def pytest_unconfigure(self, config):
+        """解除本会话挂载的拦截器（run_tests.py跨轮次保留的driver在下一轮不一定启用资源拦截）"""
+        for driver, blocker in list(_blockers.items()):
+            if blocker.on_navigation == self._record:
+                del _blockers[driver]
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+"""
+截图记录器
+按配置的策略处理页面截图：always立即附加到报告，on-failure只在内存中保留最近N张，
+测试失败时才写入磁盘和Allure报告，off不截图
+"""
+import os
+import weakref
+from collections import deque
+from datetime import datetime
+from typing import List, Tuple
+
+import allure
+
+from config.config import SCREENSHOT_DIR, SCREENSHOT_POLICY, SCREENSHOT_BUFFER_SIZE
+from utils.artifact_writer import get_artifact_writer
+
+
+POLICIES = ('always', 'on-failure', 'off')
+
+# 每个WebDriver对应一个记录器，driver被回收时自动释放
+_recorders = weakref.WeakKeyDictionary()
+
+
+class ScreenshotRecorder:
+    """截图记录器类"""
+
+    def __init__(self, policy: str = SCREENSHOT_POLICY, capacity: int = SCREENSHOT_BUFFER_SIZE):
+        """
+        初始化截图记录器
+        :param policy: 截图策略: always, on-failure, off
+        :param capacity: on-failure模式下环形缓冲区保留的截图数量
+        """
+        if policy not in POLICIES:
+            raise ValueError(f"不支持的截图策略: {policy}，可选: {', '.join(POLICIES)}")
+        self.policy = policy
+        self._frames = deque(maxlen=capacity)
+
+    def capture(self, driver, name: str):
+        """
+        按策略截图
+        :param driver: WebDriver实例
+        :param name: 截图名称
+        """
+        if self.policy == 'off':
+            return
+        png = driver.get_screenshot_as_png()
+        if self.policy == 'always':
+            allure.attach(png, name=name, attachment_type=allure.attachment_type.PNG)
+        else:
+            self._frames.append((name, png))
+
+    def flush(self, prefix: str) -> List[str]:
+        """
+        将缓冲区中的截图交给后台写入器写盘并附加到Allure报告，然后清空缓冲区
+        :param prefix: 文件名前缀（通常为测试用例名）
+        :return: 写入的文件路径列表
+        """
+        frames = self.drain()
+        if not frames:
+            return []
+
+        writer = get_artifact_writer()
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        paths = []
+        for index, (name, png) in enumerate(frames, 1):
+            path = os.path.join(SCREENSHOT_DIR, f"{prefix}_{timestamp}_{index:02d}_{name}.png")
+            writer.write_file(path, png)
+            writer.attach(png, name=f"步骤截图{index:02d}_{name}", attachment_type=allure.attachment_type.PNG)
+            paths.append(path)
+        return paths
+
+    def drain(self) -> List[Tuple[str, bytes]]:
+        """
+        取出并清空缓冲区中的截图
+        :return: [(截图名称, PNG数据)]
+        """
+        frames = list(self._frames)
+        self._frames.clear()
+        return frames
+
+    def clear(self):
+        """丢弃缓冲区中的截图（测试通过时调用）"""
+        self._frames.clear()
+
+
+def recorder_for(driver) -> ScreenshotRecorder:
+    """
+    获取driver对应的截图记录器，不存在时按配置创建
+    :param driver: WebDriver实例
+    :return: ScreenshotRecorder
+    """
+    recorder = _recorders.get(driver)
+    if recorder is None:
+        recorder = _recorders[driver] = ScreenshotRecorder()
+    return recorder
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""
+启动耗时分析
+进程内记录pytest从启动到首个用例执行的各阶段时间点，
+命令行入口以 -X importtime 运行pytest，按插件和模块汇总导入耗时
+
+用法:
+    python -m utils.startup_profiler [pytest参数...]
+    例如: python -m utils.startup_profiler --collect-only -q
+"""
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from importlib import metadata
+from typing import Dict, List, Tuple
+
+from config.config import REPORT_DIR
+
+
+STARTUP_REPORT_FILE = os.path.join(REPORT_DIR, 'startup_timing.json')
+
+# 由命令行入口传入的进程启动时间(time.time())，用于把各阶段时间折算为相对启动的偏移
+T0_ENV = 'STARTUP_PROFILER_T0'
+
+IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)\s*$')
+
+
+class StartupTimeline:
+    """进程内阶段时间线"""
+
+    def __init__(self):
+        """初始化时间线，基准时间取命令行入口传入的启动时间，否则为当前时间"""
+        self.t0 = float(os.environ.get(T0_ENV, time.time()))
+        self.marks: List[Tuple[str, float]] = []
+
+    def mark(self, label: str, once: bool = True):
+        """
+        记录一个时间点
+        :param label: 阶段名称
+        :param once: 为True时同名阶段只记录第一次
+        """
+        if once and any(name == label for name, _ in self.marks):
+            return
+        self.marks.append((label, time.time() - self.t0))
+
+    def to_dict(self) -> Dict:
+        """导出为字典"""
+        return {'marks': [{'label': label, 'offset': round(offset, 4)} for label, offset in self.marks]}
+
+    def save(self, path: str = STARTUP_REPORT_FILE, **extra):
+        """
+        保存时间线到JSON文件
+        :param path: 文件路径
+        :param extra: 额外写入的信息
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = self.to_dict()
+        data.update(extra)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+
+    def format_lines(self) -> List[str]:
+        """格式化为报告行：每个阶段的时间点及与上一阶段的间隔"""
+        lines = []
+        previous = 0.0
+        for label, offset in self.marks:
+            lines.append(f"{offset * 1000:9.1f} ms  (+{(offset - previous) * 1000:8.1f} ms)  {label}")
+            previous = offset
+        return lines
+
+
+timeline = StartupTimeline()
+
+
+def parse_importtime(text: str) -> List[Dict]:
+    """
+    解析 -X importtime 的输出
+    :param text: stderr文本
+    :return: [{'module', 'self_us', 'cumulative_us', 'depth'}]
+    """
+    records = []
+    for line in text.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            records.append({
+                'module': module,
+                'self_us': int(self_us),
+                'cumulative_us': int(cumulative_us),
+                'depth': len(indent) // 2,
+            })
+    return records
+
+
+def plugin_packages() -> Dict[str, str]:
+    """
+    已安装的pytest插件（pytest11入口点）与其顶层包的对应关系
+    :return: {顶层包名: 插件名}
+    """
+    packages = {}
+    for entry_point in metadata.entry_points(group='pytest11'):
+        packages[entry_point.value.split('.')[0].split(':')[0]] = entry_point.name
+    return packages
+
+
+def summarize_imports(records: List[Dict], top: int = 15) -> List[str]:
+    """
+    汇总导入耗时：按插件分组的顶层导入耗时，以及累计耗时最高的模块
+    :param records: parse_importtime的结果
+    :param top: 输出的模块数量
+    :return: 报告行
+    """
+    plugins = plugin_packages()
+    by_owner: Dict[str, int] = {}
+    for record in records:
+        if record['depth'] != 0:
+            continue
+        package = record['module'].split('.')[0]
+        owner = f"插件 {plugins[package]}" if package in plugins else package
+        by_owner[owner] = by_owner.get(owner, 0) + record['cumulative_us']
+
+    lines = ["按插件/顶层包汇总的导入耗时:"]
+    for owner, total in sorted(by_owner.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+        lines.append(f"  {total / 1000:9.1f} ms  {owner}")
+
+    lines.append(f"累计导入耗时最高的{top}个模块:")
+    for record in sorted(records, key=lambda r: r['cumulative_us'], reverse=True)[:top]:
+        lines.append(f"  {record['cumulative_us'] / 1000:9.1f} ms  (自身 {record['self_us'] / 1000:7.1f} ms)"
+                     f"  {record['module']}")
+    return lines
+
+
+def main(argv: List[str]) -> int:
+    """
+    以 -X importtime 运行pytest并输出启动耗时报告
+    :param argv: 传给pytest的参数
+    :return: pytest退出码
+    """
+    env = dict(os.environ, **{T0_ENV: repr(time.time())})
+    cmd = [sys.executable, '-X', 'importtime', '-m', 'pytest', '--startup-report', *argv]
+    result = subprocess.run(cmd, env=env, stderr=subprocess.PIPE, text=True, encoding='utf-8',
+                            errors='replace')
+
+    other_stderr = [line for line in result.stderr.splitlines() if not IMPORTTIME_LINE.match(line)]
+    if other_stderr:
+        print("\n".join(other_stderr), file=sys.stderr)
+
+    print("\n" + "=" * 80)
+    print("启动耗时报告")
+    print("=" * 80)
+    for line in summarize_imports(parse_importtime(result.stderr)):
+        print(line)
+
+    if os.path.exists(STARTUP_REPORT_FILE):
+        with open(STARTUP_REPORT_FILE, encoding='utf-8') as f:
+            data = json.load(f)
+        print("阶段时间线（相对进程启动）:")
+        previous = 0.0
+        for mark in data['marks']:
+            print(f"  {mark['offset'] * 1000:9.1f} ms  (+{(mark['offset'] - previous) * 1000:8.1f} ms)"
+                  f"  {mark['label']}")
+            previous = mark['offset']
+        for backend, seconds in data.get('backend_import_times', {}).items():
+            print(f"  浏览器后端 {backend} 延迟导入耗时: {seconds * 1000:.1f} ms")
+    return result.returncode
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -0,0 +1,196 @@
+# -*- coding: utf-8 -*-
+"""
+页面操作耗时统计
+页面对象的每个操作（打开页面、查找元素、输入、点击、各种等待、截图等）都通过timed_step记录耗时，
+按步骤名称汇总为p50/p95/p99分布，会话结束时可导出为JSON或CSV。
+耗时包含嵌套调用（如input_text包含其内部的find_element）。
+只有注册了监听器（--step-timings、--benchmark）时才计时，样本由各插件实例自己保存，不跨会话累积
+"""
+import csv
+import functools
+import json
+import math
+import os
+import threading
+import time
+from typing import Callable, Dict, List
+
+import pytest
+
+
+STATS_FIELDS = ('count', 'total', 'mean', 'p50', 'p95', 'p99', 'max')
+
+
+def percentile(values: List[float], pct: float) -> float:
+    """
+    计算百分位数（最近秩法）
+    :param values: 数据
+    :param pct: 百分位(0-100)
+    :return: 百分位数，无数据时为0
+    """
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+class StepTimings:
+    """按步骤名称收集耗时样本（线程安全）"""
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, name: str, seconds: float):
+        """
+        记录一次耗时
+        :param name: 步骤名称
+        :param seconds: 耗时(秒)
+        """
+        with self._lock:
+            self._samples.setdefault(name, []).append(seconds)
+
+    def merge(self, samples: Dict[str, List[float]]):
+        """合并其他进程（xdist worker）的样本"""
+        with self._lock:
+            for name, values in samples.items():
+                self._samples.setdefault(name, []).extend(values)
+
+    def samples(self) -> Dict[str, List[float]]:
+        """获取全部样本的副本"""
+        with self._lock:
+            return {name: list(values) for name, values in self._samples.items()}
+
+    def clear(self):
+        """清空样本"""
+        with self._lock:
+            self._samples.clear()
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        按步骤汇总耗时分布
+        :return: {步骤名称: {'count', 'total', 'mean', 'p50', 'p95', 'p99', 'max'}}
+        """
+        result = {}
+        for name, values in sorted(self.samples().items()):
+            result[name] = {
+                'count': len(values),
+                'total': round(sum(values), 4),
+                'mean': round(sum(values) / len(values), 4),
+                'p50': round(percentile(values, 50), 4),
+                'p95': round(percentile(values, 95), 4),
+                'p99': round(percentile(values, 99), 4),
+                'max': round(max(values), 4),
+            }
+        return result
+
+    def export(self, path: str) -> str:
+        """
+        导出汇总结果，按扩展名选择格式：.csv为CSV，其他为JSON
+        :param path: 输出文件路径
+        :return: 输出文件路径
+        """
+        stats = self.stats()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        if path.lower().endswith('.csv'):
+            with open(path, 'w', encoding='utf-8-sig', newline='') as f:
+                writer = csv.writer(f)
+                writer.writerow(('step',) + STATS_FIELDS)
+                for name, row in stats.items():
+                    writer.writerow([name] + [row[field] for field in STATS_FIELDS])
+        else:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(stats, f, ensure_ascii=False, indent=2)
+        return path
+
+
+# 当前会话中接收步骤耗时的监听器 (步骤名称, 耗时秒数) -> None，没有监听器时timed_step不计时
+_listeners: List[Callable[[str, float], None]] = []
+
+
+def add_listener(listener: Callable[[str, float], None]):
+    """注册步骤耗时监听器"""
+    _listeners.append(listener)
+
+
+def remove_listener(listener: Callable[[str, float], None]):
+    """注销步骤耗时监听器"""
+    if listener in _listeners:
+        _listeners.remove(listener)
+
+
+def timed_step(name: str = None) -> Callable:
+    """
+    记录被装饰方法耗时的装饰器（异常时同样记录），耗时交给已注册的监听器
+    :param name: 步骤名称，默认为方法的限定名，如 BasePage.click
+    """
+    def decorator(func: Callable) -> Callable:
+        step = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _listeners:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                seconds = time.perf_counter() - start
+                for listener in list(_listeners):
+                    listener(step, seconds)
+        return wrapper
+    return decorator
+
+
+class StepTimingPlugin:
+    """会话结束时导出页面操作耗时；xdist下worker通过workeroutput回传样本，由主进程汇总导出"""
+
+    def __init__(self, config, output: str):
+        """
+        初始化插件
+        :param config: pytest配置
+        :param output: 导出文件路径(.json/.csv)
+        """
+        self.config = config
+        self.output = output
+        self.saved_to = None
+        self.step_timings = StepTimings()
+        add_listener(self.step_timings.record)
+
+    def pytest_sessionstart(self, session):
+        self.step_timings.clear()
+
+    def pytest_unconfigure(self, config):
+        remove_listener(self.step_timings.record)
+
+    @pytest.hookimpl(optionalhook=True)
+    def pytest_testnodedown(self, node, error):
+        """xdist主进程: 合并worker回传的样本"""
+        samples = getattr(node, 'workeroutput', {}).get('step_timings')
+        if samples:
+            self.step_timings.merge(samples)
+
+    def pytest_sessionfinish(self, session):
+        """worker回传样本，主进程导出"""
+        if hasattr(self.config, 'workeroutput'):
+            self.config.workeroutput['step_timings'] = self.step_timings.samples()
+            return
+        if self.step_timings.samples():
+            self.saved_to = self.step_timings.export(self.output)
+
+    def pytest_terminal_summary(self, terminalreporter):
+        """输出各步骤耗时分布"""
+        if self.saved_to is None:
+            return
+        terminalreporter.section("页面操作耗时")
+        terminalreporter.write_line(
+            f"{'步骤':<40}{'次数':>6}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'合计(s)':>10}"
+        )
+        for name, row in self.step_timings.stats().items():
+            terminalreporter.write_line(
+                f"{name:<40}{row['count']:>6}{row['p50'] * 1000:>10.1f}{row['p95'] * 1000:>10.1f}"
+                f"{row['p99'] * 1000:>10.1f}{row['total']:>10.2f}"
+            )
+        terminalreporter.write_line(f"已导出: {self.saved_to}")
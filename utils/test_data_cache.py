@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+"""
+测试数据快照缓存
+将Excel测试数据编译为pickle快照，按文件修改时间和内容哈希判断是否需要重新解析，
+pytest收集阶段和xdist的每个worker都直接读取快照，不再重复解析xlsx
+"""
+import hashlib
+import os
+import pickle
+import time
+from typing import Dict, List
+
+from config.config import CACHE_DIR
+
+
+# 快照格式版本，快照结构变化时递增使旧快照失效
+SNAPSHOT_VERSION = 1
+
+# 最近一次加载的统计信息: {'source': 'snapshot'/'excel', 'seconds': 耗时, 'cases': 用例数}
+last_load_stats = {}
+
+
+def load_test_cases(excel_file: str, sheet_name: str = None) -> List[Dict]:
+    """
+    加载测试用例，优先使用快照
+    :param excel_file: Excel文件路径
+    :param sheet_name: 工作表名称
+    :return: 测试用例列表（只包含run为yes的用例）
+    """
+    start = time.perf_counter()
+    snapshot_path = _snapshot_path(excel_file, sheet_name)
+    stat = os.stat(excel_file)
+    snapshot = _read_snapshot(snapshot_path)
+
+    if snapshot and (snapshot['mtime_ns'], snapshot['size']) == (stat.st_mtime_ns, stat.st_size):
+        cases, source = snapshot['cases'], 'snapshot'
+    else:
+        digest = _file_digest(excel_file)
+        if snapshot and snapshot['sha256'] == digest:
+            # 文件只是被touch或重新保存，内容没有变化，更新时间戳即可
+            cases, source = snapshot['cases'], 'snapshot'
+        else:
+            # 只有需要重新解析时才导入openpyxl，命中快照时省去这部分导入开销
+            from utils.excel_reader import ExcelReader
+            reader = ExcelReader(excel_file, sheet_name=sheet_name)
+            try:
+                cases = reader.read_data()
+            finally:
+                reader.close()
+            source = 'excel'
+        _write_snapshot(snapshot_path, {
+            'version': SNAPSHOT_VERSION,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest,
+            'cases': cases,
+        })
+
+    last_load_stats.update(source=source, seconds=time.perf_counter() - start, cases=len(cases))
+    return cases
+
+
+def _snapshot_path(excel_file: str, sheet_name: str) -> str:
+    """快照文件路径，按Excel路径和工作表名区分"""
+    key = hashlib.sha1(f"{os.path.abspath(excel_file)}|{sheet_name}".encode('utf-8')).hexdigest()[:16]
+    name = os.path.splitext(os.path.basename(excel_file))[0]
+    return os.path.join(CACHE_DIR, f"{name}.{key}.pickle")
+
+
+def _read_snapshot(path: str):
+    """读取快照，不存在、损坏或版本不符时返回None"""
+    try:
+        with open(path, 'rb') as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get('version') != SNAPSHOT_VERSION:
+        return None
+    return snapshot
+
+
+def _write_snapshot(path: str, snapshot: dict):
+    """原子写入快照：先写临时文件再替换，多个xdist worker同时写入也不会读到半个文件"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'wb') as f:
+        pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, path)
+
+
+def _file_digest(path: str) -> str:
+    """计算文件内容的sha256"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()